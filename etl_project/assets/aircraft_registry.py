@@ -0,0 +1,252 @@
+import argparse
+import logging
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from etl_project.assets.compiled_arrays import (
+    compiled_folder_path,
+    decode_strings,
+    encode_strings,
+    file_signature,
+    is_compiled,
+    read_manifest,
+    save_array,
+    write_manifest,
+)
+from etl_project.assets.reference_data import get_cached_reference
+
+# Columns of the OpenSky `aircraftDatabase.csv` file used for enrichment
+AIRCRAFT_REGISTRY_COLUMNS = ["typecode", "manufacturername", "operator"]
+
+# The compiled registry is a folder of `.npy` arrays next to the csv: the
+# sorted `icao24` addresses as uint32 keys, an int32 array of value codes per
+# column aligned with the keys (-1 for null) and the distinct values of each
+# column as a NUL separated UTF-8 blob. `manifest.json` records the csv it
+# was compiled from.
+COMPILED_REGISTRY_VERSION = 1
+
+ICAO24_LENGTH = 6
+# Value of each hexadecimal digit by code point, -1 for other characters
+_HEX_DIGITS = np.full(128, -1, dtype=np.int64)
+for _value, _digit in enumerate("0123456789abcdef"):
+    _HEX_DIGITS[ord(_digit)] = _value
+    _HEX_DIGITS[ord(_digit.upper())] = _value
+
+
+def icao24_keys(icao24: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Converts hexadecimal `icao24` addresses into their 24-bit integer keys.
+
+    The addresses are laid out as a fixed-width matrix of code points and
+    decoded with whole-array operations.
+
+    Args:
+        icao24: six hexadecimal digit addresses in either case, possibly null
+
+    Returns:
+        A tuple of the uint32 keys and a boolean array marking valid addresses,
+        whose keys are meaningless
+    """
+    width = ICAO24_LENGTH + 1
+    values = np.array(
+        pd.Series(icao24, dtype=object).fillna("").to_numpy(), dtype=f"U{width}"
+    )
+    chars = values.view(np.uint32).reshape(len(values), width)
+    digits = _HEX_DIGITS[np.minimum(chars[:, :ICAO24_LENGTH], 127)]
+    valid = (digits >= 0).all(axis=1) & (chars[:, ICAO24_LENGTH] == 0)
+    shifts = 4 * np.arange(ICAO24_LENGTH - 1, -1, -1)
+    keys = (np.maximum(digits, 0) << shifts).sum(axis=1).astype(np.uint32)
+    return keys, valid
+
+
+def read_aircraft_registry(aircraft_registry_path: str) -> pd.DataFrame:
+    """
+    Reads the aircraft registry columns used for enrichment.
+
+    Entries without a valid `icao24` address are dropped and the first of
+    duplicated addresses is kept.
+
+    Args:
+        aircraft_registry_path: path to an OpenSky `aircraftDatabase.csv` file
+
+    Returns:
+        A dataframe of `AIRCRAFT_REGISTRY_COLUMNS` indexed by unique uint32
+        `icao24` key, sorted by key
+    """
+    df_aircraft = pd.read_csv(
+        aircraft_registry_path,
+        usecols=["icao24", *AIRCRAFT_REGISTRY_COLUMNS],
+        dtype=str,
+        keep_default_na=False,
+        na_values=[""],
+    )
+    keys, valid = icao24_keys(df_aircraft["icao24"].str.strip())
+    df_aircraft = df_aircraft[valid][AIRCRAFT_REGISTRY_COLUMNS].set_index(
+        pd.Index(keys[valid], name="icao24")
+    )
+    df_aircraft = df_aircraft[~df_aircraft.index.duplicated()]
+    return df_aircraft.sort_index(kind="stable")
+
+
+def compile_aircraft_registry(
+    aircraft_registry_path: str, compiled_path: str = None
+) -> Path:
+    """
+    Compiles an aircraft registry csv into memory-mappable NumPy arrays.
+
+    The manifest is written last, so an interrupted build is detected as
+    stale and rebuilt by the next `load_aircraft_registry`.
+
+    Args:
+        aircraft_registry_path: path to an OpenSky `aircraftDatabase.csv` file
+        compiled_path: output folder, defaults to `compiled_folder_path`
+
+    Returns:
+        The folder of the compiled registry
+    """
+    folder = Path(compiled_path or compiled_folder_path(aircraft_registry_path))
+    folder.mkdir(parents=True, exist_ok=True)
+    signature = file_signature(aircraft_registry_path)
+    df_aircraft = read_aircraft_registry(aircraft_registry_path)
+
+    save_array(folder, "icao24", df_aircraft.index.to_numpy(dtype=np.uint32))
+    for column in AIRCRAFT_REGISTRY_COLUMNS:
+        codes, values = pd.factorize(df_aircraft[column])
+        save_array(folder, f"{column}.codes", codes.astype(np.int32))
+        save_array(folder, f"{column}.values", encode_strings(list(values)))
+
+    write_manifest(
+        folder,
+        source_signature=signature,
+        version=COMPILED_REGISTRY_VERSION,
+        columns=AIRCRAFT_REGISTRY_COLUMNS,
+        rows=len(df_aircraft),
+    )
+    return folder
+
+
+class AircraftRegistry:
+    """
+    An aircraft registry compiled by `compile_aircraft_registry`.
+
+    The keys and value codes are memory-mapped read-only, so their pages are
+    loaded on demand and shared through the page cache by every process
+    reading the same registry. Only the distinct values of each column are
+    decoded in memory.
+
+    Args:
+        compiled_path: folder of the compiled registry
+
+    Raises:
+        Exception when no compiled registry is found in `compiled_path`.
+    """
+
+    def __init__(self, compiled_path: str):
+        folder = Path(compiled_path)
+        manifest = read_manifest(folder, version=COMPILED_REGISTRY_VERSION)
+        if manifest is None:
+            raise Exception(f"No compiled aircraft registry found in {folder}")
+        self.keys = np.load(folder / "icao24.npy", mmap_mode="r")
+        self.codes = {}
+        self.values = {}
+        for column in manifest["columns"]:
+            self.codes[column] = np.load(folder / f"{column}.codes.npy", mmap_mode="r")
+            self.values[column] = decode_strings(
+                np.load(folder / f"{column}.values.npy", mmap_mode="r")
+            )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup_codes(self, icao24: pd.Series) -> dict[str, np.ndarray]:
+        """
+        Looks up aircraft with one vectorized binary search over the keys.
+
+        Args:
+            icao24: hexadecimal addresses of the aircraft, possibly null
+
+        Returns:
+            For each registry column, the code of each aircraft's value in
+            `values`, -1 for unknown aircraft or null values
+        """
+        keys, valid = icao24_keys(icao24)
+        found = np.flatnonzero(valid & (len(self.keys) > 0))
+        positions = np.minimum(
+            np.searchsorted(self.keys, keys[found]), len(self.keys) - 1
+        )
+        matched = self.keys[positions] == keys[found]
+        found, positions = found[matched], positions[matched]
+        looked_up = {}
+        for column, codes in self.codes.items():
+            looked_up[column] = np.full(len(keys), -1, dtype=np.int32)
+            looked_up[column][found] = codes[positions]
+        return looked_up
+
+    def lookup(self, icao24: pd.Series) -> pd.DataFrame:
+        """
+        Looks up the registry entries of aircraft, see `lookup_codes`.
+
+        Returns:
+            A dataframe of categorical registry columns on the index of
+            `icao24`, null for unknown aircraft
+        """
+        return pd.DataFrame(
+            {
+                column: pd.Categorical.from_codes(
+                    codes, categories=pd.Index(self.values[column], dtype=object)
+                )
+                for column, codes in self.lookup_codes(icao24).items()
+            },
+            index=getattr(icao24, "index", None),
+        )
+
+
+def load_aircraft_registry(aircraft_registry_path: str) -> AircraftRegistry:
+    """
+    Opens the compiled aircraft registry, compiling it first when the csv is
+    newer than the compiled registry or was never compiled.
+
+    When the compiled registry cannot be written, e.g. on a read-only volume,
+    it is compiled to a temporary folder instead.
+
+    Args:
+        aircraft_registry_path: path to an OpenSky `aircraftDatabase.csv` file
+    """
+    folder = compiled_folder_path(aircraft_registry_path)
+    if not is_compiled(
+        aircraft_registry_path, folder, version=COMPILED_REGISTRY_VERSION
+    ):
+        try:
+            compile_aircraft_registry(aircraft_registry_path, compiled_path=folder)
+        except OSError as e:
+            fallback = Path(tempfile.mkdtemp(prefix="aircraft_registry."))
+            logging.warning(
+                f"Could not compile the aircraft registry to {folder}, using {fallback}: {e}"
+            )
+            folder = compile_aircraft_registry(
+                aircraft_registry_path, compiled_path=fallback
+            )
+    return AircraftRegistry(folder)
+
+
+def get_aircraft_registry(aircraft_registry_path: str) -> AircraftRegistry:
+    """Returns the cached aircraft registry, see `load_aircraft_registry`."""
+    return get_cached_reference(
+        path=aircraft_registry_path, reader=load_aircraft_registry
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compile an aircraft registry csv for fast loading."
+    )
+    parser.add_argument("aircraft_registry_path")
+    parser.add_argument("--compiled-path", default=None)
+    args = parser.parse_args()
+    print(
+        compile_aircraft_registry(
+            aircraft_registry_path=args.aircraft_registry_path,
+            compiled_path=args.compiled_path,
+        )
+    )
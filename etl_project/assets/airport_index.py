@@ -0,0 +1,279 @@
+import threading
+import numpy as np
+import pandas as pd
+from etl_project.assets.geodesy import EARTH_RADIUS_KM
+from etl_project.assets.reference_data import get_airport_reference
+
+# Airport types considered when inferring the airport of a flight
+DEFAULT_AIRPORT_TYPES = ["large_airport", "medium_airport", "small_airport"]
+
+# Bits per axis of the packed grid cell keys
+_CELL_KEY_BITS = 21
+# Packed key offsets of a cell's 27 neighbours, itself included. Keys are
+# linear in the cell coordinates, so a neighbour's key is the cell key plus
+# its offset.
+_NEIGHBOUR_KEY_OFFSETS = np.array(
+    [
+        (x << (2 * _CELL_KEY_BITS)) + (y << _CELL_KEY_BITS) + z
+        for x in (-1, 0, 1)
+        for y in (-1, 0, 1)
+        for z in (-1, 0, 1)
+    ],
+    dtype=np.int64,
+)
+
+
+def _unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    latitudes = np.radians(np.asarray(latitudes, dtype=float))
+    longitudes = np.radians(np.asarray(longitudes, dtype=float))
+    return np.column_stack(
+        [
+            np.cos(latitudes) * np.cos(longitudes),
+            np.cos(latitudes) * np.sin(longitudes),
+            np.sin(latitudes),
+        ]
+    )
+
+
+def _chord_length(distance_km: float) -> float:
+    """Returns the straight-line distance between unit vectors `distance_km` apart."""
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class AirportSpatialIndex:
+    """
+    A uniform grid over airport positions for batched nearest-airport queries.
+
+    Positions are indexed as 3D unit vectors, which has no singularity at the
+    poles or at the antimeridian. The cells are cubes whose side is the chord
+    of `max_radius_km`, so every airport within that radius of a position is
+    in one of the 27 cells around it. Airports are sorted by packed cell key
+    and the occupied cells are found with a binary search, so each query
+    only measures the airports of those cells instead of scanning the whole
+    reference.
+
+    Args:
+        idents: airport idents
+        latitudes: airport latitudes in degrees, NaN when unknown
+        longitudes: airport longitudes in degrees, NaN when unknown
+        max_radius_km: largest search radius supported by `nearest`
+    """
+
+    def __init__(
+        self,
+        idents: np.ndarray,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        max_radius_km: float = 25.0,
+    ):
+        if max_radius_km <= 0:
+            raise Exception("Please specify a positive max_radius_km")
+        known = np.isfinite(latitudes) & np.isfinite(longitudes)
+        vectors = _unit_vectors(
+            np.asarray(latitudes)[known], np.asarray(longitudes)[known]
+        )
+        self.max_radius_km = max_radius_km
+        # cells must stay addressable with `_CELL_KEY_BITS` bits per axis
+        self.cell_size = max(
+            _chord_length(max_radius_km), 4 / 2 ** (_CELL_KEY_BITS - 1)
+        )
+        keys = self._cell_keys(self._cells(vectors))
+        order = np.argsort(keys, kind="stable")
+        self.vectors = vectors[order]
+        self.idents = np.asarray(idents, dtype=object)[known][order]
+        # occupied cells and the range of their airports in sorted order
+        self.cell_keys, self.cell_starts, self.cell_counts = np.unique(
+            keys[order], return_index=True, return_counts=True
+        )
+
+    def __len__(self) -> int:
+        return len(self.idents)
+
+    def _cells(self, vectors: np.ndarray) -> np.ndarray:
+        return np.floor(vectors / self.cell_size).astype(np.int64)
+
+    @staticmethod
+    def _cell_keys(cells: np.ndarray) -> np.ndarray:
+        cells = cells + 2 ** (_CELL_KEY_BITS - 1)
+        return (
+            cells[..., 0] << (2 * _CELL_KEY_BITS)
+            | cells[..., 1] << _CELL_KEY_BITS
+            | cells[..., 2]
+        )
+
+    def nearest(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        radius_km: float = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the nearest airport of each position within a radius.
+
+        Args:
+            latitudes: latitudes in degrees, NaN when unknown
+            longitudes: longitudes in degrees, NaN when unknown
+            radius_km: search radius, at most `max_radius_km` (the default)
+
+        Returns:
+            A tuple of the ident of the nearest airport of each position, None
+            when there is none within the radius, and its distance in km
+
+        Raises:
+            Exception when `radius_km` is larger than `max_radius_km`.
+        """
+        radius_km = self.max_radius_km if radius_km is None else radius_km
+        if radius_km > self.max_radius_km:
+            raise Exception(
+                f"Please specify a radius of at most {self.max_radius_km} km for this index"
+            )
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        idents = np.full(len(latitudes), None, dtype=object)
+        distances = np.full(len(latitudes), np.nan)
+        queries = np.flatnonzero(np.isfinite(latitudes) & np.isfinite(longitudes))
+        if len(queries) == 0 or len(self) == 0:
+            return idents, distances
+
+        vectors = _unit_vectors(latitudes[queries], longitudes[queries])
+        neighbour_keys = (
+            self._cell_keys(self._cells(vectors))[:, np.newaxis]
+            + _NEIGHBOUR_KEY_OFFSETS
+        ).ravel()
+        cells = np.searchsorted(self.cell_keys, neighbour_keys)
+        cells[cells == len(self.cell_keys)] = 0
+        occupied = np.flatnonzero(self.cell_keys[cells] == neighbour_keys)
+        starts = self.cell_starts[cells[occupied]]
+        counts = self.cell_counts[cells[occupied]]
+
+        # one (query, candidate airport) pair per airport of a neighbour cell,
+        # grouped by query
+        query_positions = np.repeat(occupied // len(_NEIGHBOUR_KEY_OFFSETS), counts)
+        group_offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        candidates = np.repeat(starts, counts) + (
+            np.arange(counts.sum()) - group_offsets
+        )
+        chords = np.linalg.norm(
+            self.vectors[candidates] - vectors[query_positions], axis=1
+        )
+        within = chords <= _chord_length(radius_km)
+        query_positions, candidates, chords = (
+            query_positions[within],
+            candidates[within],
+            chords[within],
+        )
+        if len(chords) == 0:
+            return idents, distances
+
+        # keep the closest candidate of each query
+        group_starts = np.flatnonzero(
+            np.diff(query_positions, prepend=query_positions[0] - 1)
+        )
+        group_minimums = np.minimum.reduceat(chords, group_starts)
+        closest = np.flatnonzero(
+            chords
+            == np.repeat(group_minimums, np.diff(group_starts, append=len(chords)))
+        )
+        # on ties keep the first closest candidate of the query
+        closest = closest[np.unique(query_positions[closest], return_index=True)[1]]
+        positions = queries[query_positions[closest]]
+        idents[positions] = self.idents[candidates[closest]]
+        distances[positions] = (
+            2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chords[closest] / 2, 1))
+        )
+        return idents, distances
+
+
+def build_airport_index(
+    df_airports: pd.DataFrame,
+    airport_types: list[str] = None,
+    max_radius_km: float = 25.0,
+) -> AirportSpatialIndex:
+    """
+    Builds a spatial index over the airports of a reference.
+
+    Args:
+        df_airports: airport reference as returned by `get_airport_reference`
+        airport_types: airport types to index, defaults to `DEFAULT_AIRPORT_TYPES`
+        max_radius_km: largest search radius supported by the index
+    """
+    airport_types = DEFAULT_AIRPORT_TYPES if airport_types is None else airport_types
+    df_airports = df_airports[df_airports["type"].isin(airport_types)]
+    return AirportSpatialIndex(
+        idents=df_airports.index.to_numpy(),
+        latitudes=df_airports["latitude"].to_numpy(dtype=float),
+        longitudes=df_airports["longitude"].to_numpy(dtype=float),
+        max_radius_km=max_radius_km,
+    )
+
+
+_cached_indexes = {}
+_cached_indexes_lock = threading.Lock()
+
+
+def get_airport_index(
+    airport_codes_path: str,
+    airport_types: list[str] = None,
+    max_radius_km: float = 25.0,
+) -> AirportSpatialIndex:
+    """
+    Returns the process-wide spatial index of an airport reference.
+
+    The index is built once and rebuilt only when the reference itself is
+    reloaded, see `get_airport_reference`.
+    """
+    df_airports = get_airport_reference(airport_codes_path)
+    key = (
+        airport_codes_path,
+        None if airport_types is None else tuple(airport_types),
+        max_radius_km,
+    )
+    with _cached_indexes_lock:
+        cached = _cached_indexes.get(key)
+        if cached is None or cached[0] is not df_airports:
+            cached = (
+                df_airports,
+                build_airport_index(
+                    df_airports=df_airports,
+                    airport_types=airport_types,
+                    max_radius_km=max_radius_km,
+                ),
+            )
+            _cached_indexes[key] = cached
+        return cached[1]
+
+
+def infer_airports(
+    codes: np.ndarray,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    airport_index: AirportSpatialIndex,
+    radius_km: float = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fills missing airport codes with the nearest airport of a position.
+
+    Only positions of flights without a code are queried, in one batch.
+
+    Args:
+        codes: airport codes, None when missing
+        latitudes: latitudes in degrees of the flights, NaN when unknown
+        longitudes: longitudes in degrees of the flights, NaN when unknown
+        airport_index: index of the candidate airports
+        radius_km: search radius, defaults to the index's `max_radius_km`
+
+    Returns:
+        A tuple of the filled codes and a boolean array marking inferred codes
+    """
+    codes = np.array(codes, dtype=object)
+    missing = np.flatnonzero(pd.isna(codes))
+    nearest_idents, _ = airport_index.nearest(
+        np.asarray(latitudes, dtype=float)[missing],
+        np.asarray(longitudes, dtype=float)[missing],
+        radius_km=radius_km,
+    )
+    found = pd.notna(nearest_idents)
+    codes[missing[found]] = nearest_idents[found]
+    inferred = np.zeros(len(codes), dtype=bool)
+    inferred[missing[found]] = True
+    return codes, inferred
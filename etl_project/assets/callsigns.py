@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+# A flight callsign is an airline ICAO designator of three letters followed by
+# a flight number of one to four characters starting with a digit, padded
+# with spaces to eight characters. Other callsigns, e.g. registrations, are
+# not split.
+AIRLINE_DESIGNATOR_LENGTH = 3
+MAX_FLIGHT_CALLSIGN_LENGTH = 7
+CALLSIGN_PATTERN = r"^(?P<airline_icao>[A-Z]{3})(?P<flight_number>[0-9][0-9A-Z]{0,3})$"
+
+# Columns of the OpenFlights `airlines.dat` file, which has no header row
+OPENFLIGHTS_AIRLINE_COLUMNS = [
+    "airline_id",
+    "name",
+    "alias",
+    "iata",
+    "icao",
+    "callsign",
+    "country",
+    "active",
+]
+
+
+def split_callsigns(callsigns: pd.Series) -> pd.DataFrame:
+    """
+    Splits flight callsigns into an airline designator and a flight number.
+
+    The callsigns are laid out as a fixed-width matrix of code points and
+    matched against `CALLSIGN_PATTERN` with whole-array comparisons, instead
+    of running a regular expression per callsign.
+
+    Args:
+        callsigns: space-padded callsigns, possibly null
+
+    Returns:
+        A dataframe with a categorical `airline_icao` column and an object
+        `flight_number` column, null where the callsign is not a flight callsign
+    """
+    width = MAX_FLIGHT_CALLSIGN_LENGTH + 2
+    values = np.array(callsigns.fillna("").to_numpy(dtype=object), dtype=f"U{width}")
+    chars = values.view(np.uint32).reshape(len(values), width).copy()
+    padding = (chars == 0) | (chars == ord(" "))
+    chars[padding] = 0
+    letters = (chars >= ord("A")) & (chars <= ord("Z"))
+    digits = (chars >= ord("0")) & (chars <= ord("9"))
+    # characters before the first padding character
+    content = ~np.logical_or.accumulate(padding, axis=1)
+    split = AIRLINE_DESIGNATOR_LENGTH
+    valid = (
+        letters[:, :split].all(axis=1)
+        & digits[:, split]
+        & (letters | digits | ~content)[:, split + 1 :].all(axis=1)
+        & (padding | content).all(axis=1)
+        & ~content[:, MAX_FLIGHT_CALLSIGN_LENGTH]
+    )
+
+    # designators are factorized as integers packing their three letters
+    designator_keys = (
+        chars[valid, 0].astype(np.int64) << 16
+        | chars[valid, 1].astype(np.int64) << 8
+        | chars[valid, 2]
+    )
+    designator_codes = np.full(len(values), -1, dtype=np.int64)
+    designator_codes[valid], keys = pd.factorize(designator_keys)
+    designators = [
+        chr(key >> 16) + chr(key >> 8 & 255) + chr(key & 255) for key in keys
+    ]
+    flight_numbers = np.ascontiguousarray(chars[:, split:-1]).view(
+        f"U{width - split - 1}"
+    )
+    return pd.DataFrame(
+        {
+            "airline_icao": pd.Categorical.from_codes(
+                designator_codes, categories=designators
+            ),
+            "flight_number": np.where(
+                valid, flight_numbers.ravel().astype(object), None
+            ),
+        },
+        index=callsigns.index,
+    )
+
+
+def read_airline_reference(airline_codes_path: str) -> pd.DataFrame:
+    """
+    Reads the OpenFlights airline reference indexed by ICAO designator.
+
+    Entries without a valid three letter designator are dropped. When several
+    airlines share a designator, active airlines are kept first.
+
+    Args:
+        airline_codes_path: path to an OpenFlights `airlines.dat` file
+
+    Returns:
+        A dataframe of airline `name` and `country` indexed by unique `icao`
+    """
+    df_airlines = pd.read_csv(
+        airline_codes_path,
+        header=None,
+        names=OPENFLIGHTS_AIRLINE_COLUMNS,
+        usecols=["name", "icao", "country", "active"],
+        dtype=str,
+        na_values=["\\N"],
+        keep_default_na=False,
+    )
+    df_airlines = df_airlines[
+        df_airlines["icao"].str.fullmatch("[A-Z]{3}", na=False)
+    ].sort_values("active", ascending=False, kind="stable")
+    return df_airlines.drop_duplicates(subset="icao").set_index("icao")[
+        ["name", "country"]
+    ]
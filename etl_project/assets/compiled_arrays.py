@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+from pathlib import Path
+import numpy as np
+
+# A compiled folder holds `.npy` arrays built from a source file next to it,
+# and a `manifest.json` that records the format version and the signature of
+# the source it was compiled from. The manifest is written last, so an
+# interrupted build is detected as stale.
+COMPILED_FOLDER_SUFFIX = ".compiled"
+
+
+def file_signature(path: str) -> tuple[int, int]:
+    """Returns the modification time and size of a file."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def compiled_folder_path(source_path: str) -> Path:
+    """Returns the folder holding the compiled form of a source file."""
+    return Path(f"{source_path}{COMPILED_FOLDER_SUFFIX}")
+
+
+def encode_strings(values: list[str]) -> np.ndarray:
+    """Encodes strings into a NUL separated UTF-8 blob."""
+    return np.frombuffer("\x00".join(values).encode("utf-8"), dtype=np.uint8)
+
+
+def decode_strings(blob: np.ndarray) -> list[str]:
+    """Decodes a blob produced by `encode_strings`."""
+    if len(blob) == 0:
+        return []
+    return blob.tobytes().decode("utf-8").split("\x00")
+
+
+def _temp_path(folder: Path, name: str, suffix: str = "") -> Path:
+    return folder / f"{name}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}"
+
+
+def save_array(folder: Path, name: str, array: np.ndarray) -> None:
+    """Atomically saves an array to `<name>.npy` in a compiled folder."""
+    temp_path = _temp_path(folder, name, suffix=".npy")
+    np.save(temp_path, array)
+    os.replace(temp_path, folder / f"{name}.npy")
+
+
+def write_manifest(
+    folder: Path, source_signature: tuple[int, int], version: int, **fields
+) -> None:
+    """
+    Atomically writes the manifest of a compiled folder.
+
+    Args:
+        folder: the compiled folder
+        source_signature: `file_signature` of the source, taken before reading it
+        version: format version of the compiled arrays
+        fields: other entries of the manifest, e.g. its columns
+    """
+    manifest = {
+        "version": version,
+        "source_mtime_ns": source_signature[0],
+        "source_size": source_signature[1],
+        **fields,
+    }
+    temp_path = _temp_path(folder, "manifest")
+    with open(temp_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+    os.replace(temp_path, folder / "manifest.json")
+
+
+def read_manifest(folder: Path, version: int) -> dict:
+    """
+    Reads the manifest of a compiled folder.
+
+    Returns:
+        The manifest, or None when it is missing, unreadable or of another
+        format version
+    """
+    try:
+        with open(Path(folder) / "manifest.json") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == version else None
+
+
+def is_compiled(source_path: str, folder: Path, version: int) -> bool:
+    """Returns whether a compiled folder is up to date with its source file."""
+    manifest = read_manifest(folder, version=version)
+    return manifest is not None and (
+        manifest.get("source_mtime_ns"),
+        manifest.get("source_size"),
+    ) == file_signature(source_path)
@@ -0,0 +1,74 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+
+def read_failed_windows(failed_windows_path: str) -> list[dict[str, datetime]]:
+    """
+    Reads the windows that failed in previous runs.
+
+    Args:
+        failed_windows_path: path to the json file written by `write_failed_windows`
+
+    Returns:
+        A list of dictionaries with `start_time` and `end_time` datetime objects.
+        Empty when the path is not set or the file does not exist.
+    """
+    if failed_windows_path is None or not Path(failed_windows_path).exists():
+        return []
+    with open(failed_windows_path) as failed_windows_file:
+        return [
+            {
+                "start_time": datetime.fromisoformat(window["start_time"]),
+                "end_time": datetime.fromisoformat(window["end_time"]),
+            }
+            for window in json.load(failed_windows_file)
+        ]
+
+
+def write_failed_windows(
+    failed_windows_path: str, failed_windows: list[dict[str, datetime]]
+) -> None:
+    """
+    Persists the windows that still failed after all retries.
+
+    The file is replaced atomically so that an interrupted run never leaves a
+    truncated list behind.
+    """
+    if failed_windows_path is None:
+        return
+    Path(failed_windows_path).parent.mkdir(parents=True, exist_ok=True)
+    temp_path = f"{failed_windows_path}.tmp"
+    with open(temp_path, "w") as failed_windows_file:
+        json.dump(
+            [
+                {
+                    "start_time": window["start_time"].isoformat(),
+                    "end_time": window["end_time"].isoformat(),
+                }
+                for window in failed_windows
+            ],
+            failed_windows_file,
+            indent=2,
+        )
+    os.replace(temp_path, failed_windows_path)
+
+
+def prioritise_failed_windows(
+    failed_windows: list[dict[str, datetime]],
+    planned_windows: list[dict[str, datetime]],
+) -> list[dict[str, datetime]]:
+    """
+    Puts previously failed windows first, followed by the planned windows.
+
+    Windows present in both lists are only returned once.
+    """
+    windows = []
+    seen = set()
+    for window in failed_windows + planned_windows:
+        key = (window["start_time"], window["end_time"])
+        if key not in seen:
+            seen.add(key)
+            windows.append(window)
+    return windows
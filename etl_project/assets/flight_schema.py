@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import Column, String, Float, DateTime, Integer, Boolean
+
+# Fields kept from a `/flights/all` record and the dtype of their column.
+# Epochs are always present; distances may be null and become NaN. Airport
+# codes repeat across many flights and are stored as categoricals, while
+# icao24 and callsign are close to unique within a window.
+FLIGHT_RECORD_SCHEMA = {
+    "icao24": "object",
+    "firstSeen": "int64",
+    "estDepartureAirport": "category",
+    "lastSeen": "int64",
+    "estArrivalAirport": "category",
+    "callsign": "object",
+    "estDepartureAirportHorizDistance": "float64",
+    "estDepartureAirportVertDistance": "float64",
+    "estArrivalAirportHorizDistance": "float64",
+    "estArrivalAirportVertDistance": "float64",
+}
+
+# Columns of the loaded flights as (name, sqlalchemy type, primary key)
+FLIGHT_TABLE_SCHEMA = [
+    ("icao24", String, True),
+    ("firstSeen", DateTime(timezone=True), True),
+    ("lastSeen", DateTime(timezone=True), True),
+    ("estDepartureAirport", String, False),
+    ("estArrivalAirport", String, False),
+    ("callsign", String, False),
+    ("airline_icao", String, False),
+    ("flight_number", String, False),
+    ("airline_name", String, False),
+    ("airline_country", String, False),
+    ("aircraft_type", String, False),
+    ("aircraft_manufacturer", String, False),
+    ("aircraft_operator", String, False),
+    ("estDepartureAirportDistance", Float, False),
+    ("estArrivalAirportDistance", Float, False),
+    ("departure_airport_inferred", Boolean, False),
+    ("arrival_airport_inferred", Boolean, False),
+    ("departure_airport_type", String, False),
+    ("departure_airport_name", String, False),
+    ("departure_country", String, False),
+    ("departure_latitude", Float, False),
+    ("departure_longitude", Float, False),
+    ("arrival_airport_type", String, False),
+    ("arrival_airport_name", String, False),
+    ("arrival_country", String, False),
+    ("arrival_latitude", Float, False),
+    ("arrival_longitude", Float, False),
+    ("route_distance_km", Float, False),
+    ("flight_duration_seconds", Integer, False),
+]
+
+
+# Columns of earlier versions of the `opensky_flights` table, dropped from
+# existing tables by `PostgreSqlClient.migrate_table`
+RETIRED_FLIGHT_TABLE_COLUMNS = ["departure_coordinates", "arrival_coordinates"]
+
+
+def build_flights_frame(records: list[dict]) -> pd.DataFrame:
+    """
+    Builds a typed dataframe of flights from decoded `/flights/all` records.
+
+    Each column of `FLIGHT_RECORD_SCHEMA` is built in one pass directly in its
+    final dtype, instead of inferring and normalising every record like
+    `pd.json_normalize` does. Other fields of the records are ignored.
+
+    Args:
+        records: flights as returned by `OpenSkyApiClient.get_flights`
+
+    Returns:
+        A dataframe with one column per field of `FLIGHT_RECORD_SCHEMA`
+
+    Raises:
+        Exception if a record has no `firstSeen` or `lastSeen` epoch.
+    """
+    columns = {}
+    for field, dtype in FLIGHT_RECORD_SCHEMA.items():
+        values = [record.get(field) for record in records]
+        if dtype == "category":
+            columns[field] = pd.Categorical(values)
+            continue
+        try:
+            columns[field] = np.array(values, dtype=dtype)
+        except TypeError:
+            raise Exception(f"Flight records have a missing `{field}` value")
+    return pd.DataFrame(columns, copy=False)
+
+
+def flight_table_columns() -> list:
+    """Returns new sqlalchemy columns for the `opensky_flights` table."""
+    return [
+        Column(name, column_type, primary_key=primary_key)
+        for name, column_type, primary_key in FLIGHT_TABLE_SCHEMA
+    ]
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# Mean earth radius used for great-circle distances
+EARTH_RADIUS_KM = 6371.0088
+
+
+def parse_coordinates(coordinates: pd.Series) -> pd.DataFrame:
+    """
+    Parses airport reference coordinates into float latitude and longitude.
+
+    The airport reference stores positions as "longitude, latitude" strings.
+    Values that are missing or not numeric become NaN.
+
+    Args:
+        coordinates: "longitude, latitude" strings
+
+    Returns:
+        A dataframe with `latitude` and `longitude` float columns, on the
+        index of `coordinates`
+    """
+    parts = coordinates.astype(object).str.split(",", n=1)
+    return pd.DataFrame(
+        {
+            "latitude": pd.to_numeric(parts.str[1], errors="coerce").to_numpy(
+                dtype=float
+            ),
+            "longitude": pd.to_numeric(parts.str[0], errors="coerce").to_numpy(
+                dtype=float
+            ),
+        },
+        index=coordinates.index,
+    )
+
+
+def great_circle_distance_km(
+    latitude_1: np.ndarray,
+    longitude_1: np.ndarray,
+    latitude_2: np.ndarray,
+    longitude_2: np.ndarray,
+) -> np.ndarray:
+    """
+    Computes the haversine distance between two arrays of positions.
+
+    Args:
+        latitude_1: latitudes of the first positions in degrees
+        longitude_1: longitudes of the first positions in degrees
+        latitude_2: latitudes of the second positions in degrees
+        longitude_2: longitudes of the second positions in degrees
+
+    Returns:
+        The distances in kilometres, NaN where a position is missing
+    """
+    latitude_1, longitude_1, latitude_2, longitude_2 = (
+        np.radians(np.asarray(values, dtype=float))
+        for values in [latitude_1, longitude_1, latitude_2, longitude_2]
+    )
+    haversine = (
+        np.sin((latitude_2 - latitude_1) / 2) ** 2
+        + np.cos(latitude_1)
+        * np.cos(latitude_2)
+        * np.sin((longitude_2 - longitude_1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
@@ -1,12 +1,50 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 import pandas as pd
 from etl_project.connectors.opensky_flights import OpenSkyApiClient
+from etl_project.connectors.raw_archive import RawArchiveClient
 from pathlib import Path
 from sqlalchemy import Table, MetaData
 from etl_project.connectors.postgresql import PostgreSqlClient
+from etl_project.assets.flight_schema import FLIGHT_RECORD_SCHEMA, build_flights_frame
+from etl_project.assets.geodesy import great_circle_distance_km
+from etl_project.assets.callsigns import split_callsigns
+from etl_project.assets.reference_data import match_airport_reference
+from etl_project.assets.airport_index import AirportSpatialIndex, infer_airports
+from etl_project.assets.opensky_tracks import match_track_endpoints
+from etl_project.assets.aircraft_registry import AircraftRegistry
 from datetime import datetime, timezone, timedelta
 import logging
 import numpy as np
 
+# Fields of a `/flights/all` record used by `transform_flight_data`
+FLIGHT_FIELDS = list(FLIGHT_RECORD_SCHEMA)
+
+# In-memory representations supported by the extract, transform and load
+# functions. The arrow engine needs the optional pyarrow dependency.
+ENGINES = ["pandas", "arrow"]
+
+
+def _arrow_engine():
+    """
+    Imports the Arrow implementations on first use.
+
+    Raises:
+        Exception if pyarrow cannot be imported.
+    """
+    try:
+        from etl_project.assets import opensky_flights_arrow
+    except ImportError as e:
+        raise Exception(f"The arrow engine requires pyarrow: {e}")
+    return opensky_flights_arrow
+
+
+def _validate_engine(engine: str) -> None:
+    if engine not in ENGINES:
+        raise Exception(f"Please specify a correct engine: {ENGINES}")
+
 
 def _generate_hourly_datetime_ranges(
     start_datetime: str,
@@ -60,128 +98,725 @@ def _generate_hourly_datetime_ranges(
     return date_range
 
 
+def _iter_window_records(
+    opensky_client: OpenSkyApiClient,
+    start_time: int,
+    end_time: int,
+    raw_archive: RawArchiveClient = None,
+) -> Iterator[dict]:
+    """
+    Streams the flights of a window, keeping only `FLIGHT_FIELDS`.
+
+    When `raw_archive` is provided the complete raw records are written to it
+    as they stream past.
+    """
+    if raw_archive is None:
+        yield from opensky_client.iter_flights(
+            start_time=start_time, end_time=end_time, fields=FLIGHT_FIELDS
+        )
+        return
+    for record in raw_archive.archive_flights(
+        start_time=start_time,
+        end_time=end_time,
+        records=opensky_client.iter_flights(start_time=start_time, end_time=end_time),
+    ):
+        yield {field: record.get(field) for field in FLIGHT_FIELDS}
+
+
+def _build_flights(records: list[dict], engine: str):
+    """Builds a dataframe, or a `pyarrow.Table` for the arrow engine."""
+    if engine == "arrow":
+        return _arrow_engine().build_flights_table(records=records)
+    return build_flights_frame(records=records)
+
+
 def extract_opensky_flights(
     opensky_client: OpenSkyApiClient,
     start_datetime: str,
     end_datetime: str,
+    raw_archive: RawArchiveClient = None,
+    airports: list[str] = None,
+    airport_max_workers: int = 4,
+    engine: str = "pandas",
 ) -> pd.DataFrame:
     """
     Perform extraction using OpenSky API.
+
+    `opensky_client` may also be a `RawArchiveClient` to replay archived
+    responses instead of calling the API. When `raw_archive` is provided the
+    raw response is written to it before the typed dataframe is built. When
+    `airports` is provided only the arrivals and departures of those airports
+    are extracted, see `extract_opensky_airport_flights`; the raw archive only
+    holds `/flights/all` responses and is not written in that case.
+
+    With `engine="arrow"` the response is streamed straight into a
+    `pyarrow.Table` in record batches instead of building a dataframe.
     """
-    data = opensky_client.get_flights(
-        start_time=int(
-            datetime.strptime(start_datetime, "%Y-%m-%d %H:%M")
-            .replace(tzinfo=timezone.utc)
-            .timestamp()
-        ),
-        end_time=int(
-            datetime.strptime(end_datetime, "%Y-%m-%d %H:%M")
-            .replace(tzinfo=timezone.utc)
-            .timestamp()
-        ),
+    _validate_engine(engine)
+    if airports:
+        df = extract_opensky_airport_flights(
+            opensky_client=opensky_client,
+            airports=airports,
+            start_datetime=start_datetime,
+            end_datetime=end_datetime,
+            max_workers=airport_max_workers,
+        )
+        if engine == "arrow":
+            return _arrow_engine().flights_table_from_pandas(df_flights=df)
+        return df
+    start_time = int(
+        datetime.strptime(start_datetime, "%Y-%m-%d %H:%M")
+        .replace(tzinfo=timezone.utc)
+        .timestamp()
     )
-    df = pd.json_normalize(data=data)
-    return df
+    end_time = int(
+        datetime.strptime(end_datetime, "%Y-%m-%d %H:%M")
+        .replace(tzinfo=timezone.utc)
+        .timestamp()
+    )
+    if engine == "arrow":
+        records = _iter_window_records(
+            opensky_client=opensky_client,
+            start_time=start_time,
+            end_time=end_time,
+            raw_archive=raw_archive,
+        )
+        return _arrow_engine().build_flights_table(records=records)
+    data = opensky_client.get_flights(start_time=start_time, end_time=end_time)
+    if raw_archive is not None:
+        raw_archive.put_flights(start_time=start_time, end_time=end_time, records=data)
+    return build_flights_frame(records=data)
+
 
+def extract_opensky_airport_flights(
+    opensky_client: OpenSkyApiClient,
+    airports: list[str],
+    start_datetime: str,
+    end_datetime: str,
+    max_workers: int = 4,
+) -> pd.DataFrame:
+    """
+    Perform extraction of the arrivals and departures of a set of airports.
 
-def transform_flight_data(df_flights: pd.DataFrame):
-    """Performs transformation on dataframe produced from extract() function."""
-    df_flights["firstSeen"] = pd.to_datetime(
-        df_flights["firstSeen"], unit="s", utc=True
+    Requests for each airport and direction run in parallel. A flight between
+    two of the listed airports is returned by both requests and is only kept
+    once.
+
+    Args:
+        opensky_client: OpenSky API client
+        airports: ICAO identifiers of the airports, e.g. ["YPPH", "YPJT"]
+        start_datetime: provide a str with the format "yyyy-mm-dd HH:MM"
+        end_datetime: provide a str with the format "yyyy-mm-dd HH:MM"
+        max_workers: maximum number of requests in flight at the same time
+
+    Returns:
+        A dataframe of the deduplicated flights
+    """
+    start_time = int(
+        datetime.strptime(start_datetime, "%Y-%m-%d %H:%M")
+        .replace(tzinfo=timezone.utc)
+        .timestamp()
+    )
+    end_time = int(
+        datetime.strptime(end_datetime, "%Y-%m-%d %H:%M")
+        .replace(tzinfo=timezone.utc)
+        .timestamp()
     )
-    df_flights["lastSeen"] = pd.to_datetime(df_flights["lastSeen"], unit="s", utc=True)
-    df_flights["estDepartureAirportDistance"] = np.sqrt(
-        df_flights["estDepartureAirportHorizDistance"] ** 2
-        + df_flights["estDepartureAirportVertDistance"] ** 2
+    airport_requests = [
+        (get_airport_flights, airport)
+        for airport in airports
+        for get_airport_flights in [
+            opensky_client.get_arrivals_by_airport,
+            opensky_client.get_departures_by_airport,
+        ]
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        responses = executor.map(
+            lambda request: request[0](
+                airport=request[1], start_time=start_time, end_time=end_time
+            ),
+            airport_requests,
+        )
+        data = [flight for response in responses for flight in response]
+    df = build_flights_frame(records=data)
+    return df.drop_duplicates(
+        subset=["icao24", "firstSeen", "lastSeen"], ignore_index=True
     )
-    df_flights["estArrivalAirportDistance"] = np.sqrt(
-        df_flights["estArrivalAirportHorizDistance"] ** 2
-        + df_flights["estArrivalAirportVertDistance"] ** 2
+
+
+def extract_opensky_flights_batches(
+    opensky_client: OpenSkyApiClient,
+    start_datetime: str,
+    end_datetime: str,
+    batch_size: int = 10000,
+    raw_archive: RawArchiveClient = None,
+    engine: str = "pandas",
+) -> Iterator[pd.DataFrame]:
+    """
+    Perform a streaming extraction using OpenSky API.
+
+    The response is decoded incrementally and only the fields used by
+    `transform_flight_data` are kept, so peak memory is bounded by
+    `batch_size` rather than by the size of the window. When `raw_archive` is
+    provided the complete raw records are written to it as they stream past.
+
+    Args:
+        opensky_client: OpenSky API client, or a `RawArchiveClient` to replay
+        start_datetime: provide a str with the format "yyyy-mm-dd HH:MM"
+        end_datetime: provide a str with the format "yyyy-mm-dd HH:MM"
+        batch_size: maximum number of flights per dataframe
+        raw_archive: optional raw archive to land the responses in
+        engine: one of `ENGINES`; "arrow" yields `pyarrow.Table` batches
+
+    Yields:
+        Dataframes of at most `batch_size` flights with `FLIGHT_FIELDS` columns
+    """
+    _validate_engine(engine)
+    start_time = int(
+        datetime.strptime(start_datetime, "%Y-%m-%d %H:%M")
+        .replace(tzinfo=timezone.utc)
+        .timestamp()
     )
-    df_flights["estDepartureAirportDistance"] = (
-        df_flights["estDepartureAirportDistance"].round(2).astype(float)
+    end_time = int(
+        datetime.strptime(end_datetime, "%Y-%m-%d %H:%M")
+        .replace(tzinfo=timezone.utc)
+        .timestamp()
     )
-    df_flights["estArrivalAirportDistance"] = (
-        df_flights["estArrivalAirportDistance"].round(2).astype(float)
+    records = _iter_window_records(
+        opensky_client=opensky_client,
+        start_time=start_time,
+        end_time=end_time,
+        raw_archive=raw_archive,
     )
-    df_flights_transformed = df_flights[
-        [
-            "icao24",
-            "firstSeen",
-            "estDepartureAirport",
-            "lastSeen",
-            "estArrivalAirport",
-            "callsign",
-            "estDepartureAirportDistance",
-            "estArrivalAirportDistance",
-        ]
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield _build_flights(records=batch, engine=engine)
+            batch = []
+    if batch:
+        yield _build_flights(records=batch, engine=engine)
+
+
+def extract_opensky_flights_chunked(
+    opensky_client: OpenSkyApiClient,
+    date_ranges: list[dict[str, datetime]],
+    chunk_size: int = 50000,
+    raw_archive: RawArchiveClient = None,
+    engine: str = "pandas",
+) -> Iterator[tuple]:
+    """
+    Stream the flights of many windows as chunks of a fixed number of flights.
+
+    The windows are streamed one after the other and their flights are
+    re-batched into chunks of `chunk_size`, regardless of window boundaries,
+    so memory stays capped by the chunk size whatever the date range. A
+    window whose extraction fails is reported and skipped; flights it already
+    produced are still part of the chunks.
+
+    Usage example:
+        for df, windows, finished in extract_opensky_flights_chunked(
+            opensky_client=opensky_client, date_ranges=hourly_ranges
+        ):
+            ...
+
+    Args:
+        opensky_client: OpenSky API client, or a `RawArchiveClient` to replay
+        date_ranges: ranges as produced by `_generate_hourly_datetime_ranges`
+        chunk_size: maximum number of flights per chunk
+        raw_archive: optional raw archive to land the responses in
+        engine: one of `ENGINES`
+
+    Yields:
+        A tuple of (dataframe, windows, finished). `windows` are the ranges
+        with flights in the chunk. `finished` lists a (date_range, flights,
+        error) tuple for every window that ended since the previous chunk,
+        where `error` is None unless its extraction failed.
+    """
+    _validate_engine(engine)
+    batch = []
+    batch_windows = []
+    finished = []
+    for date_range in date_ranges:
+        window_records = 0
+        error = None
+        # windows are requested at minute resolution like the other extractors
+        start_time, end_time = (
+            int(date_range[key].replace(second=0, microsecond=0).timestamp())
+            for key in ["start_time", "end_time"]
+        )
+        try:
+            for record in _iter_window_records(
+                opensky_client=opensky_client,
+                start_time=start_time,
+                end_time=end_time,
+                raw_archive=raw_archive,
+            ):
+                # a window is only carried into the next chunk while it streams
+                if not batch_windows or batch_windows[-1] is not date_range:
+                    batch_windows.append(date_range)
+                batch.append(record)
+                window_records += 1
+                if len(batch) == chunk_size:
+                    yield _build_flights(
+                        records=batch, engine=engine
+                    ), batch_windows, finished
+                    batch, batch_windows, finished = [], [], []
+        except Exception as e:
+            error = e
+        finished.append((date_range, window_records, error))
+    if batch or finished:
+        yield _build_flights(records=batch, engine=engine), batch_windows, finished
+
+
+async def extract_opensky_flights_concurrently(
+    opensky_client: OpenSkyApiClient,
+    date_ranges: list[dict[str, datetime]],
+    max_concurrency: int = 8,
+    raw_archive: RawArchiveClient = None,
+    airports: list[str] = None,
+    engine: str = "pandas",
+):
+    """
+    Extract many datetime ranges concurrently and yield them in window order.
+
+    Requests run on a bounded thread pool sharing the client's keep-alive
+    session. At most `max_concurrency` windows are in flight or buffered ahead
+    of the consumer, so results are handed on in the same order as
+    `date_ranges` without holding the whole backfill in memory.
+
+    Usage example:
+        async for date_range, df, error in extract_opensky_flights_concurrently(
+            opensky_client=opensky_client, date_ranges=hourly_ranges
+        ):
+            ...
+
+    Args:
+        opensky_client: OpenSky API client
+        date_ranges: ranges as produced by `_generate_hourly_datetime_ranges`
+        max_concurrency: maximum number of windows extracted at the same time
+        raw_archive: optional raw archive to land the responses in
+        airports: optional airports to extract arrivals and departures for
+        engine: one of `ENGINES`
+
+    Yields:
+        A tuple of (date_range, dataframe, error). `dataframe` is None and
+        `error` holds the exception when the extraction of a window failed.
+    """
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+
+        def _submit(date_range: dict[str, datetime]) -> asyncio.Future:
+            return loop.run_in_executor(
+                executor,
+                lambda: extract_opensky_flights(
+                    opensky_client=opensky_client,
+                    start_datetime=date_range["start_time"].strftime("%Y-%m-%d %H:%M"),
+                    end_datetime=date_range["end_time"].strftime("%Y-%m-%d %H:%M"),
+                    raw_archive=raw_archive,
+                    airports=airports,
+                    engine=engine,
+                ),
+            )
+
+        pending_ranges = iter(date_ranges)
+        in_flight = deque()
+        for date_range in pending_ranges:
+            in_flight.append((date_range, _submit(date_range)))
+            if len(in_flight) >= max_concurrency:
+                break
+        while in_flight:
+            date_range, future = in_flight.popleft()
+            try:
+                df = await future
+                error = None
+            except Exception as e:
+                df = None
+                error = e
+            next_range = next(pending_ranges, None)
+            if next_range is not None:
+                in_flight.append((next_range, _submit(next_range)))
+            yield date_range, df, error
+
+
+def transform_flight_data(
+    df_flights: pd.DataFrame, engine: str = "pandas"
+) -> pd.DataFrame:
+    """
+    Performs transformation on dataframe produced from extract() function.
+
+    The airport distances are computed in one vectorised pass and the output
+    columns are projected once. The input dataframe is left untouched and its
+    unchanged columns are shared rather than copied. With `engine="arrow"`
+    `df_flights` is a `pyarrow.Table` and the same is done with Arrow compute
+    kernels.
+
+    Callsigns are also split into an `airline_icao` designator and a
+    `flight_number`, see `split_callsigns`.
+    """
+    _validate_engine(engine)
+    if engine == "arrow":
+        return _arrow_engine().transform_flight_table(flights=df_flights)
+    df_callsigns = split_callsigns(df_flights["callsign"])
+    return pd.DataFrame(
+        {
+            "icao24": df_flights["icao24"],
+            "firstSeen": pd.to_datetime(df_flights["firstSeen"], unit="s", utc=True),
+            "estDepartureAirport": df_flights["estDepartureAirport"],
+            "lastSeen": pd.to_datetime(df_flights["lastSeen"], unit="s", utc=True),
+            "estArrivalAirport": df_flights["estArrivalAirport"],
+            "callsign": df_flights["callsign"],
+            "airline_icao": df_callsigns["airline_icao"],
+            "flight_number": df_callsigns["flight_number"],
+            "estDepartureAirportDistance": np.hypot(
+                df_flights["estDepartureAirportHorizDistance"].to_numpy(dtype=float),
+                df_flights["estDepartureAirportVertDistance"].to_numpy(dtype=float),
+            ).round(2),
+            "estArrivalAirportDistance": np.hypot(
+                df_flights["estArrivalAirportHorizDistance"].to_numpy(dtype=float),
+                df_flights["estArrivalAirportVertDistance"].to_numpy(dtype=float),
+            ).round(2),
+        },
+        copy=False,
+    )
+
+
+# Columns of the airport reference added for each end of a flight, with the
+# suffix of the enriched column
+AIRPORT_ENRICHMENT_COLUMNS = {
+    "type": "airport_type",
+    "name": "airport_name",
+    "iso_country": "country",
+    "latitude": "latitude",
+    "longitude": "longitude",
+}
+
+
+def _factorize_keys(*keys: pd.Series) -> tuple[pd.Index, list[np.ndarray]]:
+    """
+    Factorizes key columns together over their shared distinct keys.
+
+    Returns:
+        A tuple of the distinct keys and, for each key column, the position
+        of every key in them (-1 for null keys)
+    """
+    categoricals = [pd.Categorical(key_column) for key_column in keys]
+    distinct_keys = categoricals[0].categories
+    for categorical in categoricals[1:]:
+        distinct_keys = distinct_keys.union(categorical.categories)
+    return distinct_keys, [
+        categorical.set_categories(distinct_keys).codes for categorical in categoricals
     ]
-    return df_flights_transformed
-
-
-def enrich_airport_data(df_flights_transformed, df_airports):
-    merged_departure = df_flights_transformed.merge(
-        df_airports, left_on="estDepartureAirport", right_on="ident", how="left"
-    ).drop("ident", axis=1)
-    merged_departure = merged_departure.rename(
-        columns={
-            "type": "departure_airport_type",
-            "name": "departure_airport_name",
-            "elevation_ft": "departure_elevation_ft",
-            "continent": "departure_continent",
-            "iso_country": "departure_country",
-            "iso_region": "departure_iso_region",
-            "municipality": "departure_municipality",
-            "icao_code": "departure_icao_code",
-            "iata_code": "departure_iata_code",
-            "gps_code": "departure_gps_code",
-            "local_code": "departure_local_code",
-            "coordinates": "departure_coordinates",
-        }
+
+
+def _take_reference(matched: pd.DataFrame, *codes: np.ndarray) -> list[dict]:
+    """
+    Expands reference rows matched to distinct keys to one value per flight.
+
+    Each column is factorized once and gathered with a take for every codes
+    array. Float columns are expanded as float arrays and other columns as
+    categoricals.
+
+    Args:
+        matched: reference rows, one per distinct key, as a reindex by the
+            keys of `_factorize_keys` returns them
+        codes: positions in `matched` as returned by `_factorize_keys`
+
+    Returns:
+        For each codes array, a dictionary of column name to per-flight values
+    """
+    looked_up = [{} for _ in codes]
+    for column in matched.columns:
+        if matched[column].dtype == float:
+            # flights without a known key index the trailing NaN
+            values = np.append(matched[column].to_numpy(), np.nan)
+            for columns, row_codes in zip(looked_up, codes):
+                columns[column] = values[row_codes]
+            continue
+        value_codes, values = pd.factorize(matched[column])
+        # flights without a known key index the trailing -1 (null) code
+        value_codes = np.append(value_codes, -1)
+        dtype = pd.CategoricalDtype(values)
+        for columns, row_codes in zip(looked_up, codes):
+            columns[column] = pd.Categorical.from_codes(
+                value_codes[row_codes], dtype=dtype
+            )
+    return looked_up
+
+
+def _as_utc(timestamps: pd.Series):
+    """Returns timestamps as a UTC datetime array, without reparsing them."""
+    if isinstance(timestamps.dtype, pd.DatetimeTZDtype):
+        return timestamps.dt.tz_convert("UTC").array
+    return pd.to_datetime(timestamps, utc=True).array
+
+
+# Airport code columns filled by `infer_missing_airports`, with the track
+# endpoint they are inferred from and the flag marking inferred codes
+INFERRED_AIRPORT_COLUMNS = {
+    "estDepartureAirport": ("start", "departure_airport_inferred"),
+    "estArrivalAirport": ("end", "arrival_airport_inferred"),
+}
+
+
+def infer_missing_airports(
+    df_flights_transformed: pd.DataFrame,
+    df_tracks: pd.DataFrame,
+    airport_index: AirportSpatialIndex,
+    radius_km: float = None,
+    engine: str = "pandas",
+) -> pd.DataFrame:
+    """
+    Fills missing departure and arrival airports of flights with the airport
+    nearest to the first and last known position of their track.
+
+    Flights are matched with their track on `icao24` and `firstSeen`, and
+    all positions of flights missing an airport are queried in one batch,
+    see `AirportSpatialIndex.nearest`. Flights without a track or without an
+    airport within `radius_km` keep a null airport. The
+    `departure_airport_inferred` and `arrival_airport_inferred` columns mark
+    the inferred codes.
+
+    Args:
+        df_flights_transformed: flights produced by `transform_flight_data`
+        df_tracks: tracks of the flights as returned by `extract_opensky_tracks`
+        airport_index: index of the candidate airports, see `get_airport_index`
+        radius_km: search radius, defaults to the index's `max_radius_km`
+        engine: one of `ENGINES`; with "arrow" the flights and the result are
+            `pyarrow.Table` objects
+
+    Returns:
+        The flights with filled airport codes and the inferred flags
+    """
+    _validate_engine(engine)
+    if engine == "arrow":
+        return _arrow_engine().infer_missing_airports_table(
+            flights=df_flights_transformed,
+            df_tracks=df_tracks,
+            airport_index=airport_index,
+            radius_km=radius_km,
+            inferred_columns=INFERRED_AIRPORT_COLUMNS,
+        )
+    endpoints = match_track_endpoints(
+        icao24=df_flights_transformed["icao24"],
+        first_seen=df_flights_transformed["firstSeen"],
+        df_tracks=df_tracks,
     )
+    columns = {
+        column: df_flights_transformed[column].array
+        for column in df_flights_transformed.columns
+    }
+    for code_column, (endpoint, flag_column) in INFERRED_AIRPORT_COLUMNS.items():
+        codes, inferred = infer_airports(
+            codes=df_flights_transformed[code_column].to_numpy(dtype=object),
+            latitudes=endpoints[f"{endpoint}_latitude"].to_numpy(),
+            longitudes=endpoints[f"{endpoint}_longitude"].to_numpy(),
+            airport_index=airport_index,
+            radius_km=radius_km,
+        )
+        columns[code_column] = pd.Categorical(codes)
+        columns[flag_column] = inferred
+    return pd.DataFrame(columns, index=df_flights_transformed.index, copy=False)
+
 
-    final_merged = merged_departure.merge(
-        df_airports, left_on="estArrivalAirport", right_on="ident", how="left"
-    ).drop("ident", axis=1)
-    final_merged = final_merged.rename(
-        columns={
-            "type": "arrival_airport_type",
-            "name": "arrival_airport_name",
-            "elevation_ft": "arrival_elevation_ft",
-            "continent": "arrival_continent",
-            "iso_country": "arrival_country",
-            "iso_region": "arrival_iso_region",
-            "municipality": "arrival_municipality",
-            "icao_code": "arrival_icao_code",
-            "iata_code": "arrival_iata_code",
-            "gps_code": "arrival_gps_code",
-            "local_code": "arrival_local_code",
-            "coordinates": "arrival_coordinates",
-        }
+def enrich_airport_data(
+    df_flights_transformed: pd.DataFrame,
+    df_airports: pd.DataFrame,
+    engine: str = "pandas",
+) -> pd.DataFrame:
+    """
+    Adds the type, name, country, latitude and longitude of the departure and
+    arrival airports of each flight, the great-circle distance between them and the
+    duration of the flight.
+
+    The `departure_airport_inferred` and `arrival_airport_inferred` flags of
+    `infer_missing_airports` are kept, and are False when it was not run.
+
+    The departure and arrival codes are factorized together and their
+    distinct airports are looked up once in the `ident` index of the
+    reference, fetching only the enrichment columns. Each column is then
+    gathered for both ends of the flights with a take, and the output is
+    assembled in a single projection. Airport codes and the added columns
+    are categoricals, which repeat a handful of distinct values across every
+    flight. Airports missing from the reference have null values; the first
+    of duplicated `ident` entries is used.
+
+    `route_distance_km` is the haversine distance between the positions of
+    both airports, null when either is unknown, and
+    `flight_duration_seconds` is `lastSeen - firstSeen`. Both are computed
+    on whole columns.
+
+    Args:
+        df_flights_transformed: flights produced by `transform_flight_data`
+        df_airports: airport reference indexed by `ident` as returned by
+            `get_airport_reference`, or with `ident`, `type`, `name`,
+            `iso_country` and "longitude, latitude" `coordinates` columns
+        engine: one of `ENGINES`; with "arrow" the flights and the result are
+            `pyarrow.Table` objects and the added columns are dictionary encoded
+
+    Returns:
+        A dataframe with the columns of the `opensky_flights` table
+    """
+    _validate_engine(engine)
+    if engine == "arrow":
+        return _arrow_engine().enrich_airport_table(
+            flights=df_flights_transformed,
+            df_airports=df_airports,
+            enrichment_columns=AIRPORT_ENRICHMENT_COLUMNS,
+            flag_columns=[flag for _, flag in INFERRED_AIRPORT_COLUMNS.values()],
+        )
+    airport_codes, (departure_codes, arrival_codes) = _factorize_keys(
+        df_flights_transformed["estDepartureAirport"],
+        df_flights_transformed["estArrivalAirport"],
     )
-    columns_to_keep = [
-        "icao24",
-        "firstSeen",
-        "lastSeen",
-        "estDepartureAirport",
-        "estArrivalAirport",
+    matched = match_airport_reference(
+        df_airports, idents=airport_codes, columns=list(AIRPORT_ENRICHMENT_COLUMNS)
+    )
+    columns = {
+        "icao24": df_flights_transformed["icao24"].array,
+        "firstSeen": _as_utc(df_flights_transformed["firstSeen"]),
+        "lastSeen": _as_utc(df_flights_transformed["lastSeen"]),
+        "estDepartureAirport": pd.Categorical(
+            df_flights_transformed["estDepartureAirport"]
+        ),
+        "estArrivalAirport": pd.Categorical(
+            df_flights_transformed["estArrivalAirport"]
+        ),
+    }
+    for column in [
         "callsign",
+        "airline_icao",
+        "flight_number",
         "estDepartureAirportDistance",
         "estArrivalAirportDistance",
-        "departure_airport_type",
-        "departure_airport_name",
-        "departure_country",
-        "departure_coordinates",
-        "arrival_airport_type",
-        "arrival_airport_name",
-        "arrival_country",
-        "arrival_coordinates",
-    ]
-    df_filtered = final_merged[columns_to_keep]
-    df_filtered["firstSeen"] = df_filtered["firstSeen"].astype("datetime64[ns, UTC]")
-    df_filtered["lastSeen"] = df_filtered["lastSeen"].astype("datetime64[ns, UTC]")
+    ]:
+        columns[column] = df_flights_transformed[column].array
+    for _, flag_column in INFERRED_AIRPORT_COLUMNS.values():
+        columns[flag_column] = (
+            df_flights_transformed[flag_column].to_numpy(dtype=bool)
+            if flag_column in df_flights_transformed.columns
+            else np.zeros(len(df_flights_transformed), dtype=bool)
+        )
+    positions = {}
+    for prefix, looked_up in zip(
+        ["departure", "arrival"],
+        _take_reference(matched, departure_codes, arrival_codes),
+    ):
+        positions[prefix] = (looked_up["latitude"], looked_up["longitude"])
+        for column, values in looked_up.items():
+            columns[f"{prefix}_{AIRPORT_ENRICHMENT_COLUMNS[column]}"] = values
+    columns["route_distance_km"] = great_circle_distance_km(
+        *positions["departure"], *positions["arrival"]
+    ).round(2)
+    columns["flight_duration_seconds"] = np.asarray(
+        columns["lastSeen"] - columns["firstSeen"], dtype="timedelta64[s]"
+    ).astype(np.int64)
+    return pd.DataFrame(columns, copy=False)
+
+
+# Columns of the airline reference added to each flight, with the name of the
+# enriched column
+AIRLINE_ENRICHMENT_COLUMNS = {"name": "airline_name", "country": "airline_country"}
 
-    return df_filtered
+
+def enrich_airline_data(
+    df_flights_enriched: pd.DataFrame,
+    df_airlines: pd.DataFrame = None,
+    engine: str = "pandas",
+) -> pd.DataFrame:
+    """
+    Adds the name and country of the airline operating each flight.
+
+    Flights are matched on the `airline_icao` designator split from their
+    callsign, against the airline reference indexed by designator. Flights
+    without a designator or with an unknown one have null values. The added
+    columns are categoricals and the other columns are shared, not copied.
+
+    Args:
+        df_flights_enriched: flights produced by `enrich_airport_data`
+        df_airlines: airline reference as returned by `get_airline_reference`.
+            When omitted, the airline columns are added with null values.
+        engine: one of `ENGINES`; with "arrow" the flights and the result are
+            `pyarrow.Table` objects and the added columns are dictionary encoded
+
+    Returns:
+        A dataframe with the columns of the `opensky_flights` table
+    """
+    _validate_engine(engine)
+    if df_airlines is None:
+        df_airlines = pd.DataFrame(columns=list(AIRLINE_ENRICHMENT_COLUMNS), dtype=str)
+    df_airlines = df_airlines[list(AIRLINE_ENRICHMENT_COLUMNS)]
+    if engine == "arrow":
+        return _arrow_engine().enrich_airline_table(
+            flights=df_flights_enriched,
+            df_airlines=df_airlines,
+            enrichment_columns=AIRLINE_ENRICHMENT_COLUMNS,
+        )
+    columns = {
+        column: df_flights_enriched[column].array
+        for column in df_flights_enriched.columns
+    }
+    airline_codes, (codes,) = _factorize_keys(df_flights_enriched["airline_icao"])
+    (looked_up,) = _take_reference(df_airlines.reindex(airline_codes), codes)
+    for column, values in looked_up.items():
+        columns[AIRLINE_ENRICHMENT_COLUMNS[column]] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+# Columns of the aircraft registry added to each flight, with the name of the
+# enriched column
+AIRCRAFT_ENRICHMENT_COLUMNS = {
+    "typecode": "aircraft_type",
+    "manufacturername": "aircraft_manufacturer",
+    "operator": "aircraft_operator",
+}
+
+
+def enrich_aircraft_data(
+    df_flights_enriched: pd.DataFrame,
+    aircraft_registry: AircraftRegistry = None,
+    engine: str = "pandas",
+) -> pd.DataFrame:
+    """
+    Adds the type, manufacturer and operator of the aircraft of each flight.
+
+    Flights are matched on `icao24` with a binary search over the sorted keys
+    of the memory-mapped registry, see `AircraftRegistry.lookup_codes`.
+    Unknown aircraft have null values. The added columns are categoricals
+    built straight from the registry codes and the other columns are
+    shared, not copied.
+
+    Args:
+        df_flights_enriched: flights produced by `enrich_airline_data`
+        aircraft_registry: registry as returned by `get_aircraft_registry`.
+            When omitted, the aircraft columns are added with null values.
+        engine: one of `ENGINES`; with "arrow" the flights and the result are
+            `pyarrow.Table` objects and the added columns are dictionary encoded
+
+    Returns:
+        A dataframe with the columns of the `opensky_flights` table
+    """
+    _validate_engine(engine)
+    if engine == "arrow":
+        return _arrow_engine().enrich_aircraft_table(
+            flights=df_flights_enriched,
+            aircraft_registry=aircraft_registry,
+            enrichment_columns=AIRCRAFT_ENRICHMENT_COLUMNS,
+        )
+    columns = {
+        column: df_flights_enriched[column].array
+        for column in df_flights_enriched.columns
+    }
+    looked_up = {}
+    if aircraft_registry is not None:
+        looked_up = aircraft_registry.lookup(df_flights_enriched["icao24"])
+    for column, enriched_column in AIRCRAFT_ENRICHMENT_COLUMNS.items():
+        columns[enriched_column] = (
+            looked_up[column].array
+            if column in looked_up
+            else pd.Categorical([None] * len(df_flights_enriched), categories=[])
+        )
+    return pd.DataFrame(columns, index=df_flights_enriched.index, copy=False)
 
 
 def load(
@@ -190,6 +825,7 @@ def load(
     table: Table,
     metadata: MetaData,
     load_method: str = "overwrite",
+    engine: str = "pandas",
 ) -> None:
     """
     Load dataframe to a database.
@@ -200,8 +836,21 @@ def load(
         table: sqlalchemy table
         metadata: sqlalchemy metadata
         load_method: supports one of: [insert, upsert, overwrite]
+        engine: one of `ENGINES`; with "arrow" `df` is a `pyarrow.Table` that
+            is bulk loaded with COPY instead of row dictionaries
     """
-    data = df.to_dict(orient="records")
+    _validate_engine(engine)
+    if engine == "arrow":
+        _arrow_engine().load_table(
+            flights=df,
+            postgresql_client=postgresql_client,
+            table=table,
+            metadata=metadata,
+            load_method=load_method,
+        )
+        return
+    # NaN, NaT and null categories are loaded as NULL, not as float NaN
+    data = df.astype(object).where(df.notna(), None).to_dict(orient="records")
     logging.info(f"Loading data with method: {load_method}")
     logging.info(f"Data: {data}")
     logging.info(f"Table: {table}")
@@ -0,0 +1,365 @@
+import io
+from typing import Iterable, Iterator
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from sqlalchemy import Table, MetaData
+from etl_project.assets.flight_schema import FLIGHT_RECORD_SCHEMA
+from etl_project.assets.callsigns import CALLSIGN_PATTERN
+from etl_project.assets.reference_data import match_airport_reference
+from etl_project.assets.geodesy import great_circle_distance_km
+from etl_project.assets.airport_index import AirportSpatialIndex, infer_airports
+from etl_project.assets.opensky_tracks import match_track_endpoints
+from etl_project.assets.aircraft_registry import AircraftRegistry
+from etl_project.connectors.postgresql import PostgreSqlClient
+
+# Arrow engine of `etl_project.assets.opensky_flights`. The functions of that
+# module dispatch here when called with `engine="arrow"`; this module is only
+# imported then, so pyarrow stays an optional dependency.
+
+ARROW_TYPES = {
+    "object": pa.string(),
+    "int64": pa.int64(),
+    "float64": pa.float64(),
+    "category": pa.dictionary(pa.int32(), pa.string()),
+}
+FLIGHT_RECORD_ARROW_SCHEMA = pa.schema(
+    [(field, ARROW_TYPES[dtype]) for field, dtype in FLIGHT_RECORD_SCHEMA.items()]
+)
+
+
+def build_flights_table(records: Iterable[dict], batch_size: int = 65536) -> pa.Table:
+    """
+    Builds an Arrow table of flights from decoded `/flights/all` records.
+
+    Records are converted in record batches of `batch_size`, so only one batch
+    of Python dictionaries is alive at a time when `records` is a stream.
+
+    Args:
+        records: flights as yielded by `OpenSkyApiClient.iter_flights`
+        batch_size: number of records converted at a time
+
+    Returns:
+        A table with the columns of `FLIGHT_RECORD_ARROW_SCHEMA`
+    """
+    return pa.Table.from_batches(
+        list(iter_flight_batches(records=records, batch_size=batch_size)),
+        schema=FLIGHT_RECORD_ARROW_SCHEMA,
+    )
+
+
+def iter_flight_batches(
+    records: Iterable[dict], batch_size: int = 65536
+) -> Iterator[pa.RecordBatch]:
+    """Converts records into record batches of at most `batch_size` flights."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield pa.RecordBatch.from_pylist(batch, schema=FLIGHT_RECORD_ARROW_SCHEMA)
+            batch = []
+    if batch:
+        yield pa.RecordBatch.from_pylist(batch, schema=FLIGHT_RECORD_ARROW_SCHEMA)
+
+
+def flights_table_from_pandas(df_flights: pd.DataFrame) -> pa.Table:
+    """Converts a dataframe built by `build_flights_frame` to an Arrow table."""
+    return pa.Table.from_pandas(
+        df_flights, schema=FLIGHT_RECORD_ARROW_SCHEMA, preserve_index=False
+    )
+
+
+def _distance(horizontal: pa.ChunkedArray, vertical: pa.ChunkedArray):
+    return pc.round(
+        pc.sqrt(
+            pc.add(pc.multiply(horizontal, horizontal), pc.multiply(vertical, vertical))
+        ),
+        2,
+    )
+
+
+def transform_flight_table(flights: pa.Table) -> pa.Table:
+    """
+    Arrow version of `transform_flight_data`.
+
+    Unchanged columns are shared with the input table without copying.
+    Callsigns are split with a regular expression kernel.
+    """
+    timestamp = pa.timestamp("s", tz="UTC")
+    airline_icao, flight_number = pc.extract_regex(
+        pc.utf8_rtrim_whitespace(flights["callsign"]), pattern=CALLSIGN_PATTERN
+    ).flatten()
+    return pa.table(
+        {
+            "icao24": flights["icao24"],
+            "firstSeen": pc.cast(flights["firstSeen"], timestamp),
+            "estDepartureAirport": flights["estDepartureAirport"],
+            "lastSeen": pc.cast(flights["lastSeen"], timestamp),
+            "estArrivalAirport": flights["estArrivalAirport"],
+            "callsign": flights["callsign"],
+            "airline_icao": pc.dictionary_encode(airline_icao),
+            "flight_number": flight_number,
+            "estDepartureAirportDistance": _distance(
+                flights["estDepartureAirportHorizDistance"],
+                flights["estDepartureAirportVertDistance"],
+            ),
+            "estArrivalAirportDistance": _distance(
+                flights["estArrivalAirportHorizDistance"],
+                flights["estArrivalAirportVertDistance"],
+            ),
+        }
+    )
+
+
+def _reference_indices(
+    keys: pa.ChunkedArray, reference_keys: pa.Array
+) -> pa.ChunkedArray:
+    """
+    Returns the position of each key in `reference_keys`, null when missing.
+
+    Dictionary encoded keys are matched once per distinct value.
+    """
+    chunks = []
+    for chunk in keys.chunks:
+        if pa.types.is_dictionary(chunk.type):
+            dictionary_indices = pc.index_in(chunk.dictionary, value_set=reference_keys)
+            chunks.append(pc.take(dictionary_indices, chunk.indices))
+        else:
+            chunks.append(pc.index_in(chunk, value_set=reference_keys))
+    return pa.chunked_array(chunks, type=pa.int32())
+
+
+def _distinct_keys(*keys: pa.ChunkedArray) -> pd.Index:
+    """Returns the distinct non-null values of key columns."""
+    distinct = set()
+    for chunk in (chunk for key_column in keys for chunk in key_column.chunks):
+        if pa.types.is_dictionary(chunk.type):
+            chunk = chunk.dictionary
+        distinct.update(pc.unique(chunk).to_pylist())
+    distinct.discard(None)
+    return pd.Index(sorted(distinct), dtype=object)
+
+
+def infer_missing_airports_table(
+    flights: pa.Table,
+    df_tracks: pd.DataFrame,
+    airport_index: AirportSpatialIndex,
+    radius_km: float,
+    inferred_columns: dict[str, tuple[str, str]],
+) -> pa.Table:
+    """
+    Arrow version of `infer_missing_airports`.
+
+    Args:
+        flights: flights produced by `transform_flight_table`
+        df_tracks: tracks of the flights as returned by `extract_opensky_tracks`
+        airport_index: index of the candidate airports
+        radius_km: search radius, defaults to the index's `max_radius_km`
+        inferred_columns: airport code column to track endpoint and flag column
+    """
+    endpoints = match_track_endpoints(
+        icao24=flights["icao24"].to_pandas(),
+        first_seen=flights["firstSeen"].to_pandas(),
+        df_tracks=df_tracks,
+    )
+    for code_column, (endpoint, flag_column) in inferred_columns.items():
+        codes, inferred = infer_airports(
+            codes=flights[code_column].to_pandas().to_numpy(dtype=object),
+            latitudes=endpoints[f"{endpoint}_latitude"].to_numpy(),
+            longitudes=endpoints[f"{endpoint}_longitude"].to_numpy(),
+            airport_index=airport_index,
+            radius_km=radius_km,
+        )
+        flights = flights.set_column(
+            flights.schema.get_field_index(code_column),
+            code_column,
+            pc.dictionary_encode(pa.array(codes, type=pa.string(), from_pandas=True)),
+        ).append_column(flag_column, pa.array(inferred))
+    return flights
+
+
+def enrich_airport_table(
+    flights: pa.Table,
+    df_airports: pd.DataFrame,
+    enrichment_columns: dict[str, str],
+    flag_columns: list[str],
+) -> pa.Table:
+    """
+    Arrow version of `enrich_airport_data`.
+
+    Only the airports used by the flights are fetched from the reference.
+    Their string columns are dictionary encoded once and gathered with
+    `take`, so each flight only adds an index per column rather than a copy
+    of the airport's strings. The route distance reuses the numpy haversine
+    of the pandas engine on the gathered positions.
+
+    Args:
+        flights: flights produced by `transform_flight_table`
+        df_airports: airport reference with an `ident` column or index
+        enrichment_columns: reference column to enriched column suffix
+        flag_columns: boolean columns kept from the flights, False when missing
+    """
+    df_reference = match_airport_reference(
+        df_airports,
+        idents=_distinct_keys(
+            flights["estDepartureAirport"], flights["estArrivalAirport"]
+        ),
+        columns=list(enrichment_columns),
+    )
+    idents = pa.array(df_reference.index, type=pa.string(), from_pandas=True)
+    reference = {}
+    for column in enrichment_columns:
+        if df_reference[column].dtype == float:
+            reference[column] = pa.array(df_reference[column], from_pandas=True)
+        else:
+            reference[column] = pc.dictionary_encode(
+                pa.array(df_reference[column], type=pa.string(), from_pandas=True)
+            )
+
+    columns = {
+        column: flights[column]
+        for column in [
+            "icao24",
+            "firstSeen",
+            "lastSeen",
+            "estDepartureAirport",
+            "estArrivalAirport",
+            "callsign",
+            "airline_icao",
+            "flight_number",
+            "estDepartureAirportDistance",
+            "estArrivalAirportDistance",
+        ]
+    }
+    for column in flag_columns:
+        columns[column] = (
+            flights[column]
+            if column in flights.column_names
+            else pa.array(np.zeros(flights.num_rows, dtype=bool))
+        )
+    flight_positions = {}
+    for prefix, code_column in [
+        ("departure", "estDepartureAirport"),
+        ("arrival", "estArrivalAirport"),
+    ]:
+        indices = _reference_indices(flights[code_column], reference_keys=idents)
+        for column, suffix in enrichment_columns.items():
+            columns[f"{prefix}_{suffix}"] = pc.take(reference[column], indices)
+        flight_positions[prefix] = [
+            columns[f"{prefix}_{enrichment_columns[column]}"].to_numpy()
+            for column in ["latitude", "longitude"]
+        ]
+    columns["route_distance_km"] = pa.array(
+        great_circle_distance_km(
+            *flight_positions["departure"], *flight_positions["arrival"]
+        ).round(2),
+        from_pandas=True,
+    )
+    columns["flight_duration_seconds"] = pc.subtract(
+        pc.cast(flights["lastSeen"], pa.int64()),
+        pc.cast(flights["firstSeen"], pa.int64()),
+    )
+    return pa.table(columns)
+
+
+def enrich_airline_table(
+    flights: pa.Table,
+    df_airlines: pd.DataFrame,
+    enrichment_columns: dict[str, str],
+) -> pa.Table:
+    """
+    Arrow version of `enrich_airline_data`.
+
+    Args:
+        flights: flights produced by `enrich_airport_table`
+        df_airlines: airline reference indexed by designator
+        enrichment_columns: reference column to enriched column name
+    """
+    designators = pa.array(df_airlines.index, type=pa.string(), from_pandas=True)
+    indices = _reference_indices(flights["airline_icao"], reference_keys=designators)
+    for column, enriched_column in enrichment_columns.items():
+        reference = pc.dictionary_encode(
+            pa.array(df_airlines[column], type=pa.string(), from_pandas=True)
+        )
+        flights = flights.append_column(enriched_column, pc.take(reference, indices))
+    return flights
+
+
+def enrich_aircraft_table(
+    flights: pa.Table,
+    aircraft_registry: AircraftRegistry,
+    enrichment_columns: dict[str, str],
+) -> pa.Table:
+    """
+    Arrow version of `enrich_aircraft_data`.
+
+    The registry codes are used as the indices of dictionary arrays over the
+    registry values, so no string is copied per flight.
+
+    Args:
+        flights: flights produced by `enrich_airline_table`
+        aircraft_registry: registry as returned by `get_aircraft_registry`, or
+            None to add null columns
+        enrichment_columns: registry column to enriched column name
+    """
+    looked_up = {}
+    if aircraft_registry is not None:
+        looked_up = aircraft_registry.lookup_codes(flights["icao24"].to_numpy())
+    for column, enriched_column in enrichment_columns.items():
+        codes = looked_up.get(column, np.full(flights.num_rows, -1, dtype=np.int32))
+        values = aircraft_registry.values[column] if column in looked_up else []
+        flights = flights.append_column(
+            enriched_column,
+            pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes < 0),
+                pa.array(values, type=pa.string()),
+            ),
+        )
+    return flights
+
+
+def load_table(
+    flights: pa.Table,
+    postgresql_client: PostgreSqlClient,
+    table: Table,
+    metadata: MetaData,
+    load_method: str = "overwrite",
+) -> None:
+    """
+    Arrow version of `load`.
+
+    The table is written as csv straight from its Arrow buffers and bulk
+    loaded with COPY, without building a Python dictionary per row.
+
+    Raises:
+        Exception when an unknown load method is provided.
+    """
+    columns = [column.name for column in table.columns]
+    flights = flights.select(columns)
+    for index, field in enumerate(flights.schema):
+        if pa.types.is_dictionary(field.type):
+            flights = flights.set_column(
+                index, field.name, pc.cast(flights[field.name], field.type.value_type)
+            )
+    csv_file = io.BytesIO()
+    pa_csv.write_csv(flights, csv_file)
+    csv_file.seek(0)
+
+    if load_method == "insert":
+        postgresql_client.insert_csv(
+            csv_file=csv_file, columns=columns, table=table, metadata=metadata
+        )
+    elif load_method == "upsert":
+        postgresql_client.upsert_csv(
+            csv_file=csv_file, columns=columns, table=table, metadata=metadata
+        )
+    elif load_method == "overwrite":
+        postgresql_client.overwrite_csv(
+            csv_file=csv_file, columns=columns, table=table, metadata=metadata
+        )
+    else:
+        raise Exception(
+            "Please specify a correct load method: [insert, upsert, overwrite]"
+        )
@@ -0,0 +1,173 @@
+import logging
+import time
+import pandas as pd
+from etl_project.connectors.opensky_flights import OpenSkyApiClient
+
+# Order of the values in a `/states/all` state vector
+STATE_VECTOR_FIELDS = [
+    "icao24",
+    "callsign",
+    "origin_country",
+    "time_position",
+    "last_contact",
+    "longitude",
+    "latitude",
+    "baro_altitude",
+    "on_ground",
+    "velocity",
+    "true_track",
+    "vertical_rate",
+    "sensors",
+    "geo_altitude",
+    "squawk",
+    "spi",
+    "position_source",
+]
+
+# Greater Perth bounding box: (lamin, lomin, lamax, lomax)
+GREATER_PERTH_BBOX = (-32.6, 115.6, -31.4, 116.3)
+
+
+def extract_opensky_states(
+    opensky_client: OpenSkyApiClient, bbox: tuple[float, float, float, float]
+) -> pd.DataFrame:
+    """
+    Perform extraction of the current state vectors inside a bounding box.
+
+    Args:
+        opensky_client: OpenSky API client
+        bbox: bounding box as (lamin, lomin, lamax, lomax)
+
+    Returns:
+        A dataframe with one row per aircraft, the snapshot time in `time` and
+        one column per `STATE_VECTOR_FIELDS` entry.
+    """
+    lamin, lomin, lamax, lomax = bbox
+    data = opensky_client.get_states(lamin=lamin, lomin=lomin, lamax=lamax, lomax=lomax)
+    states = data.get("states") or []
+    df = pd.DataFrame(
+        [state[: len(STATE_VECTOR_FIELDS)] for state in states],
+        columns=STATE_VECTOR_FIELDS,
+    )
+    df.insert(0, "time", data.get("time"))
+    return df
+
+
+def transform_state_vectors(df_states: pd.DataFrame) -> pd.DataFrame:
+    """Performs transformation on dataframe produced from extract_opensky_states()."""
+    return pd.DataFrame(
+        {
+            "icao24": df_states["icao24"],
+            "snapshot_time": pd.to_datetime(df_states["time"], unit="s", utc=True),
+            "callsign": df_states["callsign"].str.strip(),
+            "origin_country": df_states["origin_country"],
+            "time_position": pd.to_datetime(
+                df_states["time_position"], unit="s", utc=True
+            ),
+            "last_contact": pd.to_datetime(
+                df_states["last_contact"], unit="s", utc=True
+            ),
+            "longitude": df_states["longitude"].astype(float),
+            "latitude": df_states["latitude"].astype(float),
+            "baro_altitude": df_states["baro_altitude"].astype(float),
+            "geo_altitude": df_states["geo_altitude"].astype(float),
+            "on_ground": df_states["on_ground"].astype(bool),
+            "velocity": df_states["velocity"].astype(float),
+            "true_track": df_states["true_track"].astype(float),
+            "vertical_rate": df_states["vertical_rate"].astype(float),
+            "squawk": df_states["squawk"],
+            "position_source": df_states["position_source"],
+        }
+    )
+
+
+class StateVectorBuffer:
+    """
+    Buffers polled state vectors in memory until they are due to be flushed.
+
+    A flush is due once `flush_interval_seconds` have passed since the last
+    flush, or once `max_rows` rows are buffered, whichever comes first. Failed
+    micro-batches put back with `restore` are kept up to `max_buffered_rows`
+    rows, beyond which the oldest state vectors are discarded so that a long
+    database outage cannot exhaust memory.
+
+    Args:
+        flush_interval_seconds: seconds between flushes
+        max_rows: number of buffered rows that forces an early flush
+        max_buffered_rows: maximum number of rows kept while loads fail,
+            defaults to 10 times `max_rows`
+    """
+
+    def __init__(
+        self,
+        flush_interval_seconds: float = 60,
+        max_rows: int = 50000,
+        max_buffered_rows: int = None,
+    ):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_rows = max_rows
+        self.max_buffered_rows = (
+            max_buffered_rows if max_buffered_rows is not None else 10 * max_rows
+        )
+        self.frames = []
+        self.rows = 0
+        self.last_flush = time.monotonic()
+
+    def add(self, df_states: pd.DataFrame) -> None:
+        if len(df_states):
+            self.frames.append(df_states)
+            self.rows += len(df_states)
+
+    def should_flush(self) -> bool:
+        return (
+            self.rows >= self.max_rows
+            or time.monotonic() - self.last_flush >= self.flush_interval_seconds
+        )
+
+    def restore(self, df_states: pd.DataFrame) -> None:
+        """
+        Puts back a micro-batch returned by `flush` whose load failed, ahead of
+        the state vectors buffered since, so it is retried by the next flush.
+        """
+        if len(df_states):
+            self.frames.insert(0, df_states)
+            self.rows += len(df_states)
+        self._discard_oldest()
+
+    def _discard_oldest(self) -> None:
+        """Drops the oldest buffered rows beyond `max_buffered_rows`."""
+        excess = self.rows - self.max_buffered_rows
+        if excess <= 0:
+            return
+        discarded = excess
+        while excess > 0:
+            if len(self.frames[0]) <= excess:
+                excess -= len(self.frames.pop(0))
+            else:
+                self.frames[0] = self.frames[0].iloc[excess:]
+                excess = 0
+        self.rows -= discarded
+        logging.warning(
+            f"State vector buffer is full, discarded the {discarded} oldest rows"
+        )
+
+    def flush(self) -> pd.DataFrame:
+        """
+        Empties the buffer.
+
+        When the returned micro-batch cannot be loaded, it should be handed
+        back with `restore`.
+
+        Returns:
+            The buffered state vectors, with repeated (icao24, snapshot_time)
+            rows removed so the micro-batch can be upserted.
+        """
+        frames = self.frames
+        self.frames = []
+        self.rows = 0
+        self.last_flush = time.monotonic()
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True).drop_duplicates(
+            subset=["icao24", "snapshot_time"], keep="last"
+        )
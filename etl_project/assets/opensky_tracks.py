@@ -0,0 +1,285 @@
+import logging
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from etl_project.connectors.opensky_flights import OpenSkyApiClient
+
+# Binary layout of an encoded track (little-endian, zlib compressed):
+#   header: format version (uint8), waypoint count (uint32), first time (int64),
+#           first latitude and longitude in 1e-5 degrees (2 x int32)
+#   then one packed column per field, all of `count` values:
+#   time, latitude and longitude deltas (int32), barometric altitude in metres
+#   (int32), true track in tenths of a degree (int16), on ground (uint8)
+TRACK_FORMAT_VERSION = 1
+TRACK_HEADER = struct.Struct("<BIqii")
+COORDINATE_SCALE = 1e5
+MISSING_ALTITUDE = np.iinfo(np.int32).min
+MISSING_TRACK = np.int16(-1)
+
+# Positions of the first and last waypoints of a track, see `track_endpoints`
+TRACK_ENDPOINT_COLUMNS = [
+    "start_latitude",
+    "start_longitude",
+    "end_latitude",
+    "end_longitude",
+]
+
+
+def positioned_waypoints(path: list[list]) -> list[list]:
+    """Returns the waypoints of a track with a time and a position."""
+    return [waypoint for waypoint in path if None not in waypoint[:3]]
+
+
+def encode_track_path(path: list[list]) -> bytes:
+    """
+    Encodes the waypoints of a track into a compact binary blob.
+
+    Time, latitude and longitude are stored as deltas from the previous
+    waypoint, which are small and compress well. Coordinates are quantised to
+    1e-5 degrees (about a metre). Waypoints without a position are dropped.
+
+    Args:
+        path: waypoints as returned by `OpenSkyApiClient.get_track`
+
+    Returns:
+        The encoded track
+    """
+    waypoints = np.array(
+        [waypoint[:6] for waypoint in positioned_waypoints(path)],
+        dtype=float,
+    ).reshape(-1, 6)
+    times = waypoints[:, 0].astype(np.int64)
+    latitudes = np.round(waypoints[:, 1] * COORDINATE_SCALE).astype(np.int64)
+    longitudes = np.round(waypoints[:, 2] * COORDINATE_SCALE).astype(np.int64)
+    altitudes = np.where(
+        np.isnan(waypoints[:, 3]), MISSING_ALTITUDE, np.round(waypoints[:, 3])
+    ).astype("<i4")
+    true_tracks = np.where(
+        np.isnan(waypoints[:, 4]), MISSING_TRACK, np.round(waypoints[:, 4] * 10)
+    ).astype("<i2")
+    on_ground = np.nan_to_num(waypoints[:, 5]).astype(np.uint8)
+
+    header = TRACK_HEADER.pack(
+        TRACK_FORMAT_VERSION,
+        len(waypoints),
+        int(times[0]) if len(times) else 0,
+        int(latitudes[0]) if len(latitudes) else 0,
+        int(longitudes[0]) if len(longitudes) else 0,
+    )
+    columns = [
+        np.diff(times, prepend=times[:1]).astype("<i4"),
+        np.diff(latitudes, prepend=latitudes[:1]).astype("<i4"),
+        np.diff(longitudes, prepend=longitudes[:1]).astype("<i4"),
+        altitudes,
+        true_tracks,
+        on_ground,
+    ]
+    return zlib.compress(header + b"".join(column.tobytes() for column in columns))
+
+
+def decode_track_path(encoded_path: bytes) -> pd.DataFrame:
+    """
+    Decodes a blob produced by `encode_track_path`.
+
+    Returns:
+        A dataframe with one row per waypoint and `time`, `latitude`,
+        `longitude`, `baro_altitude`, `true_track` and `on_ground` columns
+    """
+    raw = zlib.decompress(encoded_path)
+    version, count, first_time, first_latitude, first_longitude = (
+        TRACK_HEADER.unpack_from(raw)
+    )
+    if version != TRACK_FORMAT_VERSION:
+        raise Exception(f"Unsupported track format version: {version}")
+    offset = TRACK_HEADER.size
+    columns = []
+    for dtype in ["<i4", "<i4", "<i4", "<i4", "<i2", "u1"]:
+        column = np.frombuffer(raw, dtype=dtype, count=count, offset=offset)
+        offset += column.nbytes
+        columns.append(column)
+    time_deltas, latitude_deltas, longitude_deltas, altitudes, tracks, ground = columns
+    return pd.DataFrame(
+        {
+            "time": pd.to_datetime(
+                first_time + np.cumsum(time_deltas, dtype=np.int64), unit="s", utc=True
+            ),
+            "latitude": (first_latitude + np.cumsum(latitude_deltas, dtype=np.int64))
+            / COORDINATE_SCALE,
+            "longitude": (first_longitude + np.cumsum(longitude_deltas, dtype=np.int64))
+            / COORDINATE_SCALE,
+            "baro_altitude": np.where(
+                altitudes == MISSING_ALTITUDE, np.nan, altitudes.astype(float)
+            ),
+            "true_track": np.where(tracks == MISSING_TRACK, np.nan, tracks / 10),
+            "on_ground": ground.astype(bool),
+        }
+    )
+
+
+def track_endpoints(path: list[list]) -> tuple[float, float, float, float]:
+    """
+    Returns the first and last known positions of a track.
+
+    Args:
+        path: waypoints as returned by `OpenSkyApiClient.get_track`
+
+    Returns:
+        The start latitude and longitude and the end latitude and longitude,
+        NaN when the track has no waypoint with a position
+    """
+    positions = [waypoint[1:3] for waypoint in path if None not in waypoint[1:3]]
+    if not positions:
+        return np.nan, np.nan, np.nan, np.nan
+    return (*positions[0], *positions[-1])
+
+
+def match_track_endpoints(
+    icao24: pd.Series, first_seen: pd.Series, df_tracks: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Aligns the track endpoints of `extract_opensky_tracks` with flights.
+
+    Tracks are matched on `icao24` and `firstSeen`.
+
+    Args:
+        icao24: icao24 of each flight
+        first_seen: UTC `firstSeen` timestamp of each flight
+        df_tracks: tracks as returned by `extract_opensky_tracks`
+
+    Returns:
+        A dataframe of the `TRACK_ENDPOINT_COLUMNS` of each flight, NaN for
+        flights without a track
+    """
+    track_keys = pd.MultiIndex.from_arrays(
+        [df_tracks["icao24"], pd.to_datetime(df_tracks["firstSeen"], utc=True)]
+    )
+    unique = ~track_keys.duplicated()
+    positions = track_keys[unique].get_indexer(
+        pd.MultiIndex.from_arrays(
+            [
+                np.asarray(icao24, dtype=object),
+                pd.to_datetime(first_seen, utc=True),
+            ]
+        )
+    )
+    # flights without a track index the trailing NaN
+    return pd.DataFrame(
+        {
+            column: np.append(df_tracks[column].to_numpy(dtype=float)[unique], np.nan)[
+                positions
+            ]
+            for column in TRACK_ENDPOINT_COLUMNS
+        }
+    )
+
+
+def drop_stored_flights(
+    df_flights: pd.DataFrame, df_stored_tracks: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Drops the flights whose track is already stored.
+
+    Tracks are matched on `icao24` and `firstSeen`.
+
+    Args:
+        df_flights: flights with `icao24` and `firstSeen` columns
+        df_stored_tracks: stored tracks with `icao24` and `firstSeen` columns
+
+    Returns:
+        The flights without a stored track
+    """
+    stored_keys = pd.MultiIndex.from_arrays(
+        [
+            np.asarray(df_stored_tracks["icao24"], dtype=object),
+            pd.to_datetime(df_stored_tracks["firstSeen"], utc=True),
+        ]
+    )
+    flight_keys = pd.MultiIndex.from_arrays(
+        [
+            np.asarray(df_flights["icao24"], dtype=object),
+            pd.to_datetime(df_flights["firstSeen"], utc=True),
+        ]
+    )
+    return df_flights[~flight_keys.isin(stored_keys)]
+
+
+def extract_opensky_tracks(
+    opensky_client: OpenSkyApiClient,
+    df_flights: pd.DataFrame,
+    max_workers: int = 4,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Perform extraction of the tracks of a set of flights.
+
+    Each flight's track is requested at the midpoint of the flight, with at
+    most `max_workers` requests in flight. Flights without a known track are
+    skipped, flights whose request fails are returned separately so they can
+    be retried.
+
+    Args:
+        opensky_client: OpenSky API client
+        df_flights: flights with `icao24`, `firstSeen` and `lastSeen` columns,
+            as produced by `transform_flight_data`
+        max_workers: maximum number of requests in flight at the same time
+
+    Returns:
+        A tuple of a dataframe with one row per flight, its encoded `path` and
+        the positions of its first and last waypoints, and the flights whose
+        track request failed
+    """
+    first_seen = pd.to_datetime(df_flights["firstSeen"], utc=True)
+    last_seen = pd.to_datetime(df_flights["lastSeen"], utc=True)
+    midpoints = (
+        first_seen.astype("int64") // 2 + last_seen.astype("int64") // 2
+    ) // 10**9
+
+    def _get_track(flight):
+        icao24, snapshot_time = flight
+        try:
+            return opensky_client.get_track(
+                icao24=icao24, snapshot_time=int(snapshot_time)
+            )
+        except Exception as e:
+            logging.warning(f"Failed to extract track for {icao24}: {e}")
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tracks = list(executor.map(_get_track, zip(df_flights["icao24"], midpoints)))
+    failed = np.array([isinstance(track, Exception) for track in tracks], dtype=bool)
+
+    rows = [
+        {
+            "icao24": icao24,
+            "firstSeen": flight_first_seen,
+            "lastSeen": flight_last_seen,
+            "callsign": (track.get("callsign") or "").strip() or None,
+            "start_time": pd.to_datetime(track.get("startTime"), unit="s", utc=True),
+            "end_time": pd.to_datetime(track.get("endTime"), unit="s", utc=True),
+            "waypoint_count": len(positioned_waypoints(track.get("path") or [])),
+            "path": encode_track_path(track.get("path") or []),
+            **dict(
+                zip(TRACK_ENDPOINT_COLUMNS, track_endpoints(track.get("path") or []))
+            ),
+        }
+        for icao24, flight_first_seen, flight_last_seen, track in zip(
+            df_flights["icao24"], first_seen, last_seen, tracks
+        )
+        if isinstance(track, dict)
+    ]
+    df_tracks = pd.DataFrame(
+        rows,
+        columns=[
+            "icao24",
+            "firstSeen",
+            "lastSeen",
+            "callsign",
+            "start_time",
+            "end_time",
+            "waypoint_count",
+            "path",
+            *TRACK_ENDPOINT_COLUMNS,
+        ],
+    )
+    return df_tracks, df_flights[failed]
@@ -0,0 +1,260 @@
+import argparse
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable
+import numpy as np
+import pandas as pd
+from etl_project.assets.callsigns import read_airline_reference
+from etl_project.assets.compiled_arrays import (
+    compiled_folder_path,
+    decode_strings,
+    encode_strings,
+    file_signature,
+    is_compiled,
+    read_manifest,
+    save_array,
+    write_manifest,
+)
+from etl_project.assets.geodesy import parse_coordinates
+
+# Columns of the OurAirports `airport-codes.csv` file used for enrichment
+AIRPORT_REFERENCE_COLUMNS = ["ident", "type", "name", "iso_country", "coordinates"]
+
+# The compiled airport reference is a folder of `.npy` arrays next to the csv:
+# the sorted idents and the distinct values of each string column as NUL
+# separated UTF-8 blobs, an int32 array of value codes per string column
+# aligned with the idents (-1 for null), and a float64 array per float column.
+# `manifest.json` records the csv it was compiled from.
+COMPILED_REFERENCE_VERSION = 2
+
+
+def index_airport_reference(df_airports: pd.DataFrame) -> pd.DataFrame:
+    """
+    Indexes an airport reference by unique `ident`.
+
+    A reference that is already indexed by `ident` is returned unchanged;
+    otherwise the first of duplicated `ident` entries is kept.
+    """
+    if "ident" not in df_airports.columns:
+        return df_airports
+    return df_airports.drop_duplicates(subset="ident").set_index("ident")
+
+
+def with_airport_positions(df_airports: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replaces the "longitude, latitude" `coordinates` strings of an airport
+    reference with float `latitude` and `longitude` columns.
+
+    A reference without `coordinates` is returned unchanged.
+    """
+    if "coordinates" not in df_airports.columns:
+        return df_airports
+    return pd.concat(
+        [
+            df_airports.drop(columns="coordinates"),
+            parse_coordinates(df_airports["coordinates"]),
+        ],
+        axis=1,
+    )
+
+
+def match_airport_reference(
+    df_airports: pd.DataFrame, idents: pd.Index, columns: list[str]
+) -> pd.DataFrame:
+    """
+    Fetches the reference rows of some airports, e.g. those used by a window.
+
+    Coordinates are only parsed for those rows when the reference was not
+    read by `read_airport_reference`.
+
+    Args:
+        df_airports: airport reference with an `ident` column or index
+        idents: airports to fetch, unknown ones get null values
+        columns: reference columns to fetch
+
+    Returns:
+        A dataframe of `columns` indexed by `idents`
+    """
+    matched = index_airport_reference(df_airports).reindex(index=idents)
+    return with_airport_positions(matched)[columns]
+
+
+def read_airport_reference(airport_codes_path: str) -> pd.DataFrame:
+    """
+    Reads the airport reference columns used for enrichment.
+
+    Coordinates are parsed once into float `latitude` and `longitude`.
+
+    Args:
+        airport_codes_path: path to an OurAirports `airport-codes.csv` file
+
+    Returns:
+        A dataframe indexed by unique `ident` with the columns of
+        `AIRPORT_REFERENCE_COLUMNS`, with `latitude` and `longitude` in place
+        of `coordinates`
+    """
+    # "NA" is the country code of Namibia, only empty fields are null
+    df_airports = pd.read_csv(
+        airport_codes_path,
+        usecols=AIRPORT_REFERENCE_COLUMNS,
+        dtype=str,
+        keep_default_na=False,
+        na_values=[""],
+    )
+    return with_airport_positions(
+        index_airport_reference(df_airports[AIRPORT_REFERENCE_COLUMNS])
+    )
+
+
+def compiled_reference_path(airport_codes_path: str) -> Path:
+    """Returns the folder holding the compiled form of an airport reference."""
+    return compiled_folder_path(airport_codes_path)
+
+
+def compile_airport_reference(
+    airport_codes_path: str, compiled_path: str = None
+) -> Path:
+    """
+    Compiles an airport reference csv into memory-mappable NumPy arrays.
+
+    The manifest is written last, so an interrupted build is detected as
+    stale and rebuilt by the next `load_airport_reference`.
+
+    Args:
+        airport_codes_path: path to an OurAirports `airport-codes.csv` file
+        compiled_path: output folder, defaults to `compiled_reference_path`
+
+    Returns:
+        The folder of the compiled reference
+    """
+    folder = Path(compiled_path or compiled_reference_path(airport_codes_path))
+    folder.mkdir(parents=True, exist_ok=True)
+    signature = file_signature(airport_codes_path)
+    df_airports = read_airport_reference(airport_codes_path).sort_index()
+
+    save_array(folder, "ident", encode_strings(list(df_airports.index)))
+    float_columns = []
+    for column in df_airports.columns:
+        if df_airports[column].dtype == float:
+            float_columns.append(column)
+            save_array(folder, column, df_airports[column].to_numpy())
+            continue
+        codes, values = pd.factorize(df_airports[column])
+        save_array(folder, f"{column}.codes", codes.astype(np.int32))
+        save_array(folder, f"{column}.values", encode_strings(list(values)))
+
+    write_manifest(
+        folder,
+        source_signature=signature,
+        version=COMPILED_REFERENCE_VERSION,
+        columns=list(df_airports.columns),
+        float_columns=float_columns,
+        rows=len(df_airports),
+    )
+    return folder
+
+
+def read_compiled_airport_reference(compiled_path: str) -> pd.DataFrame:
+    """
+    Reads a reference compiled by `compile_airport_reference`.
+
+    Arrays are memory-mapped and each distinct value is decoded once, so
+    this is much faster than parsing the csv.
+
+    Returns:
+        The same dataframe as `read_airport_reference`
+    """
+    folder = Path(compiled_path)
+    manifest = read_manifest(folder, version=COMPILED_REFERENCE_VERSION)
+    if manifest is None:
+        raise Exception(f"No compiled airport reference found in {folder}")
+    columns = {}
+    for column in manifest["columns"]:
+        if column in manifest["float_columns"]:
+            columns[column] = np.load(folder / f"{column}.npy", mmap_mode="r")
+            continue
+        codes = np.load(folder / f"{column}.codes.npy", mmap_mode="r")
+        values = decode_strings(np.load(folder / f"{column}.values.npy", mmap_mode="r"))
+        # null codes (-1) take the trailing NaN
+        columns[column] = np.array(values + [np.nan], dtype=object)[codes]
+    idents = decode_strings(np.load(folder / "ident.npy", mmap_mode="r"))
+    return pd.DataFrame(columns, index=pd.Index(idents, dtype=object, name="ident"))
+
+
+def load_airport_reference(airport_codes_path: str) -> pd.DataFrame:
+    """
+    Reads the airport reference from its compiled form, compiling it first
+    when the csv is newer than the compiled reference or was never compiled.
+
+    When the compiled reference cannot be written, e.g. on a read-only
+    volume, the csv is read directly.
+
+    Args:
+        airport_codes_path: path to an OurAirports `airport-codes.csv` file
+
+    Returns:
+        The same dataframe as `read_airport_reference`
+    """
+    folder = compiled_reference_path(airport_codes_path)
+    if not is_compiled(airport_codes_path, folder, version=COMPILED_REFERENCE_VERSION):
+        try:
+            compile_airport_reference(airport_codes_path, compiled_path=folder)
+        except OSError as e:
+            logging.warning(
+                f"Could not compile the airport reference to {folder}, reading the csv: {e}"
+            )
+            return read_airport_reference(airport_codes_path)
+    return read_compiled_airport_reference(folder)
+
+
+_cached_references = {}
+_cached_references_lock = threading.Lock()
+
+
+def get_cached_reference(path: str, reader: Callable[[str], Any]) -> Any:
+    """
+    Returns the reference read from a file, reading it once per process.
+
+    The file is read again only when its modification time or size changes,
+    so every window of a run shares one parsed reference. The returned
+    reference is shared and must not be modified.
+
+    Args:
+        path: path to the reference file
+        reader: function reading the file, e.g. into a dataframe
+    """
+    key = (reader, os.path.abspath(path))
+    signature = file_signature(path)
+    with _cached_references_lock:
+        cached = _cached_references.get(key)
+        if cached is None or cached[0] != signature:
+            cached = (signature, reader(path))
+            _cached_references[key] = cached
+        return cached[1]
+
+
+def get_airport_reference(airport_codes_path: str) -> pd.DataFrame:
+    """Returns the cached airport reference, see `load_airport_reference`."""
+    return get_cached_reference(path=airport_codes_path, reader=load_airport_reference)
+
+
+def get_airline_reference(airline_codes_path: str) -> pd.DataFrame:
+    """Returns the cached airline reference, see `read_airline_reference`."""
+    return get_cached_reference(path=airline_codes_path, reader=read_airline_reference)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compile an airport reference csv for fast loading."
+    )
+    parser.add_argument("airport_codes_path")
+    parser.add_argument("--compiled-path", default=None)
+    args = parser.parse_args()
+    print(
+        compile_airport_reference(
+            airport_codes_path=args.airport_codes_path,
+            compiled_path=args.compiled_path,
+        )
+    )
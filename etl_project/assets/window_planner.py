@@ -0,0 +1,218 @@
+import json
+import math
+import os
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import requests
+from etl_project.connectors.opensky_flights import OpenSkyApiError
+
+# Status codes of a window rejected for being too large or too slow to serve
+OVERSIZED_WINDOW_STATUS_CODES = {413, 500, 502, 503, 504}
+
+
+def is_oversized_window_error(error: Exception) -> bool:
+    """
+    Tells whether an extraction error suggests the window is too large.
+
+    Read timeouts, responses cut short and 413 or 5xx responses are worth
+    retrying as shorter windows. Other errors, e.g. an exhausted credit
+    budget or a rejected request, would fail the same way for every half.
+    """
+    if isinstance(error, requests.Timeout):
+        return not isinstance(error, requests.ConnectTimeout)
+    if isinstance(error, requests.exceptions.ChunkedEncodingError):
+        return True
+    return (
+        isinstance(error, OpenSkyApiError)
+        and error.status_code in OVERSIZED_WINDOW_STATUS_CODES
+    )
+
+
+class AdaptiveWindowPlanner:
+    """
+    Plans extraction windows from the flight density observed in past runs.
+
+    The planner keeps an exponentially weighted average of flights per hour
+    for each UTC hour of the day. Hours expected to return more than
+    `target_records` flights are split into shorter windows, while sparse
+    consecutive hours are merged up to `max_span_seconds` (the longest interval
+    accepted by `/flights/all`). Hours without history are planned as plain
+    one-hour windows. Windows that are rejected or time out at run time can be
+    split in two with `split`.
+
+    Args:
+        density_path: optional json file used to persist the learnt densities
+        target_records: number of flights aimed for per request
+        max_span_seconds: longest window the planner will produce
+        min_span_seconds: shortest window the planner will produce
+        max_request_seconds: requests slower than this count as too slow
+        smoothing: weight of the latest observation in the running average
+    """
+
+    def __init__(
+        self,
+        density_path: str = None,
+        target_records: int = 20000,
+        max_span_seconds: int = 7200,
+        min_span_seconds: int = 600,
+        max_request_seconds: float = 60,
+        smoothing: float = 0.3,
+    ):
+        self.density_path = density_path
+        self.target_records = target_records
+        self.max_span_seconds = max_span_seconds
+        self.min_span_seconds = min_span_seconds
+        self.max_request_seconds = max_request_seconds
+        self.smoothing = smoothing
+        self.density = self._read_density()
+
+    def _read_density(self) -> dict:
+        if self.density_path is None or not Path(self.density_path).exists():
+            return {}
+        with open(self.density_path) as density_file:
+            return json.load(density_file)
+
+    def save(self) -> None:
+        """Persists the learnt densities."""
+        if self.density_path is None:
+            return
+        Path(self.density_path).parent.mkdir(parents=True, exist_ok=True)
+        temp_path = f"{self.density_path}.tmp"
+        with open(temp_path, "w") as density_file:
+            json.dump(self.density, density_file, indent=2, sort_keys=True)
+        os.replace(temp_path, self.density_path)
+
+    def estimate(self, start_time: datetime, end_time: datetime) -> float:
+        """
+        Estimates the number of flights in a window.
+
+        Returns:
+            The estimated number of flights, or None without history for the
+            hour of day of `start_time`.
+        """
+        flights_per_hour = self.density.get(str(start_time.hour))
+        if flights_per_hour is None:
+            return None
+        return flights_per_hour * (end_time - start_time).total_seconds() / 3600
+
+    def record(
+        self, date_range: dict[str, datetime], records: int, seconds: float
+    ) -> None:
+        """
+        Learns from an extracted window.
+
+        Windows that were too slow are recorded as if they were proportionally
+        denser, so that the same hour is split further on the next run.
+
+        Args:
+            date_range: the extracted window
+            records: number of flights returned
+            seconds: time taken by the request
+        """
+        span_hours = (
+            date_range["end_time"] - date_range["start_time"]
+        ).total_seconds() / 3600
+        if span_hours <= 0:
+            return
+        flights_per_hour = records / span_hours
+        if seconds > self.max_request_seconds:
+            flights_per_hour *= seconds / self.max_request_seconds
+        hour = str(date_range["start_time"].hour)
+        previous = self.density.get(hour)
+        if previous is None:
+            self.density[hour] = flights_per_hour
+        else:
+            self.density[hour] = (
+                self.smoothing * flights_per_hour + (1 - self.smoothing) * previous
+            )
+
+    def _divide(
+        self, start_time: datetime, end_time: datetime, pieces: int
+    ) -> list[dict[str, datetime]]:
+        """Divides a window into pieces aligned on whole minutes."""
+        span_seconds = (end_time - start_time).total_seconds()
+        pieces = max(1, min(pieces, int(span_seconds // self.min_span_seconds)))
+        piece_seconds = math.ceil(span_seconds / pieces / 60) * 60
+        windows = []
+        piece_start = start_time
+        while piece_start < end_time:
+            piece_end = min(piece_start + timedelta(seconds=piece_seconds), end_time)
+            windows.append({"start_time": piece_start, "end_time": piece_end})
+            piece_start = piece_end
+        return windows
+
+    def plan(self, start_datetime: str, end_datetime: str) -> list[dict[str, datetime]]:
+        """
+        Plans the windows covering a datetime range.
+
+        Args:
+            start_datetime: provide a str with the format "yyyy-mm-dd HH:MM"
+            end_datetime: provide a str with the format "yyyy-mm-dd HH:MM"
+
+        Returns:
+            A list of dictionaries with `start_time` and `end_time` datetime objects
+
+        Raises:
+            Exception when incorrect input datetime string format is provided.
+        """
+        if start_datetime is None or end_datetime is None:
+            raise Exception(
+                "Please provide valid datetimes `YYYY-MM-DD HH:MM` for start_datetime and end_datetime."
+            )
+        start_time = datetime.strptime(start_datetime, "%Y-%m-%d %H:%M").replace(
+            tzinfo=timezone.utc
+        )
+        end_time = datetime.strptime(end_datetime, "%Y-%m-%d %H:%M").replace(
+            tzinfo=timezone.utc
+        )
+
+        windows = []
+        merged_start = None
+        merged_end = None
+        merged_records = 0.0
+
+        def _flush():
+            if merged_start is not None:
+                windows.append({"start_time": merged_start, "end_time": merged_end})
+
+        hour_start = start_time
+        while hour_start < end_time:
+            hour_end = min(hour_start + timedelta(hours=1), end_time)
+            estimate = self.estimate(hour_start, hour_end)
+            if estimate is None or estimate > self.target_records:
+                _flush()
+                merged_start = None
+                pieces = (
+                    1 if estimate is None else math.ceil(estimate / self.target_records)
+                )
+                windows.extend(self._divide(hour_start, hour_end, pieces))
+            else:
+                if merged_start is not None and (
+                    merged_records + estimate > self.target_records
+                    or (hour_end - merged_start).total_seconds() > self.max_span_seconds
+                ):
+                    _flush()
+                    merged_start = None
+                if merged_start is None:
+                    merged_start = hour_start
+                    merged_records = 0.0
+                merged_end = hour_end
+                merged_records += estimate
+            hour_start = hour_end
+        _flush()
+        return windows
+
+    def split(self, date_range: dict[str, datetime]) -> list[dict[str, datetime]]:
+        """
+        Splits a window in two halves aligned on whole minutes.
+
+        Returns:
+            The two halves, or an empty list if the window is already as short
+            as `min_span_seconds` allows.
+        """
+        span_seconds = (
+            date_range["end_time"] - date_range["start_time"]
+        ).total_seconds()
+        if span_seconds < 2 * self.min_span_seconds:
+            return []
+        return self._divide(date_range["start_time"], date_range["end_time"], 2)
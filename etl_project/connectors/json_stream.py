@@ -0,0 +1,85 @@
+import codecs
+import json
+from typing import Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(
+    chunks: Iterable[bytes], fields: list[str] = None
+) -> Iterator[dict]:
+    """
+    Incrementally decodes a top-level JSON array of objects.
+
+    Only the text of the object currently being decoded is buffered, so memory
+    use depends on the chunk size rather than on the size of the whole array.
+
+    Usage example:
+        for record in iter_json_array(response.iter_content(65536), fields=["icao24"]):
+            ...
+
+    Args:
+        chunks: the raw bytes of the array, in any chunking
+        fields: optional list of keys to keep from each object. Missing keys
+            are returned as None.
+
+    Yields:
+        One dictionary per array element.
+
+    Raises:
+        ValueError if the payload is not a JSON array or is truncated.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    started = False
+    finished = False
+    chunks = iter(chunks)
+    exhausted = False
+
+    while not finished:
+        # skip separators between elements
+        while position < len(buffer) and (
+            buffer[position] in _WHITESPACE or (started and buffer[position] == ",")
+        ):
+            position += 1
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                finished = True
+                continue
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise ValueError("Truncated JSON array")
+            else:
+                position = end
+                if fields is not None:
+                    record = {field: record.get(field) for field in fields}
+                yield record
+                continue
+        elif exhausted:
+            raise ValueError("Truncated JSON array")
+
+        # need more data: drop the consumed text and append the next chunk
+        chunk = next(chunks, None)
+        buffer = buffer[position:]
+        position = 0
+        if chunk is None:
+            exhausted = True
+            buffer += text_decoder.decode(b"", final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+
+    # consume the rest of the payload so that wrapped readers see its end
+    trailing = [buffer[position + 1 :]]
+    trailing.extend(text_decoder.decode(chunk) for chunk in chunks)
+    if any(text.strip(_WHITESPACE) for text in trailing):
+        raise ValueError("Unexpected data after the JSON array")
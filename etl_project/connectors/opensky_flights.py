@@ -1,9 +1,222 @@
+import json
+import logging
+import random
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from typing import Iterator
+from etl_project.connectors.json_stream import iter_json_array
+from etl_project.connectors.opensky_rate_limiter import OpenSkyRateLimiter
+from etl_project.connectors.opensky_response_cache import OpenSkyResponseCache
+
+
+class OpenSkyApiError(Exception):
+    """Raised when the OpenSky API answers with an unexpected status code."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class OpenSkyApiClient:
-    def __init__(self):
-        self.base_url = "https://opensky-network.org/api"
+    """
+    A client for the OpenSky Network REST API.
+
+    The client owns a pooled keep-alive session so that consecutive requests
+    reuse the same TCP/TLS connection, and asks the server for gzip/deflate
+    compressed responses.
+
+    Args:
+        pool_connections: number of host connection pools to cache
+        pool_maxsize: maximum number of connections kept alive per host
+        connect_timeout: seconds to wait for a connection to be established
+        read_timeout: seconds to wait between bytes received from the server
+        rate_limiter: optional credit-aware rate limiter shared by all requests
+        max_attempts: maximum number of attempts per request, including the first
+        backoff_base_seconds: base delay of the jittered exponential backoff
+        backoff_max_seconds: upper bound of a single backoff delay
+        cache: optional on-disk cache of responses for finalised windows
+        base_url: root url of the API, e.g. a local stand-in server
+    """
+
+    RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        pool_connections: int = 1,
+        pool_maxsize: int = 10,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 120.0,
+        rate_limiter: OpenSkyRateLimiter = None,
+        max_attempts: int = 5,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 60.0,
+        cache: OpenSkyResponseCache = None,
+        base_url: str = "https://opensky-network.org/api",
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.rate_limiter = rate_limiter
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.cache = cache
+        self.last_request_stats = {}
+
+    def close(self) -> None:
+        """Close the pooled session and release its connections."""
+        self.session.close()
+
+    def _count_connections(self, url: str) -> int:
+        """Count the connections opened so far by the pools serving the url."""
+        pools = self.session.get_adapter(url).poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def _backoff_seconds(self, attempt: int, response=None) -> float:
+        """
+        Returns the delay before the next attempt.
+
+        Uses full-jitter exponential backoff, but never waits less than the
+        server asked for in a Retry-After header.
+        """
+        delay = random.uniform(
+            0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2**attempt)
+        )
+        if response is not None:
+            retry_after = response.headers.get(
+                "Retry-After",
+                response.headers.get(OpenSkyRateLimiter.RETRY_AFTER_HEADER),
+            )
+            if retry_after is not None:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+        return delay
+
+    def _send(
+        self,
+        endpoint: str,
+        params: dict,
+        stream: bool = False,
+        not_found_ok: bool = False,
+    ) -> requests.Response:
+        """
+        Send a GET request, retrying connection errors, timeouts, 429 and 5xx
+        responses with backoff up to `max_attempts` attempts.
+
+        Raises:
+            OpenSkyApiError if response code is not 200 after the last attempt.
+        """
+        url = f"{self.base_url}{endpoint}"
+        for attempt in range(self.max_attempts):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(endpoint=endpoint, params=params)
+            try:
+                response = self.session.get(
+                    url=url, params=params, timeout=self.timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt + 1 == self.max_attempts:
+                    raise
+                delay = self._backoff_seconds(attempt=attempt)
+                logging.warning(
+                    f"Request to {url} failed: {e}. Retrying in {delay:.1f} seconds"
+                )
+                time.sleep(delay)
+                continue
+            if self.rate_limiter is not None:
+                self.rate_limiter.update_from_response(headers=response.headers)
+            if response.status_code == 200 or (
+                not_found_ok and response.status_code == 404
+            ):
+                return response
+            if (
+                response.status_code not in self.RETRYABLE_STATUS_CODES
+                or attempt + 1 == self.max_attempts
+            ):
+                break
+            delay = self._backoff_seconds(attempt=attempt, response=response)
+            logging.warning(
+                f"Request to {url} returned {response.status_code}. Retrying in {delay:.1f} seconds"
+            )
+            time.sleep(delay)
+        raise OpenSkyApiError(
+            f"Failed to extract data from OpenSky API. Status Code: {response.status_code}. Response: {response.text}",
+            status_code=response.status_code,
+        )
+
+    def _get(self, endpoint: str, params: dict, not_found_ok: bool = False):
+        """
+        Send a GET request through the pooled session and decode the JSON body.
+
+        Responses for finalised windows are served from and stored in the
+        cache when one is configured, without spending any credits. Credits are
+        spent from the rate limiter before every attempt and reconciled with
+        the rate limit headers of each response. Records bytes on the wire,
+        decode time and whether the connection was reused in
+        `last_request_stats`.
+
+        Args:
+            endpoint: API path, e.g. `/flights/all`
+            params: query parameters of the request
+            not_found_ok: return an empty list when the API answers 404, which
+                is how the airport and aircraft endpoints report no flights
+
+        Raises:
+            Exception if response code is not 200.
+        """
+        use_cache = self.cache is not None and self.cache.is_cacheable(
+            endpoint=endpoint, params=params
+        )
+        if use_cache:
+            payload = self.cache.get(endpoint=endpoint, params=params)
+            if payload is not None:
+                decode_start = time.perf_counter()
+                data = json.loads(payload)
+                self.last_request_stats = {
+                    "endpoint": endpoint,
+                    "params": params,
+                    "cache_hit": True,
+                    "decoded_bytes": len(payload),
+                    "decode_seconds": round(time.perf_counter() - decode_start, 4),
+                }
+                logging.info(f"OpenSky request stats: {self.last_request_stats}")
+                return data
+        url = f"{self.base_url}{endpoint}"
+        connections_before = self._count_connections(url)
+        request_start = time.perf_counter()
+        response = self._send(
+            endpoint=endpoint, params=params, not_found_ok=not_found_ok
+        )
+        if response.status_code == 404:
+            return []
+        request_seconds = time.perf_counter() - request_start
+        decode_start = time.perf_counter()
+        data = response.json()
+        decode_seconds = time.perf_counter() - decode_start
+        if use_cache:
+            self.cache.put(endpoint=endpoint, params=params, payload=response.content)
+        self.last_request_stats = {
+            "url": response.url,
+            "status_code": response.status_code,
+            "cache_hit": False,
+            "content_encoding": response.headers.get("Content-Encoding", "identity"),
+            "wire_bytes": response.raw.tell() or len(response.content),
+            "decoded_bytes": len(response.content),
+            "request_seconds": round(request_seconds, 4),
+            "decode_seconds": round(decode_seconds, 4),
+            "connection_reused": self._count_connections(url) == connections_before,
+        }
+        logging.info(f"OpenSky request stats: {self.last_request_stats}")
+        return data
 
     def get_flights(self, start_time: int, end_time: int) -> list[dict]:
         """
@@ -17,16 +230,192 @@ class OpenSkyApiClient:
             A list of flights between the start and end times
 
         Raises:
-            Exception if response code is not 200.
+            Exception if response code is not 200 after all retry attempts.
         """
-        url = f"{self.base_url}/flights/all"
+        endpoint = "/flights/all"
         params = {"begin": start_time, "end": end_time}
-        print(f"Request URL: {url}")
+        print(f"Request URL: {self.base_url}{endpoint}")
         print(f"Request Parameters: {params}")
-        response = requests.get(url=url, params=params)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise Exception(
-                f"Failed to extract data from OpenSky API. Status Code: {response.status_code}. Response: {response.text}"
+        return self._get(endpoint=endpoint, params=params)
+
+    def _get_airport_flights(
+        self, endpoint: str, airport: str, start_time: int, end_time: int
+    ) -> list[dict]:
+        params = {"airport": airport, "begin": start_time, "end": end_time}
+        print(f"Request URL: {self.base_url}{endpoint}")
+        print(f"Request Parameters: {params}")
+        return self._get(endpoint=endpoint, params=params, not_found_ok=True)
+
+    def get_arrivals_by_airport(
+        self, airport: str, start_time: int, end_time: int
+    ) -> list[dict]:
+        """
+        Get the flights that arrived at an airport in a specific time range.
+
+        Args:
+            airport: ICAO identifier of the airport, e.g. `YPPH`
+            start_time: start time in epoch seconds
+            end_time: end time in epoch seconds
+
+        Returns:
+            A list of flights, empty when none arrived in the time range
+
+        Raises:
+            Exception if response code is not 200 after all retry attempts.
+        """
+        return self._get_airport_flights(
+            endpoint="/flights/arrival",
+            airport=airport,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+    def get_departures_by_airport(
+        self, airport: str, start_time: int, end_time: int
+    ) -> list[dict]:
+        """
+        Get the flights that departed from an airport in a specific time range.
+
+        Args:
+            airport: ICAO identifier of the airport, e.g. `YPPH`
+            start_time: start time in epoch seconds
+            end_time: end time in epoch seconds
+
+        Returns:
+            A list of flights, empty when none departed in the time range
+
+        Raises:
+            Exception if response code is not 200 after all retry attempts.
+        """
+        return self._get_airport_flights(
+            endpoint="/flights/departure",
+            airport=airport,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+    def get_track(self, icao24: str, snapshot_time: int = 0) -> dict:
+        """
+        Get the trajectory of an aircraft for the flight active at a given time.
+
+        Args:
+            icao24: ICAO 24-bit transponder address in lower-case hex
+            snapshot_time: any epoch second between the start and end of the
+                flight. 0 returns the live track.
+
+        Returns:
+            A dictionary with `icao24`, `startTime`, `endTime`, `callsign` and a
+            `path` of [time, latitude, longitude, baro_altitude, true_track,
+            on_ground] waypoints, or None when no track is known.
+
+        Raises:
+            Exception if response code is not 200 after all retry attempts.
+        """
+        endpoint = "/tracks/all"
+        params = {"icao24": icao24, "time": snapshot_time}
+        track = self._get(endpoint=endpoint, params=params, not_found_ok=True)
+        return track or None
+
+    def get_states(
+        self,
+        lamin: float,
+        lomin: float,
+        lamax: float,
+        lomax: float,
+        snapshot_time: int = None,
+    ) -> dict:
+        """
+        Get the state vectors of all aircraft inside a bounding box.
+
+        Args:
+            lamin: lower bound for the latitude in decimal degrees
+            lomin: lower bound for the longitude in decimal degrees
+            lamax: upper bound for the latitude in decimal degrees
+            lomax: upper bound for the longitude in decimal degrees
+            snapshot_time: optional epoch seconds of the snapshot. Defaults to now.
+
+        Returns:
+            A dictionary with the snapshot `time` and a list of `states`,
+            each state vector being a list of values.
+
+        Raises:
+            Exception if response code is not 200 after all retry attempts.
+        """
+        endpoint = "/states/all"
+        params = {"lamin": lamin, "lomin": lomin, "lamax": lamax, "lomax": lomax}
+        if snapshot_time is not None:
+            params["time"] = snapshot_time
+        return self._get(endpoint=endpoint, params=params)
+
+    def iter_flights(
+        self,
+        start_time: int,
+        end_time: int,
+        fields: list[str] = None,
+        chunk_size: int = 65536,
+    ) -> Iterator[dict]:
+        """
+        Stream the flights for a specific time range one record at a time.
+
+        The response body is decoded incrementally while it is downloaded, so
+        only one chunk and one record are held in memory at any time.
+
+        Args:
+            start_time: start time in epoch seconds
+            end_time: end time in epoch seconds
+            fields: optional list of keys to keep from each flight
+            chunk_size: number of bytes read from the response at a time
+
+        Yields:
+            A dictionary per flight between the start and end times
+
+        Raises:
+            Exception if response code is not 200 after all retry attempts.
+        """
+        endpoint = "/flights/all"
+        params = {"begin": start_time, "end": end_time}
+        use_cache = self.cache is not None and self.cache.is_cacheable(
+            endpoint=endpoint, params=params
+        )
+        if use_cache:
+            chunks = self.cache.get_stream(
+                endpoint=endpoint, params=params, chunk_size=chunk_size
             )
+            if chunks is not None:
+                records = 0
+                for record in iter_json_array(chunks=chunks, fields=fields):
+                    records += 1
+                    yield record
+                self.last_request_stats = {
+                    "endpoint": endpoint,
+                    "params": params,
+                    "cache_hit": True,
+                    "records": records,
+                }
+                logging.info(f"OpenSky request stats: {self.last_request_stats}")
+                return
+        print(f"Request URL: {self.base_url}{endpoint}")
+        print(f"Request Parameters: {params}")
+        request_start = time.perf_counter()
+        with self._send(endpoint=endpoint, params=params, stream=True) as response:
+            chunks = response.iter_content(chunk_size=chunk_size)
+            if use_cache:
+                chunks = self.cache.put_stream(
+                    endpoint=endpoint, params=params, chunks=chunks
+                )
+            records = 0
+            for record in iter_json_array(chunks=chunks, fields=fields):
+                records += 1
+                yield record
+            self.last_request_stats = {
+                "url": response.url,
+                "status_code": response.status_code,
+                "cache_hit": False,
+                "content_encoding": response.headers.get(
+                    "Content-Encoding", "identity"
+                ),
+                "wire_bytes": response.raw.tell(),
+                "records": records,
+                "request_seconds": round(time.perf_counter() - request_start, 4),
+            }
+        logging.info(f"OpenSky request stats: {self.last_request_stats}")
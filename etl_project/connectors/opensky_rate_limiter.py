@@ -0,0 +1,243 @@
+import fcntl
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Estimated credits charged per request. `/states/all` is charged by the area of
+# the bounding box in square degrees; the flights endpoints are charged per
+# started partition of the requested interval.
+STATES_AREA_COSTS = [(25, 1), (100, 2), (400, 3)]
+STATES_GLOBAL_COST = 4
+FLIGHTS_PARTITION_SECONDS = {
+    "/flights/all": 3600,
+    "/flights/arrival": 86400,
+    "/flights/departure": 86400,
+    "/flights/aircraft": 86400,
+}
+DEFAULT_REQUEST_COST = 1
+
+
+class CreditBudgetExhausted(Exception):
+    """Raised when a request would exceed the daily OpenSky credit budget."""
+
+
+class OpenSkyRateLimiter:
+    """
+    A credit-aware token bucket shared by every caller of the OpenSky API.
+
+    Tokens refill continuously at `daily_credits / 86400` credits per second up
+    to `burst_credits`, so sustained use is paced evenly across the day instead
+    of bursting into 429 responses. Credits spent are tracked per UTC day and
+    persisted to `usage_path` so that restarting the process does not reset the
+    budget. The usage file is re-read and updated under a file lock on every
+    spend, so pipelines running as separate processes share one budget. The
+    remaining-credits and retry-after headers returned by the API
+    override the local estimate whenever they are more conservative.
+
+    Args:
+        daily_credits: number of API credits available per UTC day
+        burst_credits: maximum credits that can be spent back-to-back.
+            Defaults to one hour's worth of the daily budget.
+        usage_path: optional json file used to persist credits spent per day
+    """
+
+    REMAINING_HEADER = "X-Rate-Limit-Remaining"
+    RETRY_AFTER_HEADER = "X-Rate-Limit-Retry-After-Seconds"
+
+    def __init__(
+        self,
+        daily_credits: int = 4000,
+        burst_credits: float = None,
+        usage_path: str = None,
+    ):
+        self.daily_credits = daily_credits
+        self.burst_credits = (
+            burst_credits if burst_credits is not None else max(daily_credits / 24, 1)
+        )
+        self.refill_per_second = daily_credits / 86400
+        self.usage_path = usage_path
+        self.usage = self._read_usage()
+        self.tokens = self.burst_credits
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _read_usage(self) -> dict:
+        if self.usage_path is None or not Path(self.usage_path).exists():
+            return {}
+        with open(self.usage_path) as usage_file:
+            return json.load(usage_file)
+
+    @contextmanager
+    def _locked_usage(self):
+        """
+        Holds an exclusive lock on the usage file and reloads `usage` from it.
+
+        The lock is taken on a sidecar `.lock` file because the usage file
+        itself is replaced on every write.
+        """
+        if self.usage_path is None:
+            yield
+            return
+        Path(self.usage_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.usage_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.usage = self._read_usage()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_usage(self) -> None:
+        if self.usage_path is None:
+            return
+        temp_path = f"{self.usage_path}.tmp"
+        with open(temp_path, "w") as usage_file:
+            json.dump(self.usage, usage_file)
+        os.replace(temp_path, self.usage_path)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.burst_credits,
+            self.tokens + (now - self.last_refill) * self.refill_per_second,
+        )
+        self.last_refill = now
+
+    def credits_used_today(self) -> int:
+        """Returns the number of credits spent in the current UTC day."""
+        return self.usage.get(self._today(), 0)
+
+    def _check_budget(self, endpoint: str, cost: int) -> None:
+        if self.credits_used_today() + cost > self.daily_credits:
+            raise CreditBudgetExhausted(
+                f"OpenSky daily credit budget of {self.daily_credits} exhausted: "
+                f"{self.credits_used_today()} used, request to {endpoint} costs {cost}."
+            )
+
+    @staticmethod
+    def request_cost(endpoint: str, params: dict) -> int:
+        """
+        Estimates the credits charged for a request.
+
+        Args:
+            endpoint: API path, e.g. `/flights/all`
+            params: query parameters of the request
+
+        Returns:
+            The estimated credit cost of the request.
+        """
+        if endpoint == "/states/all":
+            if not all(key in params for key in ["lamin", "lomin", "lamax", "lomax"]):
+                return STATES_GLOBAL_COST
+            area = abs(params["lamax"] - params["lamin"]) * abs(
+                params["lomax"] - params["lomin"]
+            )
+            for max_area, cost in STATES_AREA_COSTS:
+                if area <= max_area:
+                    return cost
+            return STATES_GLOBAL_COST
+        if endpoint in FLIGHTS_PARTITION_SECONDS:
+            span_seconds = max(params.get("end", 0) - params.get("begin", 0), 1)
+            return math.ceil(span_seconds / FLIGHTS_PARTITION_SECONDS[endpoint])
+        return DEFAULT_REQUEST_COST
+
+    def acquire(self, endpoint: str, params: dict) -> int:
+        """
+        Blocks until enough credits are available for the request, then spends them.
+
+        Args:
+            endpoint: API path, e.g. `/flights/all`
+            params: query parameters of the request
+
+        Returns:
+            The number of credits spent.
+
+        Raises:
+            CreditBudgetExhausted if the request would exceed the daily budget.
+        """
+        cost = self.request_cost(endpoint=endpoint, params=params)
+        with self._condition:
+            while True:
+                self._check_budget(endpoint=endpoint, cost=cost)
+                blocked_seconds = self.blocked_until - time.monotonic()
+                if blocked_seconds > 0:
+                    self._condition.wait(timeout=blocked_seconds)
+                    continue
+                self._refill()
+                if self.tokens >= min(cost, self.burst_credits):
+                    # other processes may have spent credits since the last read
+                    with self._locked_usage():
+                        self._check_budget(endpoint=endpoint, cost=cost)
+                        today = self._today()
+                        self.usage[today] = self.usage.get(today, 0) + cost
+                        self._write_usage()
+                    self.tokens -= cost
+                    return cost
+                self._condition.wait(
+                    timeout=(min(cost, self.burst_credits) - self.tokens)
+                    / self.refill_per_second
+                )
+
+    def update_from_response(self, headers: dict) -> None:
+        """
+        Reconciles the local budget with the rate limit headers of a response.
+
+        Args:
+            headers: response headers returned by the OpenSky API
+        """
+        remaining = headers.get(self.REMAINING_HEADER)
+        retry_after = headers.get(self.RETRY_AFTER_HEADER)
+        with self._condition:
+            if remaining is not None:
+                remaining = int(remaining)
+                today = self._today()
+                used = self.daily_credits - remaining
+                with self._locked_usage():
+                    if used > self.usage.get(today, 0):
+                        self.usage[today] = used
+                        self._write_usage()
+                self.tokens = min(self.tokens, remaining)
+            if retry_after is not None:
+                logging.warning(
+                    f"OpenSky API asked to retry after {retry_after} seconds"
+                )
+                self.blocked_until = max(
+                    self.blocked_until, time.monotonic() + float(retry_after)
+                )
+            self._condition.notify_all()
+
+
+_shared_rate_limiters = {}
+_shared_rate_limiters_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(
+    daily_credits: int = 4000,
+    burst_credits: float = None,
+    usage_path: str = None,
+) -> OpenSkyRateLimiter:
+    """
+    Returns the process-wide rate limiter for a usage file, creating it once.
+
+    Every client created with the same `usage_path` draws from the same
+    bucket, so concurrent pipelines in one process cannot overspend together.
+    """
+    with _shared_rate_limiters_lock:
+        if usage_path not in _shared_rate_limiters:
+            _shared_rate_limiters[usage_path] = OpenSkyRateLimiter(
+                daily_credits=daily_credits,
+                burst_credits=burst_credits,
+                usage_path=usage_path,
+            )
+        return _shared_rate_limiters[usage_path]
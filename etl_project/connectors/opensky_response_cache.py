@@ -0,0 +1,197 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+
+class OpenSkyResponseCache:
+    """
+    A content-addressed on-disk cache of OpenSky API response bodies.
+
+    Entries are keyed by a hash of the endpoint and its query parameters and
+    stored gzip compressed. The file modification time records when an entry
+    was written and is used for age-based expiry; the access time is bumped on
+    every hit and used to evict the least recently used entries once the cache
+    grows beyond `max_bytes`. Windows ending less than `finality_seconds` ago
+    are never cached because OpenSky may still add flights to them.
+
+    Writes keep a running total of the cache size, so the cache directory is
+    only scanned by `evict` when that total goes over `max_bytes`, on the
+    first write and every `sweep_interval_seconds` after, which also picks up
+    entries written by other processes and expires old ones.
+
+    Args:
+        cache_dir: directory that holds the cached responses
+        max_bytes: maximum total size of the compressed entries
+        max_age_seconds: entries older than this are discarded
+        finality_seconds: minimum age of a window's end before it is cached
+        sweep_interval_seconds: maximum time between two scans of the cache
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 1024**3,
+        max_age_seconds: float = 30 * 86400,
+        finality_seconds: float = 86400,
+        sweep_interval_seconds: float = 3600,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.finality_seconds = finality_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._lock = threading.Lock()
+        # total size of the entries, unknown until the first scan
+        self._total_bytes = None
+        self._last_sweep = None
+
+    @staticmethod
+    def key(endpoint: str, params: dict) -> str:
+        """Returns the content address of a request."""
+        request = json.dumps(
+            {"endpoint": endpoint, "params": params}, sort_keys=True, default=str
+        )
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _replace_entry(self, temp_path: Path, path: Path) -> None:
+        """Moves a written entry into place, then evicts entries if due."""
+        size_delta = self._size(temp_path) - self._size(path)
+        os.replace(temp_path, path)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += size_delta
+            sweep_due = (
+                self._total_bytes is None
+                or self._total_bytes > self.max_bytes
+                or time.monotonic() - self._last_sweep >= self.sweep_interval_seconds
+            )
+        if sweep_due:
+            self.evict()
+
+    def _remove_entry(self, path: Path) -> None:
+        size = self._size(path)
+        path.unlink(missing_ok=True)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def is_cacheable(self, endpoint: str, params: dict) -> bool:
+        """Only requests for windows that are old enough to be final are cached."""
+        end_time = params.get("end", params.get("time"))
+        if end_time is None:
+            return False
+        return int(end_time) <= time.time() - self.finality_seconds
+
+    def get(self, endpoint: str, params: dict) -> bytes:
+        """
+        Returns the cached response body, or None on a miss.
+        """
+        path = self._path(self.key(endpoint=endpoint, params=params))
+        try:
+            written_at = path.stat().st_mtime
+            if time.time() - written_at > self.max_age_seconds:
+                self._remove_entry(path)
+                return None
+            with gzip.open(path, "rb") as cache_file:
+                payload = cache_file.read()
+            os.utime(path, times=(time.time(), written_at))
+            return payload
+        except (FileNotFoundError, OSError, EOFError):
+            return None
+
+    def get_stream(
+        self, endpoint: str, params: dict, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        """
+        Returns an iterator over the decompressed cached body, or None on a miss.
+        """
+        path = self._path(self.key(endpoint=endpoint, params=params))
+        try:
+            written_at = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if time.time() - written_at > self.max_age_seconds:
+            self._remove_entry(path)
+            return None
+        os.utime(path, times=(time.time(), written_at))
+
+        def _read_chunks() -> Iterator[bytes]:
+            with gzip.open(path, "rb") as cache_file:
+                while True:
+                    chunk = cache_file.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        return _read_chunks()
+
+    def put_stream(
+        self, endpoint: str, params: dict, chunks: Iterable[bytes]
+    ) -> Iterator[bytes]:
+        """
+        Passes chunks through while writing them to the cache.
+
+        The entry only becomes visible once every chunk has been consumed, so
+        an interrupted download is never served as a complete response.
+        """
+        path = self._path(self.key(endpoint=endpoint, params=params))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with gzip.open(temp_path, "wb", compresslevel=6) as cache_file:
+                for chunk in chunks:
+                    cache_file.write(chunk)
+                    yield chunk
+            self._replace_entry(temp_path, path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+    def put(self, endpoint: str, params: dict, payload: bytes) -> None:
+        """Stores a response body, evicting entries once over the size limit."""
+        path = self._path(self.key(endpoint=endpoint, params=params))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(temp_path, "wb") as cache_file:
+            cache_file.write(gzip.compress(payload, compresslevel=6))
+        self._replace_entry(temp_path, path)
+
+    def evict(self) -> None:
+        """Removes expired entries, then least recently used ones over `max_bytes`."""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for path in self.cache_dir.glob("*/*.json.gz"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    path.unlink(missing_ok=True)
+                else:
+                    entries.append((stat.st_atime, stat.st_size, path))
+            total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_bytes <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total_bytes -= size
+                logging.info(f"Evicted cached OpenSky response {path.name}")
+            self._total_bytes = total_bytes
+            self._last_sweep = time.monotonic()
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine, Table, MetaData
+from typing import BinaryIO
+from sqlalchemy import create_engine, select, text, Table, MetaData
 from sqlalchemy.engine import URL
 from sqlalchemy.dialects import postgresql
 
@@ -36,12 +37,60 @@ class PostgreSqlClient:
     def select_all(self, table: Table) -> list[dict]:
         return [dict(row) for row in self.engine.execute(table.select()).all()]
 
+    def select_between(
+        self, table: Table, column: str, start, end, columns: list[str] = None
+    ) -> list[dict]:
+        """
+        Selects the rows of a table whose `column` is between `start` and `end`.
+
+        Args:
+            table: sqlalchemy table
+            column: name of the column to filter on
+            start: lower bound, inclusive
+            end: upper bound, inclusive
+            columns: names of the columns to select, defaults to all columns
+        """
+        selected = [table.c[name] for name in columns] if columns else [table]
+        statement = select(*selected).where(table.c[column].between(start, end))
+        return [dict(row) for row in self.engine.execute(statement).all()]
+
     def create_table(self, metadata: MetaData) -> None:
         """
         Creates table provided in the metadata object
         """
         metadata.create_all(self.engine)
 
+    def migrate_table(
+        self, table: Table, metadata: MetaData, drop_columns: list[str] = None
+    ) -> None:
+        """
+        Creates a table, or brings an existing one up to its definition.
+
+        Columns of `table` missing from the database are added and
+        `drop_columns` are dropped, in one transaction. Every statement is
+        idempotent, so this can run at the start of each pipeline run. Types
+        and keys of existing columns are left unchanged.
+
+        Args:
+            table: sqlalchemy table
+            metadata: sqlalchemy metadata
+            drop_columns: retired columns to drop when present
+        """
+        metadata.create_all(self.engine)
+        dialect = postgresql.dialect()
+        statements = [
+            f'alter table "{table.name}" add column if not exists "{column.name}" '
+            f"{column.type.compile(dialect=dialect)}"
+            for column in table.columns
+        ]
+        statements += [
+            f'alter table "{table.name}" drop column if exists "{column}"'
+            for column in drop_columns or []
+        ]
+        with self.engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+
     def drop_table(self, table_name: str) -> None:
         self.engine.execute(f"drop table if exists {table_name};")
 
@@ -72,3 +121,105 @@ class PostgreSqlClient:
         except Exception as e:
             print(f"Error executing upsert: {e}")
             raise
+
+    def _copy_csv(
+        self,
+        csv_file: BinaryIO,
+        columns: list[str],
+        table: Table,
+        metadata: MetaData,
+        upsert: bool,
+    ) -> None:
+        """
+        Bulk loads a csv file with a header row using COPY.
+
+        When `upsert` is set the rows are copied into a temporary staging table
+        first and merged into `table` on its primary key.
+        """
+        metadata.create_all(self.engine)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        target = f'"{table.name}"'
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            if upsert:
+                target = f'"{table.name}_staging"'
+                cursor.execute(
+                    f'create temporary table {target} (like "{table.name}") on commit drop'
+                )
+            cursor.execute(
+                f"copy {target} ({column_list}) from stdin with (format csv, header true)",
+                stream=csv_file,
+            )
+            if upsert:
+                key_columns = [
+                    pk_column.name for pk_column in table.primary_key.columns.values()
+                ]
+                updates = ", ".join(
+                    f'"{column}" = excluded."{column}"'
+                    for column in columns
+                    if column not in key_columns
+                )
+                key_list = ", ".join(f'"{column}"' for column in key_columns)
+                cursor.execute(
+                    f'insert into "{table.name}" ({column_list}) '
+                    f"select {column_list} from {target} "
+                    f"on conflict ({key_list}) do update set {updates}"
+                )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def insert_csv(
+        self, csv_file: BinaryIO, columns: list[str], table: Table, metadata: MetaData
+    ) -> None:
+        """
+        Inserts the rows of a csv file with a header row using COPY.
+
+        Args:
+            csv_file: binary file object positioned at the header row
+            columns: columns of `table` present in the csv file, in file order
+            table: sqlalchemy table
+            metadata: sqlalchemy metadata
+        """
+        self._copy_csv(
+            csv_file=csv_file,
+            columns=columns,
+            table=table,
+            metadata=metadata,
+            upsert=False,
+        )
+
+    def overwrite_csv(
+        self, csv_file: BinaryIO, columns: list[str], table: Table, metadata: MetaData
+    ) -> None:
+        self.drop_table(table.name)
+        self.insert_csv(
+            csv_file=csv_file, columns=columns, table=table, metadata=metadata
+        )
+
+    def upsert_csv(
+        self, csv_file: BinaryIO, columns: list[str], table: Table, metadata: MetaData
+    ) -> None:
+        """
+        Upserts the rows of a csv file with a header row on the primary key.
+
+        The file is copied into a temporary staging table and merged into
+        `table` in the same transaction.
+
+        Args:
+            csv_file: binary file object positioned at the header row
+            columns: columns of `table` present in the csv file, in file order
+            table: sqlalchemy table
+            metadata: sqlalchemy metadata
+        """
+        self._copy_csv(
+            csv_file=csv_file,
+            columns=columns,
+            table=table,
+            metadata=metadata,
+            upsert=True,
+        )
@@ -0,0 +1,156 @@
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator
+from etl_project.connectors.json_stream import iter_json_array
+
+
+class RawArchiveClient:
+    """
+    A date-partitioned, gzip-compressed landing zone for raw OpenSky responses.
+
+    Every extracted window is stored unchanged as
+    `<archive_path>/flights_all/date=YYYY-MM-DD/<begin>_<end>.json.gz`, where the
+    date partition is the UTC day of `begin`. The client exposes the same
+    `get_flights` and `iter_flights` methods as `OpenSkyApiClient`, so it can
+    replace it as a replay source for the rest of the pipeline.
+
+    Args:
+        archive_path: root folder of the archive
+    """
+
+    def __init__(self, archive_path: str):
+        self.archive_path = Path(archive_path)
+        self.endpoint_folder = self.archive_path / "flights_all"
+
+    def _partition(self, start_time: int) -> Path:
+        date = datetime.fromtimestamp(start_time, tz=timezone.utc).strftime("%Y-%m-%d")
+        return self.endpoint_folder / f"date={date}"
+
+    def _path(self, start_time: int, end_time: int) -> Path:
+        return self._partition(start_time) / f"{start_time}_{end_time}.json.gz"
+
+    def archive_flights(
+        self, start_time: int, end_time: int, records: Iterable[dict]
+    ) -> Iterator[dict]:
+        """
+        Passes records through while writing them to the archive.
+
+        The window only becomes visible once every record has been consumed,
+        so a failed extraction never leaves a partial window behind.
+
+        Args:
+            start_time: start time of the window in epoch seconds
+            end_time: end time of the window in epoch seconds
+            records: raw flight records returned by the API
+        """
+        path = self._path(start_time=start_time, end_time=end_time)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with gzip.open(temp_path, "wt", encoding="utf-8") as archive_file:
+                archive_file.write("[")
+                for index, record in enumerate(records):
+                    if index:
+                        archive_file.write(",\n")
+                    json.dump(record, archive_file)
+                    yield record
+                archive_file.write("]\n")
+            os.replace(temp_path, path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+    def put_flights(self, start_time: int, end_time: int, records: list[dict]) -> None:
+        """Writes the raw records of a window to the archive."""
+        for _ in self.archive_flights(
+            start_time=start_time, end_time=end_time, records=records
+        ):
+            pass
+
+    def list_windows(self, start_time: int, end_time: int) -> list[tuple[int, int]]:
+        """
+        Lists the archived windows overlapping a time range.
+
+        Returns:
+            A sorted list of (begin, end) epoch second tuples.
+        """
+        windows = []
+        # a window starting the day before may still overlap the range
+        day = datetime.fromtimestamp(start_time, tz=timezone.utc).date() - timedelta(
+            days=1
+        )
+        last_day = datetime.fromtimestamp(end_time, tz=timezone.utc).date()
+        while day <= last_day:
+            partition = self.endpoint_folder / f"date={day.isoformat()}"
+            for path in partition.glob("*.json.gz"):
+                begin, end = map(int, path.name[: -len(".json.gz")].split("_"))
+                if begin < end_time and end > start_time:
+                    windows.append((begin, end))
+            day += timedelta(days=1)
+        return sorted(windows)
+
+    def iter_flights(
+        self,
+        start_time: int,
+        end_time: int,
+        fields: list[str] = None,
+        chunk_size: int = 65536,
+    ) -> Iterator[dict]:
+        """
+        Replays the archived flights of every window overlapping a time range.
+
+        Flights present in several overlapping windows are returned once.
+
+        Args:
+            start_time: start time in epoch seconds
+            end_time: end time in epoch seconds
+            fields: optional list of keys to keep from each flight
+            chunk_size: number of bytes read from the archive at a time
+
+        Raises:
+            Exception if no archived window overlaps the time range.
+        """
+        windows = self.list_windows(start_time=start_time, end_time=end_time)
+        if not windows:
+            raise Exception(
+                f"No archived OpenSky flights between {start_time} and {end_time} in {self.archive_path}"
+            )
+        seen = set()
+        for begin, end in windows:
+            with gzip.open(self._path(start_time=begin, end_time=end), "rb") as file:
+                chunks = iter(lambda: file.read(chunk_size), b"")
+                for record in iter_json_array(chunks=chunks):
+                    key = (
+                        record.get("icao24"),
+                        record.get("firstSeen"),
+                        record.get("lastSeen"),
+                    )
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if fields is not None:
+                        record = {field: record.get(field) for field in fields}
+                    yield record
+
+    def get_flights(self, start_time: int, end_time: int) -> list[dict]:
+        """
+        Get the archived flights data for a specific time range.
+
+        Args:
+            start_time: start time in epoch seconds
+            end_time: end time in epoch seconds
+
+        Returns:
+            A list of flights between the start and end times
+
+        Raises:
+            Exception if no archived window overlaps the time range.
+        """
+        return list(self.iter_flights(start_time=start_time, end_time=end_time))
+
+    def close(self) -> None:
+        """Nothing to release; present for parity with `OpenSkyApiClient`."""
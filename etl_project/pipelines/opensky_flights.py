@@ -1,20 +1,68 @@
+import asyncio
 from dotenv import load_dotenv
 import os
 from etl_project.connectors.opensky_flights import OpenSkyApiClient
+from etl_project.connectors.opensky_rate_limiter import (
+    CreditBudgetExhausted,
+    get_shared_rate_limiter,
+)
+from etl_project.connectors.opensky_response_cache import OpenSkyResponseCache
+from etl_project.connectors.raw_archive import RawArchiveClient
 from etl_project.connectors.postgresql import PostgreSqlClient
-from sqlalchemy import Table, MetaData, Column, String, Float, DateTime
+from sqlalchemy import (
+    Table,
+    MetaData,
+    Column,
+    String,
+    DateTime,
+    Integer,
+    Float,
+    LargeBinary,
+)
 from etl_project.assets.opensky_flights import (
     extract_opensky_flights,
+    extract_opensky_flights_concurrently,
+    extract_opensky_flights_batches,
+    extract_opensky_flights_chunked,
     transform_flight_data,
     enrich_airport_data,
+    enrich_airline_data,
+    enrich_aircraft_data,
+    infer_missing_airports,
+    INFERRED_AIRPORT_COLUMNS,
     load,
     _generate_hourly_datetime_ranges,  # Import the new function
 )
+from etl_project.assets.flight_schema import (
+    flight_table_columns,
+    RETIRED_FLIGHT_TABLE_COLUMNS,
+)
+from etl_project.assets.opensky_tracks import (
+    TRACK_ENDPOINT_COLUMNS,
+    drop_stored_flights,
+    extract_opensky_tracks,
+)
+from etl_project.assets.window_planner import (
+    AdaptiveWindowPlanner,
+    is_oversized_window_error,
+)
+from etl_project.assets.airport_index import get_airport_index
+from etl_project.assets.aircraft_registry import get_aircraft_registry
+from etl_project.assets.reference_data import (
+    get_airport_reference,
+    get_airline_reference,
+)
+from etl_project.assets.failed_windows import (
+    read_failed_windows,
+    write_failed_windows,
+    prioritise_failed_windows,
+)
 from etl_project.assets.metadata_logging import MetaDataLogging, MetaDataLoggingStatus
 import yaml
 from pathlib import Path
 import schedule
 import time
+from collections import deque
 from etl_project.assets.pipeline_logging import PipelineLogging
 import pandas as pd
 from datetime import datetime, timezone
@@ -29,6 +77,13 @@ def validate_data_types(df: pd.DataFrame):
     # Add more type validations as needed
 
 
+def _head(df, rows: int = 5):
+    """Returns the first rows of a dataframe or of a `pyarrow.Table`."""
+    if isinstance(df, pd.DataFrame):
+        return df.head(rows)
+    return df.slice(0, rows)
+
+
 def log_dataframe_info(df: pd.DataFrame, logger):
     """
     Log the data types and sample values of the DataFrame.
@@ -39,6 +94,340 @@ def log_dataframe_info(df: pd.DataFrame, logger):
     logger.info(df.info())
 
 
+def opensky_flights_table(metadata: MetaData) -> Table:
+    """Defines the `opensky_flights` table on the provided metadata."""
+    return Table("opensky_flights", metadata, *flight_table_columns())
+
+
+def opensky_flight_tracks_table(metadata: MetaData) -> Table:
+    """Defines the `opensky_flight_tracks` table on the provided metadata."""
+    return Table(
+        "opensky_flight_tracks",
+        metadata,
+        Column("icao24", String, primary_key=True),
+        Column("firstSeen", DateTime(timezone=True), primary_key=True),
+        Column("lastSeen", DateTime(timezone=True)),
+        Column("callsign", String),
+        Column("start_time", DateTime(timezone=True)),
+        Column("end_time", DateTime(timezone=True)),
+        Column("waypoint_count", Integer),
+        Column("path", LargeBinary),  # see assets.opensky_tracks.encode_track_path
+        Column("start_latitude", Float),
+        Column("start_longitude", Float),
+        Column("end_latitude", Float),
+        Column("end_longitude", Float),
+    )
+
+
+def extract_tracks_for_window(
+    df_flights: pd.DataFrame,
+    opensky_client: OpenSkyApiClient,
+    config: dict,
+    pipeline_logging: PipelineLogging,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Extracts the tracks of the flights of one window.
+
+    Returns:
+        A tuple of the extracted tracks and the flights whose track request
+        failed, see `extract_opensky_tracks`
+    """
+    pipeline_logging.logger.info(f"Extracting tracks for {len(df_flights)} flights")
+    df_tracks, df_failed_flights = extract_opensky_tracks(
+        opensky_client=opensky_client,
+        df_flights=df_flights,
+        max_workers=config.get("track_max_workers", 4),
+    )
+    if len(df_failed_flights) > 0:
+        pipeline_logging.logger.warning(
+            f"Failed to extract tracks for {len(df_failed_flights)} flights"
+        )
+    return df_tracks, df_failed_flights
+
+
+def select_stored_tracks(
+    df_flights: pd.DataFrame,
+    postgresql_client: PostgreSqlClient,
+    tracks_table: Table,
+) -> pd.DataFrame:
+    """
+    Selects the stored tracks of the flights of one window.
+
+    Only the keys and the endpoints of the tracks are selected, not their
+    path.
+    """
+    columns = ["icao24", "firstSeen", *TRACK_ENDPOINT_COLUMNS]
+    first_seen = pd.to_datetime(df_flights["firstSeen"], utc=True)
+    stored_tracks = postgresql_client.select_between(
+        table=tracks_table,
+        column="firstSeen",
+        start=first_seen.min().to_pydatetime(),
+        end=first_seen.max().to_pydatetime(),
+        columns=columns,
+    )
+    return pd.DataFrame(stored_tracks, columns=columns)
+
+
+def load_tracks_for_window(
+    df_tracks: pd.DataFrame,
+    postgresql_client: PostgreSqlClient,
+    tracks_table: Table,
+    metadata: MetaData,
+    pipeline_logging: PipelineLogging,
+) -> None:
+    """Loads the tracks extracted for one window."""
+    pipeline_logging.logger.info(f"Loading {len(df_tracks)} tracks to postgres")
+    load(
+        df=df_tracks,
+        postgresql_client=postgresql_client,
+        table=tracks_table,
+        metadata=metadata,
+        load_method="upsert",
+    )
+
+
+def infer_airports_for_window(
+    df_transformed: pd.DataFrame,
+    df_tracks: pd.DataFrame,
+    opensky_client: OpenSkyApiClient,
+    config: dict,
+    pipeline_logging: PipelineLogging,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Infers the missing airports of the flights of one window from their tracks.
+
+    When the tracks are not loaded, only the tracks of flights missing an
+    airport are extracted.
+
+    Returns:
+        A tuple of the flights with inferred airports and the flights whose
+        track request failed
+    """
+    engine = config.get("engine", "pandas")
+    df_failed_flights = None
+    if df_tracks is None:
+        df_missing = df_transformed
+        if engine == "arrow":
+            df_missing = df_transformed.select(
+                ["icao24", "firstSeen", "lastSeen", *INFERRED_AIRPORT_COLUMNS]
+            ).to_pandas()
+        df_missing = df_missing[
+            df_missing[list(INFERRED_AIRPORT_COLUMNS)].isna().any(axis=1)
+        ]
+        df_tracks, df_failed_flights = extract_tracks_for_window(
+            df_flights=df_missing,
+            opensky_client=opensky_client,
+            config=config,
+            pipeline_logging=pipeline_logging,
+        )
+    airport_index = get_airport_index(
+        airport_codes_path=config.get("airport_codes_path"),
+        airport_types=config.get("airport_inference_types"),
+        max_radius_km=config.get("airport_inference_radius_km", 15),
+    )
+    pipeline_logging.logger.info("Inferring missing airports from flight tracks")
+    df_inferred = infer_missing_airports(
+        df_flights_transformed=df_transformed,
+        df_tracks=df_tracks,
+        airport_index=airport_index,
+        engine=engine,
+    )
+    return df_inferred, df_failed_flights
+
+
+def transform_and_load_window(
+    df_opensky_flights: pd.DataFrame,
+    date_range: dict,
+    config: dict,
+    postgresql_client: PostgreSqlClient,
+    table: Table,
+    metadata: MetaData,
+    pipeline_logging: PipelineLogging,
+    opensky_client: OpenSkyApiClient = None,
+    tracks_table: Table = None,
+) -> None:
+    """
+    Transforms, enriches and loads the flights extracted for one window.
+
+    When `tracks_table` is provided, the tracks of the flights not already in
+    `tracks_table` are extracted with `opensky_client` and loaded after the
+    flights. With `infer_missing_airports` set, missing airports are inferred
+    from the tracks before enrichment. With the arrow engine the window is a
+    `pyarrow.Table` from extraction through to the load.
+
+    Raises:
+        Exception when track requests failed, once the flights and the other
+        tracks are loaded, so the window is retried.
+    """
+    engine = config.get("engine", "pandas")
+    pipeline_logging.logger.debug(f"Extracted data: {_head(df_opensky_flights)}")
+
+    # transform
+    pipeline_logging.logger.info("Transforming dataframes")
+    df_transformed = transform_flight_data(df_flights=df_opensky_flights, engine=engine)
+    pipeline_logging.logger.debug(f"Transformed data: {_head(df_transformed)}")
+
+    df_tracks = None
+    df_failed_flights = None
+    df_stored_tracks = None
+    if tracks_table is not None and len(df_transformed) > 0:
+        df_flights = df_transformed
+        if engine == "arrow":
+            df_flights = df_transformed.select(["icao24", "firstSeen", "lastSeen"])
+            df_flights = df_flights.to_pandas()
+        # tracks loaded by earlier runs are not requested again
+        df_stored_tracks = select_stored_tracks(
+            df_flights=df_flights,
+            postgresql_client=postgresql_client,
+            tracks_table=tracks_table,
+        )
+        df_flights = drop_stored_flights(
+            df_flights=df_flights, df_stored_tracks=df_stored_tracks
+        )
+        df_tracks, df_failed_flights = extract_tracks_for_window(
+            df_flights=df_flights,
+            opensky_client=opensky_client,
+            config=config,
+            pipeline_logging=pipeline_logging,
+        )
+    if (
+        config.get("infer_missing_airports", False)
+        and config.get("source", "api") != "replay"
+        and len(df_transformed) > 0
+    ):
+        df_inference_tracks = df_tracks
+        if df_tracks is not None:
+            df_inference_tracks = pd.concat(
+                [df_stored_tracks, df_tracks[df_stored_tracks.columns]],
+                ignore_index=True,
+            )
+        df_transformed, df_failed_inference_flights = infer_airports_for_window(
+            df_transformed=df_transformed,
+            df_tracks=df_inference_tracks,
+            opensky_client=opensky_client,
+            config=config,
+            pipeline_logging=pipeline_logging,
+        )
+        if df_failed_inference_flights is not None:
+            df_failed_flights = df_failed_inference_flights
+
+    df_airports = get_airport_reference(config.get("airport_codes_path"))
+    pipeline_logging.logger.debug(f"Airport data: {df_airports.head()}")
+
+    pipeline_logging.logger.info(
+        "Starting enrichment of flight data with airport codes"
+    )
+    df_enriched = enrich_airport_data(
+        df_flights_transformed=df_transformed, df_airports=df_airports, engine=engine
+    )
+    df_airlines = None
+    if config.get("airline_codes_path"):
+        df_airlines = get_airline_reference(config.get("airline_codes_path"))
+    df_enriched = enrich_airline_data(
+        df_flights_enriched=df_enriched, df_airlines=df_airlines, engine=engine
+    )
+    aircraft_registry = None
+    if config.get("aircraft_registry_path"):
+        aircraft_registry = get_aircraft_registry(config.get("aircraft_registry_path"))
+    df_enriched = enrich_aircraft_data(
+        df_flights_enriched=df_enriched,
+        aircraft_registry=aircraft_registry,
+        engine=engine,
+    )
+    pipeline_logging.logger.debug(f"Enriched data: {_head(df_enriched)}")
+
+    if engine == "pandas":
+        # Validate data types before loading
+        pipeline_logging.logger.info("Validating data types")
+        validate_data_types(df_enriched)
+
+        # Log DataFrame info before loading
+        log_dataframe_info(df_enriched, pipeline_logging.logger)
+
+    # load
+    pipeline_logging.logger.info("Loading data to postgres")
+    load(
+        df=df_enriched,
+        postgresql_client=postgresql_client,
+        table=table,
+        metadata=metadata,
+        load_method="upsert",
+        engine=engine,
+    )
+    if df_tracks is not None:
+        load_tracks_for_window(
+            df_tracks=df_tracks,
+            postgresql_client=postgresql_client,
+            tracks_table=tracks_table,
+            metadata=metadata,
+            pipeline_logging=pipeline_logging,
+        )
+    if df_failed_flights is not None and len(df_failed_flights) > 0:
+        raise Exception(
+            f"Failed to extract tracks for {len(df_failed_flights)} flights of range {date_range}"
+        )
+    pipeline_logging.logger.info(f"Data for range {date_range} loaded successfully")
+
+
+async def _extract_and_load_concurrently(
+    opensky_client: OpenSkyApiClient,
+    hourly_ranges: list[dict],
+    raw_archive: RawArchiveClient,
+    window_planner: AdaptiveWindowPlanner,
+    config: dict,
+    postgresql_client: PostgreSqlClient,
+    table: Table,
+    metadata: MetaData,
+    pipeline_logging: PipelineLogging,
+    tracks_table: Table = None,
+) -> list[dict]:
+    """
+    Extracts windows concurrently and loads them in window order.
+
+    Returns:
+        The windows that failed to extract or load.
+    """
+    failed_windows = []
+    async for (
+        date_range,
+        df_opensky_flights,
+        error,
+    ) in extract_opensky_flights_concurrently(
+        opensky_client=opensky_client,
+        date_ranges=hourly_ranges,
+        max_concurrency=config.get("max_concurrency", 8),
+        raw_archive=raw_archive,
+        airports=config.get("airports"),
+        engine=config.get("engine", "pandas"),
+    ):
+        if error is not None:
+            pipeline_logging.logger.error(
+                f"Error processing range {date_range}: {error}"
+            )
+            failed_windows.append(date_range)
+            continue
+        if window_planner is not None:
+            window_planner.record(
+                date_range=date_range, records=len(df_opensky_flights), seconds=0
+            )
+        try:
+            transform_and_load_window(
+                df_opensky_flights=df_opensky_flights,
+                date_range=date_range,
+                config=config,
+                postgresql_client=postgresql_client,
+                table=table,
+                metadata=metadata,
+                pipeline_logging=pipeline_logging,
+                opensky_client=opensky_client,
+                tracks_table=tracks_table,
+            )
+        except Exception as e:
+            pipeline_logging.logger.error(f"Error processing range {date_range}: {e}")
+            failed_windows.append(date_range)
+    return failed_windows
+
+
 def pipeline(config: dict, pipeline_logging: PipelineLogging):
     pipeline_logging.logger.info("Starting pipeline run")
     # set up environment variables
@@ -53,105 +442,316 @@ def pipeline(config: dict, pipeline_logging: PipelineLogging):
         pipeline_logging.logger.error("Missing one or more environment variables")
         raise EnvironmentError("Missing one or more environment variables")
 
-    pipeline_logging.logger.info("Creating OpenSky API client")
-    opensky_client = OpenSkyApiClient()
+    raw_archive = None
+    source = config.get("source", "api")
+    if source == "replay" and config.get("airports"):
+        raise Exception(
+            "The replay source only archives global `/flights/all` responses, please remove `airports`"
+        )
+    if source == "replay":
+        pipeline_logging.logger.info(
+            f"Replaying raw responses from {config.get('raw_archive_path')}"
+        )
+        opensky_client = RawArchiveClient(archive_path=config.get("raw_archive_path"))
+    elif source == "api":
+        response_cache = None
+        if config.get("response_cache_dir") is not None:
+            response_cache = OpenSkyResponseCache(
+                cache_dir=config.get("response_cache_dir"),
+                max_bytes=config.get("response_cache_max_mb", 1024) * 1024**2,
+                max_age_seconds=config.get("response_cache_max_age_days", 30) * 86400,
+                finality_seconds=config.get("response_cache_finality_hours", 24) * 3600,
+            )
+
+        pipeline_logging.logger.info("Creating OpenSky API client")
+        opensky_client = OpenSkyApiClient(
+            base_url=config.get("opensky_base_url", "https://opensky-network.org/api"),
+            pool_maxsize=config.get("http_pool_maxsize", 10),
+            connect_timeout=config.get("http_connect_timeout_seconds", 10),
+            read_timeout=config.get("http_read_timeout_seconds", 120),
+            max_attempts=config.get("max_request_attempts", 5),
+            backoff_base_seconds=config.get("backoff_base_seconds", 1),
+            backoff_max_seconds=config.get("backoff_max_seconds", 60),
+            rate_limiter=get_shared_rate_limiter(
+                daily_credits=config.get("daily_api_credits", 4000),
+                usage_path=config.get("credit_usage_path"),
+            ),
+            cache=response_cache,
+        )
+        if config.get("raw_archive_path") is not None:
+            raw_archive = RawArchiveClient(archive_path=config.get("raw_archive_path"))
+    else:
+        raise Exception("Please specify a correct source: [api, replay]")
+
+    pipeline_logging.logger.info("Creating PostgreSQL client")
+    postgresql_client = PostgreSqlClient(
+        server_name=SERVER_NAME,
+        database_name=DATABASE_NAME,
+        username=DB_USERNAME,
+        password=DB_PASSWORD,
+        port=PORT,
+    )
+    metadata = MetaData()
+    table = opensky_flights_table(metadata)
+    tracks_table = None
+    if config.get("load_tracks", False):
+        if source == "replay":
+            pipeline_logging.logger.warning(
+                "Tracks are not archived, skipping track loading for replay source"
+            )
+        else:
+            tracks_table = opensky_flight_tracks_table(metadata)
+    if config.get("infer_missing_airports", False) and source == "replay":
+        pipeline_logging.logger.warning(
+            "Tracks are not archived, skipping airport inference for replay source"
+        )
+
+    # bring tables created by earlier versions up to the current schema
+    pipeline_logging.logger.info("Migrating table schemas")
+    postgresql_client.migrate_table(
+        table=table, metadata=metadata, drop_columns=RETIRED_FLIGHT_TABLE_COLUMNS
+    )
+    if tracks_table is not None:
+        postgresql_client.migrate_table(table=tracks_table, metadata=metadata)
 
     # Convert start_time and end_time to Unix timestamps
     start_date = config.get("start_datetime")
     end_date = config.get("end_datetime")
 
-    # Generate hourly datetime ranges
-    hourly_ranges = _generate_hourly_datetime_ranges(
-        start_datetime=start_date, end_datetime=end_date
+    window_planner = None
+    if config.get("window_planner", "fixed") == "adaptive":
+        window_planner = AdaptiveWindowPlanner(
+            density_path=config.get("window_density_path"),
+            target_records=config.get("window_target_records", 20000),
+            max_span_seconds=config.get("window_max_span_minutes", 120) * 60,
+            min_span_seconds=config.get("window_min_span_minutes", 10) * 60,
+            max_request_seconds=config.get("window_max_request_seconds", 60),
+        )
+        pipeline_logging.logger.info("Planning adaptive datetime ranges")
+        hourly_ranges = window_planner.plan(
+            start_datetime=start_date, end_datetime=end_date
+        )
+    else:
+        # Generate hourly datetime ranges
+        hourly_ranges = _generate_hourly_datetime_ranges(
+            start_datetime=start_date, end_datetime=end_date
+        )
+
+    # Retry windows that still failed in previous runs first
+    failed_windows_path = config.get("failed_windows_path")
+    previously_failed_windows = read_failed_windows(failed_windows_path)
+    if previously_failed_windows:
+        pipeline_logging.logger.info(
+            f"Retrying {len(previously_failed_windows)} previously failed ranges first"
+        )
+    hourly_ranges = prioritise_failed_windows(
+        failed_windows=previously_failed_windows, planned_windows=hourly_ranges
     )
 
-    for date_range in hourly_ranges:
-        try:
-            # extract
-            pipeline_logging.logger.info(
-                f"Extracting data from OpenSky API for range {date_range}"
-            )
-            df_opensky_flights = extract_opensky_flights(
+    extract_mode = config.get("extract_mode", "sequential")
+    if extract_mode == "async":
+        pipeline_logging.logger.info(
+            f"Extracting {len(hourly_ranges)} ranges concurrently"
+        )
+        failed_windows = asyncio.run(
+            _extract_and_load_concurrently(
                 opensky_client=opensky_client,
-                start_datetime=date_range["start_time"].strftime("%Y-%m-%d %H:%M"),
-                end_datetime=date_range["end_time"].strftime("%Y-%m-%d %H:%M"),
-            )
-            pipeline_logging.logger.debug(
-                f"Extracted data: {df_opensky_flights.head()}"
-            )
-
-            # transform
-            pipeline_logging.logger.info("Transforming dataframes")
-            df_transformed = transform_flight_data(df_flights=df_opensky_flights)
-            pipeline_logging.logger.debug(f"Transformed data: {df_transformed.head()}")
-
-            pipeline_logging.logger.info("Reading airport codes data")
-            df_airports = pd.read_csv(config.get("airport_codes_path"))
-            pipeline_logging.logger.debug(f"Airport data: {df_airports.head()}")
-
-            pipeline_logging.logger.info(
-                "Starting enrichment of flight data with airport codes"
-            )
-            df_enriched = enrich_airport_data(
-                df_flights_transformed=df_transformed, df_airports=df_airports
-            )
-            pipeline_logging.logger.debug(f"Enriched data: {df_enriched.head()}")
-
-            # Validate data types before loading
-            pipeline_logging.logger.info("Validating data types")
-            validate_data_types(df_enriched)
-
-            # Log DataFrame info before loading
-            log_dataframe_info(df_enriched, pipeline_logging.logger)
-
-            # load
-            pipeline_logging.logger.info("Loading data to postgres")
-            postgresql_client = PostgreSqlClient(
-                server_name=SERVER_NAME,
-                database_name=DATABASE_NAME,
-                username=DB_USERNAME,
-                password=DB_PASSWORD,
-                port=PORT,
-            )
-            metadata = MetaData()
-            table = Table(
-                "opensky_flights",
-                metadata,
-                Column("icao24", String, primary_key=True),
-                Column(
-                    "firstSeen", DateTime(timezone=True), primary_key=True
-                ),  # datetime64[ns]
-                Column(
-                    "lastSeen", DateTime(timezone=True), primary_key=True
-                ),  # datetime64[ns]
-                Column("estDepartureAirport", String),  # object
-                Column("estArrivalAirport", String),  # object
-                Column("callsign", String),  # object
-                Column("estDepartureAirportDistance", Float),  # float64
-                Column("estArrivalAirportDistance", Float),  # float64
-                Column("departure_airport_type", String),  # object
-                Column("departure_airport_name", String),  # object
-                Column("departure_country", String),  # object
-                Column("departure_coordinates", String),  # object
-                Column("arrival_airport_type", String),  # object
-                Column("arrival_airport_name", String),  # object
-                Column("arrival_country", String),  # object
-                Column("arrival_coordinates", String),  # object
-            )
-            load(
-                df=df_enriched,
+                hourly_ranges=hourly_ranges,
+                raw_archive=raw_archive,
+                window_planner=window_planner,
+                config=config,
                 postgresql_client=postgresql_client,
                 table=table,
                 metadata=metadata,
-                load_method="upsert",
+                pipeline_logging=pipeline_logging,
+                tracks_table=tracks_table,
             )
-            pipeline_logging.logger.info(
-                f"Data for range {date_range} loaded successfully"
+        )
+    elif extract_mode == "sequential":
+        failed_windows = []
+        pending_ranges = deque(hourly_ranges)
+        while pending_ranges:
+            date_range = pending_ranges.popleft()
+            try:
+                # extract
+                pipeline_logging.logger.info(
+                    f"Extracting data from OpenSky API for range {date_range}"
+                )
+                extract_start = time.perf_counter()
+                df_opensky_flights = extract_opensky_flights(
+                    opensky_client=opensky_client,
+                    start_datetime=date_range["start_time"].strftime("%Y-%m-%d %H:%M"),
+                    end_datetime=date_range["end_time"].strftime("%Y-%m-%d %H:%M"),
+                    raw_archive=raw_archive,
+                    airports=config.get("airports"),
+                    airport_max_workers=config.get("airport_max_workers", 4),
+                    engine=config.get("engine", "pandas"),
+                )
+            except CreditBudgetExhausted as e:
+                # every later window would fail the same way, retry them next run
+                pipeline_logging.logger.error(
+                    f"Stopping extraction at range {date_range}: {e}"
+                )
+                failed_windows.append(date_range)
+                failed_windows.extend(pending_ranges)
+                pending_ranges.clear()
+                continue
+            except Exception as e:
+                halves = (
+                    window_planner.split(date_range)
+                    if window_planner is not None and is_oversized_window_error(e)
+                    else []
+                )
+                if halves:
+                    pipeline_logging.logger.warning(
+                        f"Extraction failed for range {date_range}: {e}. Splitting it in two"
+                    )
+                    pending_ranges.extendleft(reversed(halves))
+                    continue
+                pipeline_logging.logger.error(
+                    f"Error processing range {date_range}: {e}"
+                )
+                failed_windows.append(date_range)
+                continue
+            if window_planner is not None:
+                window_planner.record(
+                    date_range=date_range,
+                    records=len(df_opensky_flights),
+                    seconds=time.perf_counter() - extract_start,
+                )
+            try:
+                transform_and_load_window(
+                    df_opensky_flights=df_opensky_flights,
+                    date_range=date_range,
+                    config=config,
+                    postgresql_client=postgresql_client,
+                    table=table,
+                    metadata=metadata,
+                    pipeline_logging=pipeline_logging,
+                    opensky_client=opensky_client,
+                    tracks_table=tracks_table,
+                )
+            except Exception as e:
+                pipeline_logging.logger.error(
+                    f"Error processing range {date_range}: {e}"
+                )
+                failed_windows.append(date_range)
+                continue
+    elif extract_mode == "streaming":
+        if config.get("airports"):
+            raise Exception(
+                "The streaming extract mode only supports global extraction, please remove `airports`"
             )
-        except Exception as e:
-            pipeline_logging.logger.error(f"Error processing range {date_range}: {e}")
-            continue
+        failed_windows = []
+        for date_range in hourly_ranges:
+            try:
+                pipeline_logging.logger.info(
+                    f"Streaming data from OpenSky API for range {date_range}"
+                )
+                records = 0
+                for df_opensky_flights in extract_opensky_flights_batches(
+                    opensky_client=opensky_client,
+                    start_datetime=date_range["start_time"].strftime("%Y-%m-%d %H:%M"),
+                    end_datetime=date_range["end_time"].strftime("%Y-%m-%d %H:%M"),
+                    batch_size=config.get("stream_batch_size", 10000),
+                    raw_archive=raw_archive,
+                    engine=config.get("engine", "pandas"),
+                ):
+                    records += len(df_opensky_flights)
+                    transform_and_load_window(
+                        df_opensky_flights=df_opensky_flights,
+                        date_range=date_range,
+                        config=config,
+                        postgresql_client=postgresql_client,
+                        table=table,
+                        metadata=metadata,
+                        pipeline_logging=pipeline_logging,
+                        opensky_client=opensky_client,
+                        tracks_table=tracks_table,
+                    )
+                if window_planner is not None:
+                    window_planner.record(
+                        date_range=date_range, records=records, seconds=0
+                    )
+            except Exception as e:
+                pipeline_logging.logger.error(
+                    f"Error processing range {date_range}: {e}"
+                )
+                failed_windows.append(date_range)
+                continue
+    elif extract_mode == "chunked":
+        if config.get("airports"):
+            raise Exception(
+                "The chunked extract mode only supports global extraction, please remove `airports`"
+            )
+        failed_windows = []
+        for (
+            df_opensky_flights,
+            chunk_windows,
+            finished_windows,
+        ) in extract_opensky_flights_chunked(
+            opensky_client=opensky_client,
+            date_ranges=hourly_ranges,
+            chunk_size=config.get("chunk_size", 50000),
+            raw_archive=raw_archive,
+            engine=config.get("engine", "pandas"),
+        ):
+            for date_range, records, error in finished_windows:
+                if error is not None:
+                    pipeline_logging.logger.error(
+                        f"Error processing range {date_range}: {error}"
+                    )
+                    failed_windows.append(date_range)
+                elif window_planner is not None:
+                    window_planner.record(
+                        date_range=date_range, records=records, seconds=0
+                    )
+            if len(df_opensky_flights) == 0:
+                continue
+            chunk_range = {
+                "start_time": chunk_windows[0]["start_time"],
+                "end_time": chunk_windows[-1]["end_time"],
+            }
+            try:
+                pipeline_logging.logger.info(
+                    f"Loading a chunk of {len(df_opensky_flights)} flights for range {chunk_range}"
+                )
+                transform_and_load_window(
+                    df_opensky_flights=df_opensky_flights,
+                    date_range=chunk_range,
+                    config=config,
+                    postgresql_client=postgresql_client,
+                    table=table,
+                    metadata=metadata,
+                    pipeline_logging=pipeline_logging,
+                    opensky_client=opensky_client,
+                    tracks_table=tracks_table,
+                )
+            except Exception as e:
+                pipeline_logging.logger.error(
+                    f"Error processing range {chunk_range}: {e}"
+                )
+                failed_windows.extend(
+                    date_range
+                    for date_range in chunk_windows
+                    if date_range not in failed_windows
+                )
+    else:
+        raise Exception(
+            "Please specify a correct extract mode: [sequential, async, streaming, chunked]"
+        )
+
+    if failed_windows:
+        pipeline_logging.logger.warning(
+            f"{len(failed_windows)} ranges failed and will be retried first on the next run"
+        )
+    write_failed_windows(
+        failed_windows_path=failed_windows_path, failed_windows=failed_windows
+    )
+    if window_planner is not None:
+        window_planner.save()
 
+    opensky_client.close()
     pipeline_logging.logger.info("Pipeline run successful")
 
 
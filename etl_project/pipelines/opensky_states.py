@@ -0,0 +1,248 @@
+from dotenv import load_dotenv
+import os
+import time
+from etl_project.connectors.opensky_flights import OpenSkyApiClient
+from etl_project.connectors.opensky_rate_limiter import get_shared_rate_limiter
+from etl_project.connectors.postgresql import PostgreSqlClient
+from sqlalchemy import (
+    Table,
+    MetaData,
+    Column,
+    String,
+    Float,
+    DateTime,
+    Boolean,
+    Integer,
+)
+from etl_project.assets.opensky_flights import load
+from etl_project.assets.opensky_states import (
+    extract_opensky_states,
+    transform_state_vectors,
+    StateVectorBuffer,
+    GREATER_PERTH_BBOX,
+)
+from etl_project.assets.metadata_logging import MetaDataLogging, MetaDataLoggingStatus
+from etl_project.assets.pipeline_logging import PipelineLogging
+import yaml
+from pathlib import Path
+
+
+def opensky_state_vectors_table(metadata: MetaData) -> Table:
+    """Defines the `opensky_state_vectors` table on the provided metadata."""
+    return Table(
+        "opensky_state_vectors",
+        metadata,
+        Column("icao24", String, primary_key=True),
+        Column("snapshot_time", DateTime(timezone=True), primary_key=True),
+        Column("callsign", String),
+        Column("origin_country", String),
+        Column("time_position", DateTime(timezone=True)),
+        Column("last_contact", DateTime(timezone=True)),
+        Column("longitude", Float),
+        Column("latitude", Float),
+        Column("baro_altitude", Float),
+        Column("geo_altitude", Float),
+        Column("on_ground", Boolean),
+        Column("velocity", Float),
+        Column("true_track", Float),
+        Column("vertical_rate", Float),
+        Column("squawk", String),
+        Column("position_source", Integer),
+    )
+
+
+def flush_state_vectors(
+    state_vector_buffer: StateVectorBuffer,
+    postgresql_client: PostgreSqlClient,
+    table: Table,
+    metadata: MetaData,
+    pipeline_logging: PipelineLogging,
+) -> bool:
+    """
+    Upserts the buffered state vectors.
+
+    A failed load is logged and its micro-batch is put back into the buffer,
+    so it is retried by the next flush instead of stopping the poller.
+
+    Returns:
+        Whether the buffered state vectors were loaded
+    """
+    df_states = state_vector_buffer.flush()
+    if len(df_states) == 0:
+        return True
+    pipeline_logging.logger.info(f"Loading {len(df_states)} state vectors to postgres")
+    try:
+        load(
+            df=df_states,
+            postgresql_client=postgresql_client,
+            table=table,
+            metadata=metadata,
+            load_method="upsert",
+        )
+    except Exception as e:
+        pipeline_logging.logger.error(f"Error loading state vectors: {e}")
+        state_vector_buffer.restore(df_states)
+        return False
+    return True
+
+
+def pipeline(config: dict, pipeline_logging: PipelineLogging):
+    """
+    Polls the state vectors inside a bounding box and loads them in micro-batches.
+
+    Runs until `duration_seconds` have passed, or forever when it is not set.
+    Positions are buffered in memory and upserted every
+    `flush_interval_seconds`; a micro-batch that fails to load stays buffered
+    for the next flush, and whatever is buffered is flushed on exit.
+    """
+    pipeline_logging.logger.info("Starting pipeline run")
+    # set up environment variables
+    pipeline_logging.logger.info("Getting pipeline environment variables")
+    SERVER_NAME = os.environ.get("SERVER_NAME")
+    DATABASE_NAME = os.environ.get("DATABASE_NAME")
+    DB_USERNAME = os.environ.get("DB_USERNAME")
+    DB_PASSWORD = os.environ.get("DB_PASSWORD")
+    PORT = os.environ.get("PORT")
+
+    if not all([SERVER_NAME, DATABASE_NAME, DB_USERNAME, DB_PASSWORD, PORT]):
+        pipeline_logging.logger.error("Missing one or more environment variables")
+        raise EnvironmentError("Missing one or more environment variables")
+
+    pipeline_logging.logger.info("Creating OpenSky API client")
+    opensky_client = OpenSkyApiClient(
+        base_url=config.get("opensky_base_url", "https://opensky-network.org/api"),
+        pool_maxsize=1,
+        connect_timeout=config.get("http_connect_timeout_seconds", 10),
+        read_timeout=config.get("http_read_timeout_seconds", 30),
+        max_attempts=config.get("max_request_attempts", 3),
+        rate_limiter=get_shared_rate_limiter(
+            daily_credits=config.get("daily_api_credits", 4000),
+            usage_path=config.get("credit_usage_path"),
+        ),
+    )
+
+    pipeline_logging.logger.info("Creating PostgreSQL client")
+    postgresql_client = PostgreSqlClient(
+        server_name=SERVER_NAME,
+        database_name=DATABASE_NAME,
+        username=DB_USERNAME,
+        password=DB_PASSWORD,
+        port=PORT,
+    )
+    metadata = MetaData()
+    table = opensky_state_vectors_table(metadata)
+
+    bbox = tuple(config.get("bbox", GREATER_PERTH_BBOX))
+    poll_seconds = config.get("poll_seconds", 10)
+    duration_seconds = config.get("duration_seconds")
+    state_vector_buffer = StateVectorBuffer(
+        flush_interval_seconds=config.get("flush_interval_seconds", 60),
+        max_rows=config.get("flush_max_rows", 50000),
+        max_buffered_rows=config.get("buffer_max_rows"),
+    )
+
+    def _flush():
+        return flush_state_vectors(
+            state_vector_buffer=state_vector_buffer,
+            postgresql_client=postgresql_client,
+            table=table,
+            metadata=metadata,
+            pipeline_logging=pipeline_logging,
+        )
+
+    started = time.monotonic()
+    try:
+        while duration_seconds is None or time.monotonic() - started < duration_seconds:
+            poll_started = time.monotonic()
+            try:
+                pipeline_logging.logger.info(
+                    f"Extracting state vectors from OpenSky API for bbox {bbox}"
+                )
+                df_states = extract_opensky_states(
+                    opensky_client=opensky_client, bbox=bbox
+                )
+                state_vector_buffer.add(transform_state_vectors(df_states))
+            except Exception as e:
+                pipeline_logging.logger.error(f"Error polling state vectors: {e}")
+            if state_vector_buffer.should_flush():
+                _flush()
+            time.sleep(max(0, poll_seconds - (time.monotonic() - poll_started)))
+    finally:
+        if not _flush():
+            pipeline_logging.logger.error(
+                f"{state_vector_buffer.rows} buffered state vectors were not loaded"
+            )
+        opensky_client.close()
+    pipeline_logging.logger.info("Pipeline run successful")
+
+
+def run_pipeline(
+    pipeline_name: str,
+    postgresql_logging_client: PostgreSqlClient,
+    pipeline_config: dict,
+):
+    pipeline_logging = PipelineLogging(
+        pipeline_name=pipeline_name,
+        log_folder_path=pipeline_config.get("config").get("log_folder_path"),
+    )
+    metadata_logger = MetaDataLogging(
+        pipeline_name=pipeline_name,
+        postgresql_client=postgresql_logging_client,
+        config=pipeline_config.get("config"),
+    )
+
+    try:
+        metadata_logger.log()  # log start
+        pipeline(
+            config=pipeline_config.get("config"), pipeline_logging=pipeline_logging
+        )
+        metadata_logger.log(
+            status=MetaDataLoggingStatus.RUN_SUCCESS, logs=pipeline_logging.get_logs()
+        )  # log end
+        pipeline_logging.logger.handlers.clear()
+    except BaseException as e:
+        pipeline_logging.logger.error(f"Pipeline run failed. See detailed logs: {e}")
+        metadata_logger.log(
+            status=MetaDataLoggingStatus.RUN_FAILURE, logs=pipeline_logging.get_logs()
+        )  # log error
+        pipeline_logging.logger.handlers.clear()
+        raise  # Re-raise the exception to ensure it's not silently ignored
+
+
+if __name__ == "__main__":
+    # set up environment variables
+    load_dotenv()
+    LOGGING_SERVER_NAME = os.environ.get("LOGGING_SERVER_NAME")
+    LOGGING_DATABASE_NAME = os.environ.get("LOGGING_DATABASE_NAME")
+    LOGGING_USERNAME = os.environ.get("LOGGING_USERNAME")
+    LOGGING_PASSWORD = os.environ.get("LOGGING_PASSWORD")
+    LOGGING_PORT = os.environ.get("LOGGING_PORT")
+
+    postgresql_logging_client = PostgreSqlClient(
+        server_name=LOGGING_SERVER_NAME,
+        database_name=LOGGING_DATABASE_NAME,
+        username=LOGGING_USERNAME,
+        password=LOGGING_PASSWORD,
+        port=LOGGING_PORT,
+    )
+
+    # get config variables
+    yaml_file_path = __file__.replace(".py", ".yaml")
+    if Path(yaml_file_path).exists():
+        with open(yaml_file_path) as yaml_file:
+            pipeline_config = yaml.safe_load(yaml_file)
+            PIPELINE_NAME = pipeline_config.get("name")
+    else:
+        raise Exception(
+            f"Missing {yaml_file_path} file! Please create the yaml file with at least a `name` key for the pipeline name."
+        )
+
+    # the pipeline polls continuously, so it is run once rather than scheduled
+    try:
+        run_pipeline(
+            pipeline_name=PIPELINE_NAME,
+            postgresql_logging_client=postgresql_logging_client,
+            pipeline_config=pipeline_config,
+        )
+    except KeyboardInterrupt:
+        print("Pipeline execution interrupted by user.")
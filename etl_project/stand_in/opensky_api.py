@@ -0,0 +1,357 @@
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Airports used for generated departures and arrivals
+STAND_IN_AIRPORTS = ["YPPH", "YPJT", "YPKG", "YBRM", "YSSY", "YMML", "YBBN", "YPAD"]
+STAND_IN_CALLSIGN_PREFIXES = ["QFA", "VOZ", "JST", "NWK", "RXA", "SIA", "UAE"]
+FLIGHTS_ALL_MAX_SPAN_SECONDS = 7200
+AIRPORT_FLIGHTS_MAX_SPAN_SECONDS = 7 * 86400
+
+
+class OpenSkyStandInServer:
+    """
+    A local stand-in for the OpenSky Network REST API.
+
+    Serves deterministic, realistic payloads for `/flights/all`,
+    `/flights/arrival`, `/flights/departure`, `/states/all` and `/tracks/all`
+    so that clients and pipelines can be exercised offline. The same window
+    always returns the same flights, and flights are bucketed by the hour of
+    their `lastSeen`, so adjacent windows never overlap. Latency, transient
+    errors and 429 throttling can be injected to reproduce a slow or busy API.
+
+    Usage example:
+        with OpenSkyStandInServer(flights_per_hour=5000, latency_seconds=0.2) as server:
+            client = OpenSkyApiClient(base_url=server.base_url)
+
+    Args:
+        host: interface to listen on
+        port: port to listen on. 0 picks a free port.
+        flights_per_hour: number of flights generated per hour of data
+        latency_seconds: delay added before every response
+        error_rate: probability of answering a request with a 503
+        throttle_every: answer every n-th request with a 429. 0 disables it.
+        retry_after_seconds: retry-after value sent with 429 responses
+        daily_credits: optional credit budget reported in the rate limit headers
+        seed: seed of the generated data and injected errors
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        flights_per_hour: int = 1000,
+        latency_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_every: int = 0,
+        retry_after_seconds: float = 1,
+        daily_credits: int = None,
+        seed: int = 0,
+    ):
+        self.flights_per_hour = flights_per_hour
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.throttle_every = throttle_every
+        self.retry_after_seconds = retry_after_seconds
+        self.daily_credits = daily_credits
+        self.seed = seed
+        self.request_count = 0
+        self.status_counts = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """Url to pass as `base_url` to `OpenSkyApiClient`."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def serve_forever(self) -> None:
+        """Serves requests from the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self) -> "OpenSkyStandInServer":
+        """Serves requests from a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops serving and releases the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "OpenSkyStandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def flights_for_hour(self, hour: int) -> list[dict]:
+        """
+        Generates the flights whose `lastSeen` falls in an hour.
+
+        Args:
+            hour: epoch seconds of the start of the hour divided by 3600
+
+        Returns:
+            A list of flights in the `/flights/all` format
+        """
+        rng = random.Random(f"{self.seed}:{hour}")
+        flights = []
+        for _ in range(self.flights_per_hour):
+            last_seen = hour * 3600 + rng.randrange(3600)
+            departure = rng.choice(STAND_IN_AIRPORTS + [None])
+            arrival = rng.choice(STAND_IN_AIRPORTS + [None])
+            prefix = rng.choice(STAND_IN_CALLSIGN_PREFIXES)
+            flights.append(
+                {
+                    "icao24": f"{rng.randrange(0x1000000):06x}",
+                    "firstSeen": last_seen - rng.randrange(600, 6 * 3600),
+                    "estDepartureAirport": departure,
+                    "lastSeen": last_seen,
+                    "estArrivalAirport": arrival,
+                    "callsign": f"{prefix}{rng.randrange(1, 9999)}".ljust(8),
+                    "estDepartureAirportHorizDistance": rng.randrange(0, 5000),
+                    "estDepartureAirportVertDistance": rng.randrange(0, 500),
+                    "estArrivalAirportHorizDistance": rng.randrange(0, 5000),
+                    "estArrivalAirportVertDistance": rng.randrange(0, 500),
+                    "departureAirportCandidatesCount": rng.randrange(0, 4),
+                    "arrivalAirportCandidatesCount": rng.randrange(0, 4),
+                }
+            )
+        return flights
+
+    def flights_between(self, begin: int, end: int) -> list[dict]:
+        """Returns the generated flights with `begin <= lastSeen < end`."""
+        return [
+            flight
+            for hour in range(begin // 3600, (end - 1) // 3600 + 1)
+            for flight in self.flights_for_hour(hour)
+            if begin <= flight["lastSeen"] < end
+        ]
+
+    def states(self, params: dict) -> dict:
+        """Generates a snapshot of state vectors inside the requested bounding box."""
+        snapshot_time = int(params.get("time", time.time()))
+        lamin = float(params.get("lamin", -90))
+        lomin = float(params.get("lomin", -180))
+        lamax = float(params.get("lamax", 90))
+        lomax = float(params.get("lomax", 180))
+        rng = random.Random(f"{self.seed}:states:{snapshot_time // 10}")
+        states = []
+        for _ in range(max(self.flights_per_hour // 60, 1)):
+            on_ground = rng.random() < 0.2
+            prefix = rng.choice(STAND_IN_CALLSIGN_PREFIXES)
+            states.append(
+                [
+                    f"{rng.randrange(0x1000000):06x}",
+                    f"{prefix}{rng.randrange(1, 9999)}".ljust(8),
+                    "Australia",
+                    snapshot_time - rng.randrange(5),
+                    snapshot_time - rng.randrange(2),
+                    round(rng.uniform(lomin, lomax), 4),
+                    round(rng.uniform(lamin, lamax), 4),
+                    None if on_ground else round(rng.uniform(300, 11000), 1),
+                    on_ground,
+                    round(rng.uniform(0, 250), 1),
+                    round(rng.uniform(0, 360), 1),
+                    round(rng.uniform(-10, 10), 1),
+                    None,
+                    None if on_ground else round(rng.uniform(300, 11000), 1),
+                    f"{rng.randrange(10000):04d}",
+                    False,
+                    0,
+                ]
+            )
+        return {"time": snapshot_time, "states": states}
+
+    def track(self, icao24: str, snapshot_time: int) -> dict:
+        """
+        Generates the track of the flight of an aircraft active at a time.
+
+        Returns:
+            The track in the `/tracks/all` format, or None if no generated
+            flight of the aircraft covers `snapshot_time`.
+        """
+        hour = snapshot_time // 3600
+        for flight in self.flights_between(hour * 3600, (hour + 7) * 3600):
+            if (
+                flight["icao24"] == icao24
+                and flight["firstSeen"] <= snapshot_time <= flight["lastSeen"]
+            ):
+                break
+        else:
+            return None
+        rng = random.Random(f"{self.seed}:track:{icao24}:{flight['firstSeen']}")
+        latitude, longitude = rng.uniform(-35, -12), rng.uniform(113, 153)
+        path = []
+        for waypoint_time in range(flight["firstSeen"], flight["lastSeen"] + 1, 60):
+            latitude += rng.uniform(-0.05, 0.05)
+            longitude += rng.uniform(-0.05, 0.05)
+            path.append(
+                [
+                    waypoint_time,
+                    round(latitude, 4),
+                    round(longitude, 4),
+                    round(rng.uniform(300, 11000)),
+                    round(rng.uniform(0, 360), 1),
+                    False,
+                ]
+            )
+        return {
+            "icao24": icao24,
+            "startTime": flight["firstSeen"],
+            "endTime": flight["lastSeen"],
+            "callsign": flight["callsign"],
+            "path": path,
+        }
+
+    def respond(self, endpoint: str, params: dict) -> tuple[int, object]:
+        """
+        Computes the response to a request.
+
+        Returns:
+            A (status code, json body) tuple. A None body means an empty response.
+        """
+        if endpoint == "/flights/all":
+            begin, end = int(params["begin"]), int(params["end"])
+            if not 0 < end - begin <= FLIGHTS_ALL_MAX_SPAN_SECONDS:
+                return 400, None
+            return 200, self.flights_between(begin, end)
+        if endpoint in ["/flights/arrival", "/flights/departure"]:
+            begin, end = int(params["begin"]), int(params["end"])
+            if not 0 < end - begin <= AIRPORT_FLIGHTS_MAX_SPAN_SECONDS:
+                return 400, None
+            key = (
+                "estArrivalAirport"
+                if endpoint == "/flights/arrival"
+                else "estDepartureAirport"
+            )
+            flights = [
+                flight
+                for flight in self.flights_between(begin, end)
+                if flight[key] == params["airport"]
+            ]
+            return (200, flights) if flights else (404, None)
+        if endpoint == "/states/all":
+            return 200, self.states(params)
+        if endpoint == "/tracks/all":
+            track = self.track(params["icao24"], int(params.get("time", 0)))
+            return (200, track) if track is not None else (404, None)
+        return 404, None
+
+    def _handler_class(self) -> type:
+        stand_in = self
+
+        class OpenSkyStandInHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, headers: dict) -> None:
+                with stand_in._lock:
+                    stand_in.status_counts[status] = (
+                        stand_in.status_counts.get(status, 0) + 1
+                    )
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, str(value))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                endpoint = (
+                    url.path[len("/api") :] if url.path.startswith("/api") else url.path
+                )
+                with stand_in._lock:
+                    stand_in.request_count += 1
+                    request_number = stand_in.request_count
+                    failed = stand_in._random.random() < stand_in.error_rate
+                    remaining = (
+                        None
+                        if stand_in.daily_credits is None
+                        else max(stand_in.daily_credits - request_number, 0)
+                    )
+                if stand_in.latency_seconds:
+                    time.sleep(stand_in.latency_seconds)
+
+                headers = {}
+                if remaining is not None:
+                    headers["X-Rate-Limit-Remaining"] = remaining
+                if (
+                    stand_in.throttle_every
+                    and request_number % stand_in.throttle_every == 0
+                ) or remaining == 0:
+                    headers["X-Rate-Limit-Retry-After-Seconds"] = (
+                        stand_in.retry_after_seconds
+                    )
+                    self._send(429, b"Too many requests", headers)
+                    return
+                if failed:
+                    self._send(503, b"Service unavailable", headers)
+                    return
+
+                try:
+                    status, payload = stand_in.respond(endpoint, params)
+                except (KeyError, ValueError):
+                    status, payload = 400, None
+                if payload is None:
+                    self._send(status, b"", headers)
+                    return
+                body = json.dumps(payload).encode("utf-8")
+                headers["Content-Type"] = "application/json"
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=1)
+                    headers["Content-Encoding"] = "gzip"
+                self._send(status, body, headers)
+
+        return OpenSkyStandInHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenSky API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--flights-per-hour", type=int, default=1000)
+    parser.add_argument("--latency-seconds", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--retry-after-seconds", type=float, default=1)
+    parser.add_argument("--daily-credits", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = OpenSkyStandInServer(
+        host=args.host,
+        port=args.port,
+        flights_per_hour=args.flights_per_hour,
+        latency_seconds=args.latency_seconds,
+        error_rate=args.error_rate,
+        throttle_every=args.throttle_every,
+        retry_after_seconds=args.retry_after_seconds,
+        daily_credits=args.daily_credits,
+        seed=args.seed,
+    )
+    print(f"Serving OpenSky stand-in API at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,78 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from etl_project.assets.aircraft_registry import (
+    AircraftRegistry,
+    icao24_keys,
+    compile_aircraft_registry,
+    load_aircraft_registry,
+    get_aircraft_registry,
+)
+from etl_project.assets.reference_data import compiled_reference_path
+
+AIRCRAFT_REGISTRY_CSV = (
+    "icao24,registration,manufacturername,model,typecode,operator\n"
+    "7c6b2d,VH-VXA,Boeing,737-838,B738,Qantas\n"
+    "7c4ee8,VH-EBA,Airbus,A330-202,A332,\n"
+    "7C6B2D,VH-DUP,Duplicate,,,\n"
+    "a1b2c3,N123AB,Cessna,172S,C172,\n"
+    "invalid,,,,,\n"
+)
+
+
+def test_icao24_keys():
+    keys, valid = icao24_keys(pd.Series(["7c6b2d", "7C6B2D", "000001", "xyz", None]))
+    assert list(valid) == [True, True, True, False, False]
+    assert list(keys[:3]) == [0x7C6B2D, 0x7C6B2D, 1]
+
+
+def test_aircraft_registry_lookup(tmp_path):
+    aircraft_registry_path = tmp_path / "aircraftDatabase.csv"
+    aircraft_registry_path.write_text(AIRCRAFT_REGISTRY_CSV)
+    compiled_path = compile_aircraft_registry(aircraft_registry_path)
+    assert compiled_path == compiled_reference_path(aircraft_registry_path)
+
+    aircraft_registry = AircraftRegistry(compiled_path)
+    assert len(aircraft_registry) == 3
+    assert isinstance(aircraft_registry.keys, np.memmap)
+    assert aircraft_registry.keys.dtype == np.uint32
+
+    df_aircraft = aircraft_registry.lookup(
+        pd.Series(["A1B2C3", "7c6b2d", "ffffff", None], index=[5, 6, 7, 8])
+    )
+    assert list(df_aircraft.index) == [5, 6, 7, 8]
+    assert list(df_aircraft["typecode"].astype(object).fillna("")) == [
+        "C172",
+        "B738",
+        "",
+        "",
+    ]
+    assert df_aircraft["manufacturername"].iloc[1] == "Boeing"
+    assert pd.isna(df_aircraft["operator"].iloc[0])
+    assert df_aircraft["typecode"].dtype == "category"
+
+
+def test_load_aircraft_registry_rebuilds_stale_compiled_registry(tmp_path):
+    aircraft_registry_path = tmp_path / "aircraftDatabase.csv"
+    aircraft_registry_path.write_text(AIRCRAFT_REGISTRY_CSV)
+    aircraft_registry = get_aircraft_registry(str(aircraft_registry_path))
+    assert get_aircraft_registry(str(aircraft_registry_path)) is aircraft_registry
+    assert len(aircraft_registry) == 3
+
+    aircraft_registry_path.write_text(
+        AIRCRAFT_REGISTRY_CSV + "7c0001,VH-NEW,Embraer,E190,E190,Alliance\n"
+    )
+    stat = aircraft_registry_path.stat()
+    os.utime(aircraft_registry_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    aircraft_registry = load_aircraft_registry(aircraft_registry_path)
+    assert len(aircraft_registry) == 4
+    assert (
+        aircraft_registry.lookup(pd.Series(["7c0001"]))["operator"].iloc[0]
+        == "Alliance"
+    )
+
+
+def test_aircraft_registry_requires_compiled_folder(tmp_path):
+    with pytest.raises(Exception):
+        AircraftRegistry(tmp_path)
@@ -0,0 +1,85 @@
+from etl_project.assets.airport_index import (
+    AirportSpatialIndex,
+    build_airport_index,
+    infer_airports,
+)
+from etl_project.assets.geodesy import great_circle_distance_km
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def setup_airports_df():
+    return pd.DataFrame(
+        {
+            "type": ["large_airport", "large_airport", "heliport", "small_airport"],
+            "name": ["Perth", "Jandakot", "Perth Heliport", "Unknown"],
+            "iso_country": ["AU", "AU", "AU", "AU"],
+            "latitude": [-31.9403, -32.0975, -31.9614, np.nan],
+            "longitude": [115.967, 115.881, 115.8656, np.nan],
+        },
+        index=pd.Index(["YPPH", "YPJT", "YHEL", "YXXX"], name="ident"),
+    )
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(0)
+    latitudes = np.degrees(np.arcsin(rng.uniform(-1, 1, 2000)))
+    longitudes = rng.uniform(-180, 180, 2000)
+    # airports at a pole and on both sides of the antimeridian
+    latitudes[:3], longitudes[:3] = [90, 0, 0], [0, 180, -179.95]
+    idents = np.array([f"A{i}" for i in range(2000)], dtype=object)
+    airport_index = AirportSpatialIndex(idents, latitudes, longitudes, 200)
+
+    query_latitudes = np.concatenate([[89.5, 0, np.nan], rng.uniform(-90, 90, 200)])
+    query_longitudes = np.concatenate([[45, -179.99, 0], rng.uniform(-180, 180, 200)])
+    nearest, distances = airport_index.nearest(query_latitudes, query_longitudes)
+
+    for i, (latitude, longitude) in enumerate(zip(query_latitudes, query_longitudes)):
+        if np.isnan(latitude):
+            assert nearest[i] is None
+            continue
+        brute_force = great_circle_distance_km(
+            latitude, longitude, latitudes, longitudes
+        )
+        closest = np.argmin(brute_force)
+        if brute_force[closest] <= 200:
+            assert nearest[i] == idents[closest]
+            assert distances[i] == pytest.approx(brute_force[closest])
+        else:
+            assert nearest[i] is None
+    assert list(nearest[:2]) == ["A0", "A1"]
+
+
+def test_nearest_rejects_radius_beyond_index():
+    airport_index = AirportSpatialIndex(np.array(["YPPH"]), [-31.94], [115.97], 10)
+    with pytest.raises(Exception):
+        airport_index.nearest([-31.94], [115.97], radius_km=20)
+
+
+def test_build_airport_index_filters_types(setup_airports_df):
+    airport_index = build_airport_index(setup_airports_df, max_radius_km=5)
+    assert len(airport_index) == 2
+
+    # next to the heliport, which is not indexed by default
+    nearest, _ = airport_index.nearest([-31.962, -31.95], [115.866, 115.96])
+    assert list(nearest) == [None, "YPPH"]
+
+    airport_index = build_airport_index(
+        setup_airports_df, airport_types=["heliport"], max_radius_km=5
+    )
+    nearest, _ = airport_index.nearest([-31.962], [115.866])
+    assert list(nearest) == ["YHEL"]
+
+
+def test_infer_airports_only_fills_missing_codes(setup_airports_df):
+    airport_index = build_airport_index(setup_airports_df, max_radius_km=10)
+    codes, inferred = infer_airports(
+        codes=np.array(["YPJT", None, None, None], dtype=object),
+        latitudes=[-31.94, -31.95, -10.0, np.nan],
+        longitudes=[115.97, 115.96, 100.0, np.nan],
+        airport_index=airport_index,
+    )
+    assert list(codes) == ["YPJT", "YPPH", None, None]
+    assert list(inferred) == [False, True, False, False]
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from etl_project.assets.callsigns import (
+    CALLSIGN_PATTERN,
+    split_callsigns,
+    read_airline_reference,
+)
+
+
+def test_split_callsigns():
+    callsigns = pd.Series(
+        ["QFA123  ", "VOZ9", "UAL12AB ", "VHOQA   ", "N123AB  ", "QFA 12  ", None]
+    )
+    df_callsigns = split_callsigns(callsigns)
+    assert list(df_callsigns["airline_icao"].astype(object).fillna("")) == [
+        "QFA",
+        "VOZ",
+        "UAL",
+        "",
+        "",
+        "",
+        "",
+    ]
+    assert list(df_callsigns["flight_number"]) == [
+        "123",
+        "9",
+        "12AB",
+        None,
+        None,
+        None,
+        None,
+    ]
+    assert df_callsigns["airline_icao"].dtype == "category"
+
+
+def test_split_callsigns_matches_pattern():
+    callsigns = pd.Series(
+        [
+            "JST12345",
+            "ABC1234 ",
+            "abc123  ",
+            " QFA1   ",
+            "QF12    ",
+            "",
+            "DAL1A2B",
+            np.nan,
+        ]
+    )
+    df_callsigns = split_callsigns(callsigns)
+    df_expected = callsigns.fillna("").str.rstrip().str.extract(CALLSIGN_PATTERN)
+    for column in ["airline_icao", "flight_number"]:
+        assert list(df_callsigns[column].astype(object).fillna("")) == list(
+            df_expected[column].fillna("")
+        )
+
+
+def test_read_airline_reference(tmp_path):
+    airlines_path = tmp_path / "airlines.dat"
+    airlines_path.write_text(
+        '-1,"Unknown",\\N,"-","N/A",\\N,\\N,"Y"\n'
+        '3320,"Lufthansa",\\N,"LH","DLH","LUFTHANSA","Germany","Y"\n'
+        '4178,"Qantas Old",\\N,"","QFA","","Australia","N"\n'
+        '4179,"Qantas",\\N,"QF","QFA","QANTAS","Australia","Y"\n'
+    )
+    df_airlines = read_airline_reference(airlines_path)
+    assert sorted(df_airlines.index) == ["DLH", "QFA"]
+    assert df_airlines.loc["QFA", "name"] == "Qantas"
+    assert list(df_airlines.columns) == ["name", "country"]
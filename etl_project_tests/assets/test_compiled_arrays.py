@@ -0,0 +1,33 @@
+from etl_project.assets.compiled_arrays import (
+    decode_strings,
+    encode_strings,
+    file_signature,
+    is_compiled,
+    read_manifest,
+    write_manifest,
+)
+import os
+
+
+def test_encode_decode_strings_round_trip():
+    values = ["YPPH", "Perth Airport", "Zürich"]
+    assert decode_strings(encode_strings(values)) == values
+    assert decode_strings(encode_strings([])) == []
+
+
+def test_compiled_folder_is_stale_when_source_or_version_changes(tmp_path):
+    source_path = tmp_path / "reference.csv"
+    source_path.write_text("ident\nYPPH\n")
+    folder = tmp_path / "reference.csv.compiled"
+    folder.mkdir()
+    assert not is_compiled(str(source_path), folder, version=1)
+
+    write_manifest(
+        folder, source_signature=file_signature(str(source_path)), version=1, rows=1
+    )
+    assert is_compiled(str(source_path), folder, version=1)
+    assert read_manifest(folder, version=1)["rows"] == 1
+    assert read_manifest(folder, version=2) is None
+
+    os.utime(source_path, ns=(0, 0))
+    assert not is_compiled(str(source_path), folder, version=1)
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from etl_project.assets.failed_windows import (
+    read_failed_windows,
+    write_failed_windows,
+    prioritise_failed_windows,
+)
+
+
+def test_failed_windows_round_trip(tmp_path):
+    failed_windows_path = str(tmp_path / "failed_windows.json")
+    failed_windows = [
+        {
+            "start_time": datetime(2025, 1, 1, 3, 0, 1, tzinfo=timezone.utc),
+            "end_time": datetime(2025, 1, 1, 4, 0, 0, tzinfo=timezone.utc),
+        }
+    ]
+    assert read_failed_windows(failed_windows_path) == []
+    write_failed_windows(failed_windows_path, failed_windows)
+    assert read_failed_windows(failed_windows_path) == failed_windows
+
+
+def test_prioritise_failed_windows():
+    window_1 = {
+        "start_time": datetime(2025, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+        "end_time": datetime(2025, 1, 1, 1, 0, 0, tzinfo=timezone.utc),
+    }
+    window_2 = {
+        "start_time": datetime(2025, 1, 1, 1, 0, 1, tzinfo=timezone.utc),
+        "end_time": datetime(2025, 1, 1, 2, 0, 0, tzinfo=timezone.utc),
+    }
+    windows = prioritise_failed_windows(
+        failed_windows=[window_2], planned_windows=[window_1, window_2]
+    )
+    assert windows == [window_2, window_1]
@@ -0,0 +1,59 @@
+from etl_project.assets.flight_schema import (
+    FLIGHT_RECORD_SCHEMA,
+    FLIGHT_TABLE_SCHEMA,
+    build_flights_frame,
+    flight_table_columns,
+)
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_build_flights_frame_types_columns():
+    records = [
+        {
+            "icao24": "7c6b2d",
+            "firstSeen": 1735689600,
+            "estDepartureAirport": "YPPH",
+            "lastSeen": 1735693200,
+            "estArrivalAirport": None,
+            "callsign": "QFA123  ",
+            "estDepartureAirportHorizDistance": 1200,
+            "estDepartureAirportVertDistance": None,
+            "estArrivalAirportHorizDistance": 300,
+            "estArrivalAirportVertDistance": 50,
+            "arrivalAirportCandidatesCount": 2,
+        }
+    ]
+
+    df = build_flights_frame(records=records)
+
+    assert list(df.columns) == list(FLIGHT_RECORD_SCHEMA)
+    assert dict(df.dtypes.astype(str)) == FLIGHT_RECORD_SCHEMA
+    assert df["firstSeen"].dtype == np.int64
+    assert df["estDepartureAirportHorizDistance"].iloc[0] == 1200.0
+    assert np.isnan(df["estDepartureAirportVertDistance"].iloc[0])
+    assert pd.isna(df["estArrivalAirport"].iloc[0])
+
+
+def test_build_flights_frame_empty_keeps_schema():
+    df = build_flights_frame(records=[])
+    assert df.empty
+    assert dict(df.dtypes.astype(str)) == FLIGHT_RECORD_SCHEMA
+
+
+def test_build_flights_frame_requires_epochs():
+    with pytest.raises(Exception):
+        build_flights_frame(records=[{"icao24": "7c6b2d", "lastSeen": 1735693200}])
+
+
+def test_flight_table_columns_follow_schema():
+    columns = flight_table_columns()
+    assert [column.name for column in columns] == [
+        name for name, _, _ in FLIGHT_TABLE_SCHEMA
+    ]
+    assert [column.name for column in columns if column.primary_key] == [
+        "icao24",
+        "firstSeen",
+        "lastSeen",
+    ]
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+from etl_project.assets.geodesy import parse_coordinates, great_circle_distance_km
+
+
+def test_parse_coordinates():
+    df_positions = parse_coordinates(
+        pd.Series(["-73.7781, 40.6413", "151.177,-33.9461", None, "unknown"])
+    )
+    assert list(df_positions.columns) == ["latitude", "longitude"]
+    assert list(df_positions.iloc[0]) == [40.6413, -73.7781]
+    assert list(df_positions.iloc[1]) == [-33.9461, 151.177]
+    assert df_positions.iloc[2:].isna().all(axis=None)
+
+
+def test_great_circle_distance_km():
+    distances = great_circle_distance_km(
+        np.array([40.6413, 0.0, 10.0]),
+        np.array([-73.7781, 0.0, 20.0]),
+        np.array([33.9416, 0.0, np.nan]),
+        np.array([-118.4085, 180.0, 20.0]),
+    )
+    assert distances[0] == pytest.approx(3974.3, abs=0.1)
+    # half of the circumference along the equator
+    assert distances[1] == pytest.approx(np.pi * 6371.0088)
+    assert np.isnan(distances[2])
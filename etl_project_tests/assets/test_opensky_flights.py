@@ -1,13 +1,25 @@
 import os
 from pathlib import Path
+import asyncio
+import time
 from etl_project.assets.opensky_flights import (
     extract_opensky_flights,
+    extract_opensky_flights_concurrently,
+    extract_opensky_flights_chunked,
+    extract_opensky_airport_flights,
     transform_flight_data,
     enrich_airport_data,
+    enrich_airline_data,
+    enrich_aircraft_data,
+    infer_missing_airports,
     load,
     _generate_hourly_datetime_ranges,  # Import the updated function
 )
 from etl_project.connectors.opensky_flights import OpenSkyApiClient
+from etl_project.assets.airport_index import build_airport_index
+from etl_project.assets.aircraft_registry import load_aircraft_registry
+from etl_project.assets.reference_data import with_airport_positions
+from unittest.mock import MagicMock
 import pytest
 from dotenv import load_dotenv
 import pandas as pd
@@ -31,6 +43,145 @@ def test_extract_opensky_flights(setup_extract):
     assert not df.empty
 
 
+class SlowFakeOpenSkyClient:
+    """Returns one flight per window, answering earlier windows more slowly."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_flights(self, start_time: int, end_time: int) -> list[dict]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05 if start_time % 7200 < 3600 else 0.01)
+        self.in_flight -= 1
+        return [{"icao24": "abc123", "firstSeen": start_time, "lastSeen": end_time}]
+
+
+def test_extract_opensky_flights_concurrently_preserves_window_order():
+    opensky_client = SlowFakeOpenSkyClient()
+    date_ranges = _generate_hourly_datetime_ranges(
+        "2025-01-01 00:00", "2025-01-01 08:00"
+    )
+
+    async def _collect():
+        return [
+            (date_range, df)
+            async for date_range, df, error in extract_opensky_flights_concurrently(
+                opensky_client=opensky_client,
+                date_ranges=date_ranges,
+                max_concurrency=3,
+            )
+        ]
+
+    results = asyncio.run(_collect())
+    assert [date_range for date_range, _ in results] == date_ranges
+    assert opensky_client.max_in_flight <= 3
+    for date_range, df in results:
+        assert df["lastSeen"][0] == int(date_range["end_time"].timestamp())
+
+
+class StreamingFakeOpenSkyClient:
+    """Streams three flights per window and fails on the window starting at `failing_start`."""
+
+    def __init__(self, failing_start: int = None):
+        self.failing_start = failing_start
+
+    def iter_flights(self, start_time: int, end_time: int, fields: list[str] = None):
+        for offset in range(3):
+            if start_time == self.failing_start and offset == 1:
+                raise Exception("window failed")
+            yield {
+                "icao24": f"abc12{offset}",
+                "firstSeen": start_time + offset,
+                "lastSeen": end_time,
+            }
+
+
+def test_extract_opensky_flights_chunked_rebatches_across_windows():
+    date_ranges = _generate_hourly_datetime_ranges(
+        "2025-01-01 00:00", "2025-01-01 03:00"
+    )
+    failing_start = int(date_ranges[1]["start_time"].replace(second=0).timestamp())
+    chunks = list(
+        extract_opensky_flights_chunked(
+            opensky_client=StreamingFakeOpenSkyClient(failing_start=failing_start),
+            date_ranges=date_ranges,
+            chunk_size=4,
+        )
+    )
+
+    # 3 + 1 (failed after its first flight) + 3 flights in chunks of 4
+    assert [len(df) for df, _, _ in chunks] == [4, 3]
+    assert chunks[0][1] == date_ranges[:2]
+    # the failed window had no more flights after the first chunk
+    assert chunks[1][1] == date_ranges[2:]
+    finished = [window for _, _, windows in chunks for window in windows]
+    assert [date_range for date_range, _, _ in finished] == date_ranges
+    assert [records for _, records, _ in finished] == [3, 1, 3]
+    assert [error is None for _, _, error in finished] == [True, False, True]
+
+
+def test_chunked_extraction_drops_windows_loaded_in_full():
+    date_ranges = _generate_hourly_datetime_ranges(
+        "2025-01-01 00:00", "2025-01-01 03:00"
+    )
+    chunks = list(
+        extract_opensky_flights_chunked(
+            opensky_client=StreamingFakeOpenSkyClient(),
+            date_ranges=date_ranges,
+            chunk_size=3,
+        )
+    )
+
+    # every chunk fills exactly on the last flight of a window
+    assert [len(df) for df, _, _ in chunks] == [3, 3, 3, 0]
+    assert [windows for _, windows, _ in chunks] == [
+        date_ranges[:1],
+        date_ranges[1:2],
+        date_ranges[2:],
+        [],
+    ]
+
+
+def test_extract_opensky_airport_flights_merges_and_deduplicates():
+    perth_to_broome = {
+        "icao24": "7c6b2d",
+        "firstSeen": 1735689700,
+        "lastSeen": 1735698000,
+        "estDepartureAirport": "YPPH",
+        "estArrivalAirport": "YBRM",
+    }
+    jandakot_circuit = {
+        "icao24": "7c4ee8",
+        "firstSeen": 1735689800,
+        "lastSeen": 1735690400,
+        "estDepartureAirport": "YPJT",
+        "estArrivalAirport": "YPJT",
+    }
+    opensky_client = MagicMock()
+    opensky_client.get_departures_by_airport.side_effect = lambda airport, **_: {
+        "YPPH": [perth_to_broome],
+        "YBRM": [],
+        "YPJT": [jandakot_circuit],
+    }[airport]
+    opensky_client.get_arrivals_by_airport.side_effect = lambda airport, **_: {
+        "YPPH": [],
+        "YBRM": [perth_to_broome],
+        "YPJT": [jandakot_circuit],
+    }[airport]
+
+    df = extract_opensky_airport_flights(
+        opensky_client=opensky_client,
+        airports=["YPPH", "YBRM", "YPJT"],
+        start_datetime="2025-01-01 00:00",
+        end_datetime="2025-01-02 00:00",
+    )
+    assert sorted(df["icao24"]) == ["7c4ee8", "7c6b2d"]
+    assert opensky_client.get_departures_by_airport.call_count == 3
+    assert opensky_client.get_arrivals_by_airport.call_count == 3
+
+
 @pytest.fixture
 def setup_input_flights_df():
     return pd.DataFrame(
@@ -70,6 +221,16 @@ def test_transform_flight_data(setup_input_flights_df):
     assert "estArrivalAirportDistance" in transformed_df.columns
 
 
+def test_transform_flight_data_leaves_input_untouched(setup_input_flights_df):
+    df = setup_input_flights_df
+    columns = list(df.columns)
+    transformed_df = transform_flight_data(df)
+    assert list(df.columns) == columns
+    assert df["firstSeen"].iloc[0] == 1609459200
+    assert list(transformed_df["estDepartureAirportDistance"]) == [111.8, 167.71]
+    assert str(transformed_df["firstSeen"].dtype) == "datetime64[ns, UTC]"
+
+
 @pytest.fixture
 def setup_transformed_flights_df():
     return pd.DataFrame(
@@ -81,6 +242,8 @@ def setup_transformed_flights_df():
                 "estDepartureAirport": "JFK",
                 "estArrivalAirport": "LAX",
                 "callsign": "ABC123",
+                "airline_icao": "ABC",
+                "flight_number": "123",
                 "estDepartureAirportDistance": 111.8,
                 "estArrivalAirportDistance": 223.6,
             },
@@ -91,6 +254,8 @@ def setup_transformed_flights_df():
                 "estDepartureAirport": "SFO",
                 "estArrivalAirport": "ORD",
                 "callsign": "DEF456",
+                "airline_icao": "DEF",
+                "flight_number": "456",
                 "estDepartureAirportDistance": 167.7,
                 "estArrivalAirportDistance": 279.2,
             },
@@ -144,6 +309,179 @@ def test_enrich_airport_data(setup_transformed_flights_df, setup_airports_df):
     assert "arrival_country" in enriched_df.columns
 
 
+def test_enrich_airport_data_unknown_airport(
+    setup_transformed_flights_df, setup_airports_df
+):
+    df_airports = setup_airports_df[setup_airports_df["ident"] != "ORD"]
+    enriched_df = enrich_airport_data(setup_transformed_flights_df, df_airports)
+    assert len(enriched_df) == 2
+    assert list(enriched_df["departure_airport_name"]) == [
+        "John F Kennedy Intl",
+        "San Francisco Intl",
+    ]
+    assert enriched_df["arrival_airport_name"].iloc[0] == "Los Angeles Intl"
+    assert pd.isna(enriched_df["arrival_airport_name"].iloc[1])
+    assert str(enriched_df["firstSeen"].dtype) == "datetime64[ns, UTC]"
+
+
+def test_enrich_airport_data_shares_lookups_between_ends(
+    setup_transformed_flights_df, setup_airports_df
+):
+    df_flights = setup_transformed_flights_df.assign(
+        estDepartureAirport=["LAX", None], estArrivalAirport=["JFK", "LAX"]
+    )
+    enriched_df = enrich_airport_data(df_flights, setup_airports_df)
+    assert enriched_df["departure_airport_name"].iloc[0] == "Los Angeles Intl"
+    assert pd.isna(enriched_df["departure_airport_name"].iloc[1])
+    assert list(enriched_df["arrival_airport_name"]) == [
+        "John F Kennedy Intl",
+        "Los Angeles Intl",
+    ]
+    assert list(enriched_df["arrival_latitude"]) == [40.6413, 33.9416]
+    assert list(enriched_df["arrival_longitude"]) == [-73.7781, -118.4085]
+
+
+def test_enrich_airport_data_route_distance_and_duration(
+    setup_transformed_flights_df, setup_airports_df
+):
+    df_airports = setup_airports_df[setup_airports_df["ident"] != "ORD"]
+    enriched_df = enrich_airport_data(setup_transformed_flights_df, df_airports)
+    # JFK to LAX is about 3974 km along the great circle
+    assert enriched_df["route_distance_km"].iloc[0] == pytest.approx(3974.3, abs=0.1)
+    assert pd.isna(enriched_df["route_distance_km"].iloc[1])
+    assert list(enriched_df["flight_duration_seconds"]) == [3600, 3600]
+    assert enriched_df["flight_duration_seconds"].dtype == "int64"
+
+
+def test_transform_flight_data_splits_callsigns(setup_input_flights_df):
+    df = setup_input_flights_df.assign(callsign=["QFA123  ", "VHOQA   "])
+    transformed_df = transform_flight_data(df)
+    assert list(transformed_df["airline_icao"].astype(object).fillna("")) == [
+        "QFA",
+        "",
+    ]
+    assert list(transformed_df["flight_number"]) == ["123", None]
+
+
+def test_enrich_airline_data(setup_transformed_flights_df, setup_airports_df):
+    enriched_df = enrich_airport_data(setup_transformed_flights_df, setup_airports_df)
+    df_airlines = pd.DataFrame(
+        {"name": ["ABC Airways"], "country": ["Australia"]},
+        index=pd.Index(["ABC"], name="icao"),
+    )
+    enriched_df = enrich_airline_data(enriched_df, df_airlines)
+    assert enriched_df["airline_name"].iloc[0] == "ABC Airways"
+    assert pd.isna(enriched_df["airline_country"].iloc[1])
+    assert enriched_df["airline_name"].dtype == "category"
+
+    enriched_df = enrich_airline_data(
+        enriched_df.drop(columns=["airline_name", "airline_country"])
+    )
+    assert enriched_df[["airline_name", "airline_country"]].isna().all(axis=None)
+
+
+def test_enrich_aircraft_data(setup_transformed_flights_df, tmp_path):
+    aircraft_registry_path = tmp_path / "aircraftDatabase.csv"
+    aircraft_registry_path.write_text(
+        "icao24,manufacturername,typecode,operator\n" "abc123,Airbus,A320,ABC Airways\n"
+    )
+    aircraft_registry = load_aircraft_registry(aircraft_registry_path)
+
+    enriched_df = enrich_aircraft_data(setup_transformed_flights_df, aircraft_registry)
+    assert enriched_df["aircraft_type"].iloc[0] == "A320"
+    assert enriched_df["aircraft_manufacturer"].iloc[0] == "Airbus"
+    assert enriched_df["aircraft_operator"].iloc[0] == "ABC Airways"
+    assert enriched_df[["aircraft_type", "aircraft_operator"]].iloc[1].isna().all()
+    assert enriched_df["aircraft_type"].dtype == "category"
+
+    enriched_df = enrich_aircraft_data(setup_transformed_flights_df)
+    assert enriched_df[["aircraft_type", "aircraft_operator"]].isna().all(axis=None)
+
+
+def test_infer_missing_airports(setup_transformed_flights_df, setup_airports_df):
+    df_flights = setup_transformed_flights_df.assign(
+        firstSeen=pd.to_datetime(setup_transformed_flights_df["firstSeen"], utc=True),
+        estDepartureAirport=["JFK", None],
+        estArrivalAirport=[None, None],
+    )
+    df_tracks = pd.DataFrame(
+        {
+            "icao24": ["def456", "abc123"],
+            "firstSeen": df_flights["firstSeen"].iloc[::-1].to_numpy(),
+            "start_latitude": [37.62, 40.64],
+            "start_longitude": [-122.37, -73.78],
+            "end_latitude": [41.97, 10.0],
+            "end_longitude": [-87.9, 10.0],
+        }
+    )
+    airport_index = build_airport_index(
+        with_airport_positions(setup_airports_df.set_index("ident")), max_radius_km=15
+    )
+
+    df_inferred = infer_missing_airports(df_flights, df_tracks, airport_index)
+
+    assert list(df_inferred["estDepartureAirport"]) == ["JFK", "SFO"]
+    assert list(df_inferred["departure_airport_inferred"]) == [False, True]
+    assert list(df_inferred["estArrivalAirport"].astype(object).fillna("")) == [
+        "",
+        "ORD",
+    ]
+    assert list(df_inferred["arrival_airport_inferred"]) == [False, True]
+
+    enriched_df = enrich_airport_data(df_inferred, setup_airports_df)
+    assert enriched_df["departure_airport_name"].iloc[1] == "San Francisco Intl"
+    assert list(enriched_df["departure_airport_inferred"]) == [False, True]
+    assert not enrich_airport_data(df_flights, setup_airports_df)[
+        "arrival_airport_inferred"
+    ].any()
+
+
+def test_transform_flight_data_rejects_unknown_engine(setup_input_flights_df):
+    with pytest.raises(Exception):
+        transform_flight_data(setup_input_flights_df, engine="polars")
+
+
+def test_enrich_airport_data_uses_categoricals(
+    setup_transformed_flights_df, setup_airports_df
+):
+    enriched_df = enrich_airport_data(setup_transformed_flights_df, setup_airports_df)
+    for column in [
+        "estDepartureAirport",
+        "departure_airport_type",
+        "departure_country",
+        "arrival_airport_name",
+    ]:
+        assert enriched_df[column].dtype == "category"
+    assert enriched_df["arrival_latitude"].dtype == "float64"
+    assert list(enriched_df["departure_airport_type"].cat.categories) == [
+        "large_airport"
+    ]
+    assert enriched_df.to_dict(orient="records")[1]["arrival_country"] == "US"
+
+
+def test_missing_values_are_loaded_as_null(
+    setup_transformed_flights_df, setup_airports_df
+):
+    df_airports = setup_airports_df[setup_airports_df["ident"] != "ORD"]
+    enriched_df = enrich_airline_data(
+        enrich_airport_data(setup_transformed_flights_df, df_airports)
+    )
+    postgresql_client = MagicMock()
+    load(
+        df=enriched_df,
+        postgresql_client=postgresql_client,
+        table=MagicMock(),
+        metadata=MagicMock(),
+        load_method="upsert",
+    )
+    data = postgresql_client.upsert.call_args.kwargs["data"]
+    assert data[0]["route_distance_km"] == enriched_df["route_distance_km"].iloc[0]
+    assert data[1]["route_distance_km"] is None
+    assert data[1]["arrival_latitude"] is None
+    assert data[1]["arrival_airport_name"] is None
+    assert data[1]["airline_name"] is None
+
+
 @pytest.fixture
 def setup_postgresql_client():
     load_dotenv()
@@ -0,0 +1,219 @@
+import pytest
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pytest.skip("the arrow engine needs pyarrow", allow_module_level=True)
+
+from etl_project.assets.opensky_flights import (
+    transform_flight_data,
+    enrich_airport_data,
+    enrich_airline_data,
+    enrich_aircraft_data,
+    infer_missing_airports,
+    extract_opensky_flights,
+    load,
+)
+from etl_project.assets.flight_schema import build_flights_frame
+from etl_project.assets.airport_index import build_airport_index
+from etl_project.assets.reference_data import with_airport_positions
+from etl_project.assets.aircraft_registry import load_aircraft_registry
+from unittest.mock import MagicMock
+from sqlalchemy import Table, MetaData, Column, String, DateTime
+import pandas as pd
+
+
+@pytest.fixture
+def setup_flight_records():
+    return [
+        {
+            "icao24": "abc123",
+            "firstSeen": 1609459200,
+            "lastSeen": 1609462800,
+            "estDepartureAirportHorizDistance": 100,
+            "estDepartureAirportVertDistance": 50,
+            "estArrivalAirportHorizDistance": 200,
+            "estArrivalAirportVertDistance": 100,
+            "estDepartureAirport": "JFK",
+            "estArrivalAirport": "LAX",
+            "callsign": "ABC123",
+        },
+        {
+            "icao24": "def456",
+            "firstSeen": 1609459200,
+            "lastSeen": 1609462800,
+            "estDepartureAirportHorizDistance": 150,
+            "estDepartureAirportVertDistance": None,
+            "estArrivalAirportHorizDistance": 250,
+            "estArrivalAirportVertDistance": 125,
+            "estDepartureAirport": "SFO",
+            "estArrivalAirport": None,
+            "callsign": "DEF456",
+        },
+    ]
+
+
+@pytest.fixture
+def setup_airports_df():
+    return pd.DataFrame(
+        [
+            {
+                "ident": "JFK",
+                "type": "large_airport",
+                "name": "John F Kennedy Intl",
+                "iso_country": "US",
+                "coordinates": "-73.7781,40.6413",
+            },
+            {
+                "ident": "LAX",
+                "type": "large_airport",
+                "name": "Los Angeles Intl",
+                "iso_country": "US",
+                "coordinates": "-118.4085,33.9416",
+            },
+        ]
+    )
+
+
+def test_extract_opensky_flights_arrow(setup_flight_records):
+    opensky_client = MagicMock()
+    opensky_client.iter_flights.return_value = iter(setup_flight_records)
+
+    table = extract_opensky_flights(
+        opensky_client=opensky_client,
+        start_datetime="2021-01-01 00:00",
+        end_datetime="2021-01-01 01:00",
+        engine="arrow",
+    )
+
+    assert isinstance(table, pa.Table)
+    assert table.num_rows == 2
+    assert pa.types.is_dictionary(table.schema.field("estDepartureAirport").type)
+
+
+def test_arrow_engine_matches_pandas_engine(
+    setup_flight_records, setup_airports_df, tmp_path
+):
+    df_flights = build_flights_frame(records=setup_flight_records)
+    table_flights = pa.Table.from_pylist(setup_flight_records)
+
+    df_enriched = enrich_airport_data(
+        transform_flight_data(df_flights), setup_airports_df
+    )
+    table_enriched = enrich_airport_data(
+        transform_flight_data(table_flights, engine="arrow"),
+        setup_airports_df,
+        engine="arrow",
+    )
+    df_airlines = pd.DataFrame(
+        {"name": ["DEF Air"], "country": ["US"]}, index=pd.Index(["DEF"], name="icao")
+    )
+    df_enriched = enrich_airline_data(df_enriched, df_airlines)
+    table_enriched = enrich_airline_data(table_enriched, df_airlines, engine="arrow")
+    aircraft_registry_path = tmp_path / "aircraftDatabase.csv"
+    aircraft_registry_path.write_text(
+        "icao24,manufacturername,typecode,operator\ndef456,Boeing,B738,\n"
+    )
+    aircraft_registry = load_aircraft_registry(aircraft_registry_path)
+    df_enriched = enrich_aircraft_data(df_enriched, aircraft_registry)
+    table_enriched = enrich_aircraft_data(
+        table_enriched, aircraft_registry, engine="arrow"
+    )
+
+    assert table_enriched.column_names == list(df_enriched.columns)
+    df_from_arrow = table_enriched.to_pandas()
+    for column in [
+        "callsign",
+        "airline_icao",
+        "flight_number",
+        "departure_airport_name",
+        "arrival_country",
+        "airline_name",
+        "aircraft_type",
+        "aircraft_operator",
+    ]:
+        assert list(df_from_arrow[column].astype(object).fillna("")) == list(
+            df_enriched[column].astype(object).fillna("")
+        )
+    assert df_from_arrow["estDepartureAirportDistance"].iloc[0] == pytest.approx(111.8)
+    assert pd.isna(df_from_arrow["estDepartureAirportDistance"].iloc[1])
+    assert list(df_from_arrow["flight_duration_seconds"]) == list(
+        df_enriched["flight_duration_seconds"]
+    )
+    assert list(df_from_arrow["route_distance_km"].fillna(-1)) == list(
+        df_enriched["route_distance_km"].fillna(-1)
+    )
+
+
+def test_infer_missing_airports_arrow(setup_flight_records, setup_airports_df):
+    df_tracks = pd.DataFrame(
+        {
+            "icao24": ["def456"],
+            "firstSeen": pd.to_datetime([1609459200], unit="s", utc=True),
+            "start_latitude": [37.62],
+            "start_longitude": [-122.37],
+            "end_latitude": [33.95],
+            "end_longitude": [-118.41],
+        }
+    )
+    airport_index = build_airport_index(
+        with_airport_positions(setup_airports_df.set_index("ident")), max_radius_km=15
+    )
+    table_inferred = infer_missing_airports(
+        transform_flight_data(pa.Table.from_pylist(setup_flight_records), "arrow"),
+        df_tracks,
+        airport_index,
+        engine="arrow",
+    )
+    df_inferred = infer_missing_airports(
+        transform_flight_data(build_flights_frame(setup_flight_records)),
+        df_tracks,
+        airport_index,
+    )
+
+    df_from_arrow = table_inferred.to_pandas()
+    assert list(df_from_arrow["estArrivalAirport"]) == ["LAX", "LAX"]
+    assert list(df_from_arrow["arrival_airport_inferred"]) == [False, True]
+    for column in ["estDepartureAirport", "estArrivalAirport"]:
+        assert list(df_from_arrow[column]) == list(df_inferred[column])
+    table_enriched = enrich_airport_data(
+        table_inferred, setup_airports_df, engine="arrow"
+    )
+    assert table_enriched.column_names == list(
+        enrich_airport_data(df_inferred, setup_airports_df).columns
+    )
+    assert table_enriched["arrival_airport_name"].to_pylist()[1] == "Los Angeles Intl"
+
+
+def test_load_arrow_copies_csv(setup_flight_records, setup_airports_df):
+    table_enriched = enrich_airport_data(
+        transform_flight_data(pa.Table.from_pylist(setup_flight_records), "arrow"),
+        setup_airports_df,
+        engine="arrow",
+    )
+    metadata = MetaData()
+    table = Table(
+        "flights",
+        metadata,
+        Column("icao24", String, primary_key=True),
+        Column("firstSeen", DateTime(timezone=True), primary_key=True),
+        Column("arrival_airport_name", String),
+    )
+    postgresql_client = MagicMock()
+
+    load(
+        df=table_enriched,
+        postgresql_client=postgresql_client,
+        table=table,
+        metadata=metadata,
+        load_method="upsert",
+        engine="arrow",
+    )
+
+    kwargs = postgresql_client.upsert_csv.call_args.kwargs
+    assert kwargs["columns"] == ["icao24", "firstSeen", "arrival_airport_name"]
+    assert kwargs["csv_file"].read().decode().splitlines() == [
+        '"icao24","firstSeen","arrival_airport_name"',
+        '"abc123",2021-01-01 00:00:00Z,"Los Angeles Intl"',
+        '"def456",2021-01-01 00:00:00Z,',
+    ]
@@ -0,0 +1,97 @@
+from etl_project.assets.opensky_states import (
+    extract_opensky_states,
+    transform_state_vectors,
+    StateVectorBuffer,
+    GREATER_PERTH_BBOX,
+)
+from unittest.mock import MagicMock
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def setup_opensky_client():
+    opensky_client = MagicMock()
+    opensky_client.get_states.return_value = {
+        "time": 1735689600,
+        "states": [
+            [
+                "7c6b2d",
+                "QFA123  ",
+                "Australia",
+                1735689598,
+                1735689599,
+                115.96,
+                -31.94,
+                1524.0,
+                False,
+                120.5,
+                230.0,
+                -5.2,
+                None,
+                1600.0,
+                "1234",
+                False,
+                0,
+            ],
+            [
+                "7c4ee8",
+                "VOZ456  ",
+                "Australia",
+                None,
+                1735689590,
+                None,
+                None,
+                None,
+                True,
+                0.0,
+                None,
+                None,
+                None,
+                None,
+                None,
+                False,
+                0,
+            ],
+        ],
+    }
+    return opensky_client
+
+
+def test_extract_and_transform_state_vectors(setup_opensky_client):
+    df_states = extract_opensky_states(setup_opensky_client, bbox=GREATER_PERTH_BBOX)
+    setup_opensky_client.get_states.assert_called_once_with(
+        lamin=-32.6, lomin=115.6, lamax=-31.4, lomax=116.3
+    )
+    df_transformed = transform_state_vectors(df_states)
+    assert len(df_transformed) == 2
+    assert df_transformed["callsign"].tolist() == ["QFA123", "VOZ456"]
+    assert str(df_transformed["snapshot_time"].dtype) == "datetime64[ns, UTC]"
+
+
+def test_state_vector_buffer_flushes_deduplicated_batches(setup_opensky_client):
+    state_vector_buffer = StateVectorBuffer(flush_interval_seconds=3600, max_rows=4)
+    df_transformed = transform_state_vectors(
+        extract_opensky_states(setup_opensky_client, bbox=GREATER_PERTH_BBOX)
+    )
+    state_vector_buffer.add(df_transformed)
+    assert not state_vector_buffer.should_flush()
+    state_vector_buffer.add(df_transformed)
+    assert state_vector_buffer.should_flush()
+    assert len(state_vector_buffer.flush()) == 2
+    assert state_vector_buffer.rows == 0
+
+
+def test_state_vector_buffer_discards_oldest_rows_beyond_cap(setup_opensky_client):
+    state_vector_buffer = StateVectorBuffer(
+        flush_interval_seconds=3600, max_rows=2, max_buffered_rows=3
+    )
+    df_transformed = transform_state_vectors(
+        extract_opensky_states(setup_opensky_client, bbox=GREATER_PERTH_BBOX)
+    )
+    state_vector_buffer.add(df_transformed)
+    state_vector_buffer.restore(df_transformed.assign(callsign="OLD"))
+
+    assert state_vector_buffer.rows == 3
+    df_flushed = pd.concat(state_vector_buffer.frames)
+    assert df_flushed["callsign"].tolist() == ["OLD", "QFA123", "VOZ456"]
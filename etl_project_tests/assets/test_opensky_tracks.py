@@ -0,0 +1,129 @@
+from etl_project.assets.opensky_tracks import (
+    encode_track_path,
+    decode_track_path,
+    drop_stored_flights,
+    extract_opensky_tracks,
+    match_track_endpoints,
+)
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def setup_track_path():
+    return [
+        [1735689600, -31.9403, 115.9669, None, 230.0, True],
+        [1735689660, -31.9512, 115.9501, 457.2, 231.4, False],
+        [1735689725, -31.9698, 115.9213, 1219.2, None, False],
+        [1735689790, None, None, 1500.0, 232.0, False],
+        [1735689850, -31.9901, 115.8844, 2133.6, 233.9, False],
+    ]
+
+
+def test_encode_decode_track_path_round_trip(setup_track_path):
+    df_path = decode_track_path(encode_track_path(setup_track_path))
+    expected = [waypoint for waypoint in setup_track_path if waypoint[1] is not None]
+    assert len(df_path) == len(expected)
+    assert list(df_path["time"].astype("int64") // 10**9) == [w[0] for w in expected]
+    assert np.allclose(df_path["latitude"], [w[1] for w in expected], atol=1e-5)
+    assert np.allclose(df_path["longitude"], [w[2] for w in expected], atol=1e-5)
+    assert np.isnan(df_path["baro_altitude"].iloc[0])
+    assert df_path["baro_altitude"].iloc[1] == 457
+    assert np.isnan(df_path["true_track"].iloc[2])
+    assert df_path["true_track"].iloc[1] == pytest.approx(231.4)
+    assert list(df_path["on_ground"]) == [True, False, False, False]
+
+
+def test_encode_track_path_empty():
+    assert decode_track_path(encode_track_path([])).empty
+
+
+def test_extract_opensky_tracks_skips_flights_without_track(setup_track_path):
+    opensky_client = MagicMock()
+    opensky_client.get_track.side_effect = lambda icao24, snapshot_time: (
+        {
+            "icao24": icao24,
+            "startTime": 1735689600,
+            "endTime": 1735689850,
+            "callsign": "QFA123  ",
+            "path": setup_track_path,
+        }
+        if icao24 == "7c6b2d"
+        else None
+    )
+    df_flights = pd.DataFrame(
+        {
+            "icao24": ["7c6b2d", "7c4ee8"],
+            "firstSeen": pd.to_datetime([1735689600, 1735689600], unit="s", utc=True),
+            "lastSeen": pd.to_datetime([1735693200, 1735693200], unit="s", utc=True),
+        }
+    )
+
+    df_tracks, df_failed_flights = extract_opensky_tracks(
+        opensky_client=opensky_client, df_flights=df_flights, max_workers=2
+    )
+
+    opensky_client.get_track.assert_any_call(icao24="7c6b2d", snapshot_time=1735691400)
+    assert list(df_tracks["icao24"]) == ["7c6b2d"]
+    assert df_failed_flights.empty
+    assert df_tracks["callsign"].iloc[0] == "QFA123"
+    assert df_tracks["waypoint_count"].iloc[0] == 4
+    assert len(decode_track_path(df_tracks["path"].iloc[0])) == 4
+    assert df_tracks["start_latitude"].iloc[0] == -31.9403
+    assert df_tracks["end_longitude"].iloc[0] == 115.8844
+
+    df_endpoints = match_track_endpoints(
+        icao24=df_flights["icao24"],
+        first_seen=df_flights["firstSeen"],
+        df_tracks=df_tracks,
+    )
+    assert list(df_endpoints["start_longitude"].fillna(0)) == [115.9669, 0]
+
+
+def test_extract_opensky_tracks_returns_failed_flights():
+    opensky_client = MagicMock()
+    opensky_client.get_track.side_effect = Exception("503 Service Unavailable")
+    df_flights = pd.DataFrame(
+        {
+            "icao24": ["7c6b2d"],
+            "firstSeen": pd.to_datetime([1735689600], unit="s", utc=True),
+            "lastSeen": pd.to_datetime([1735693200], unit="s", utc=True),
+        }
+    )
+
+    df_tracks, df_failed_flights = extract_opensky_tracks(
+        opensky_client=opensky_client, df_flights=df_flights
+    )
+
+    assert df_tracks.empty
+    assert list(df_failed_flights["icao24"]) == ["7c6b2d"]
+
+
+def test_drop_stored_flights():
+    df_flights = pd.DataFrame(
+        {
+            "icao24": ["7c6b2d", "7c6b2d", "7c4ee8"],
+            "firstSeen": pd.to_datetime(
+                [1735689600, 1735700000, 1735689600], unit="s", utc=True
+            ),
+        }
+    )
+    df_stored_tracks = pd.DataFrame(
+        {
+            "icao24": ["7c6b2d"],
+            "firstSeen": pd.to_datetime([1735689600], unit="s", utc=True),
+        }
+    )
+
+    df_unstored = drop_stored_flights(
+        df_flights=df_flights, df_stored_tracks=df_stored_tracks
+    )
+
+    assert list(df_unstored.index) == [1, 2]
+    assert len(
+        drop_stored_flights(
+            df_flights=df_flights, df_stored_tracks=df_stored_tracks.iloc[:0]
+        )
+    ) == len(df_flights)
@@ -0,0 +1,89 @@
+import os
+import pandas as pd
+from etl_project.assets.reference_data import (
+    read_airport_reference,
+    get_airport_reference,
+    index_airport_reference,
+    compile_airport_reference,
+    compiled_reference_path,
+    load_airport_reference,
+    read_compiled_airport_reference,
+)
+
+AIRPORT_CODES_CSV = (
+    "ident,type,name,elevation_ft,continent,iso_country,coordinates\n"
+    'YPPH,large_airport,Perth Airport,67,OC,AU,"115.967, -31.9403"\n'
+    'YSSY,large_airport,Sydney Airport,21,OC,AU,"151.177, -33.9461"\n'
+    'YPPH,closed,Duplicate,0,OC,AU,"0, 0"\n'
+    'FYWH,large_airport,Hosea Kutako,5640,AF,NA,"17.4709, -22.4799"\n'
+    "X001,heliport,,0,OC,AU,\n"
+)
+
+
+def test_read_airport_reference(tmp_path):
+    airport_codes_path = tmp_path / "airport-codes.csv"
+    airport_codes_path.write_text(AIRPORT_CODES_CSV)
+    df_airports = read_airport_reference(airport_codes_path)
+    assert list(df_airports.index) == ["YPPH", "YSSY", "FYWH", "X001"]
+    assert list(df_airports.columns) == [
+        "type",
+        "name",
+        "iso_country",
+        "latitude",
+        "longitude",
+    ]
+    assert df_airports.loc["YPPH", "name"] == "Perth Airport"
+    assert df_airports.loc["FYWH", "iso_country"] == "NA"
+    assert df_airports.loc["YPPH", "latitude"] == -31.9403
+    assert df_airports.loc["YPPH", "longitude"] == 115.967
+    assert pd.isna(df_airports.loc["X001", "latitude"])
+    assert index_airport_reference(df_airports) is df_airports
+
+
+def test_get_airport_reference_reloads_changed_file(tmp_path):
+    airport_codes_path = tmp_path / "airport-codes.csv"
+    airport_codes_path.write_text(AIRPORT_CODES_CSV)
+    df_airports = get_airport_reference(str(airport_codes_path))
+    assert get_airport_reference(str(airport_codes_path)) is df_airports
+
+    airport_codes_path.write_text(
+        AIRPORT_CODES_CSV
+        + 'YMML,large_airport,Melbourne,434,OC,AU,"144.843, -37.6733"\n'
+    )
+    stat = airport_codes_path.stat()
+    os.utime(airport_codes_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    df_reloaded = get_airport_reference(str(airport_codes_path))
+    assert df_reloaded is not df_airports
+    assert "YMML" in df_reloaded.index
+
+
+def test_compiled_airport_reference_matches_csv(tmp_path):
+    airport_codes_path = tmp_path / "airport-codes.csv"
+    airport_codes_path.write_text(AIRPORT_CODES_CSV)
+    compiled_path = compile_airport_reference(airport_codes_path)
+    assert compiled_path == compiled_reference_path(airport_codes_path)
+
+    df_compiled = read_compiled_airport_reference(compiled_path)
+    pd.testing.assert_frame_equal(
+        df_compiled, read_airport_reference(airport_codes_path).sort_index()
+    )
+    assert df_compiled.index.is_monotonic_increasing
+
+
+def test_load_airport_reference_rebuilds_stale_compiled_reference(tmp_path):
+    airport_codes_path = tmp_path / "airport-codes.csv"
+    airport_codes_path.write_text(AIRPORT_CODES_CSV)
+    assert list(load_airport_reference(airport_codes_path).index) == [
+        "FYWH",
+        "X001",
+        "YPPH",
+        "YSSY",
+    ]
+    manifest_path = compiled_reference_path(airport_codes_path) / "manifest.json"
+    assert manifest_path.exists()
+
+    airport_codes_path.write_text(
+        AIRPORT_CODES_CSV
+        + 'YMML,large_airport,Melbourne,434,OC,AU,"144.843, -37.6733"\n'
+    )
+    assert "YMML" in load_airport_reference(airport_codes_path).index
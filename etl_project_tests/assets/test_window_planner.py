@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+import requests
+from etl_project.assets.window_planner import (
+    AdaptiveWindowPlanner,
+    is_oversized_window_error,
+)
+from etl_project.connectors.opensky_flights import OpenSkyApiError
+from etl_project.connectors.opensky_rate_limiter import CreditBudgetExhausted
+
+
+def _utc(hour: int, minute: int = 0) -> datetime:
+    return datetime(2025, 1, 1, hour, minute, tzinfo=timezone.utc)
+
+
+def test_plan_without_history_uses_hourly_windows():
+    window_planner = AdaptiveWindowPlanner()
+    windows = window_planner.plan("2025-01-01 00:00", "2025-01-01 03:00")
+    assert windows == [
+        {"start_time": _utc(0), "end_time": _utc(1)},
+        {"start_time": _utc(1), "end_time": _utc(2)},
+        {"start_time": _utc(2), "end_time": _utc(3)},
+    ]
+
+
+def test_plan_merges_sparse_and_splits_dense_hours():
+    window_planner = AdaptiveWindowPlanner(target_records=1000, max_span_seconds=7200)
+    window_planner.density = {"0": 100, "1": 100, "2": 100, "3": 2500}
+    windows = window_planner.plan("2025-01-01 00:00", "2025-01-01 04:00")
+    assert windows == [
+        {"start_time": _utc(0), "end_time": _utc(2)},
+        {"start_time": _utc(2), "end_time": _utc(3)},
+        {"start_time": _utc(3), "end_time": _utc(3, 20)},
+        {"start_time": _utc(3, 20), "end_time": _utc(3, 40)},
+        {"start_time": _utc(3, 40), "end_time": _utc(4)},
+    ]
+
+
+def test_split_and_record(tmp_path):
+    density_path = str(tmp_path / "density.json")
+    window_planner = AdaptiveWindowPlanner(
+        density_path=density_path, min_span_seconds=1800
+    )
+    date_range = {"start_time": _utc(5), "end_time": _utc(6)}
+    assert window_planner.split(date_range) == [
+        {"start_time": _utc(5), "end_time": _utc(5, 30)},
+        {"start_time": _utc(5, 30), "end_time": _utc(6)},
+    ]
+    assert window_planner.split({"start_time": _utc(5), "end_time": _utc(5, 30)}) == []
+
+    window_planner.record(date_range=date_range, records=500, seconds=1)
+    window_planner.save()
+    assert AdaptiveWindowPlanner(density_path=density_path).density == {"5": 500}
+
+
+def test_only_oversized_window_errors_are_split():
+    assert is_oversized_window_error(requests.ReadTimeout())
+    assert is_oversized_window_error(OpenSkyApiError("too large", status_code=413))
+    assert is_oversized_window_error(OpenSkyApiError("timeout", status_code=504))
+    assert not is_oversized_window_error(requests.ConnectTimeout())
+    assert not is_oversized_window_error(OpenSkyApiError("denied", status_code=403))
+    assert not is_oversized_window_error(CreditBudgetExhausted("no credits left"))
+    assert not is_oversized_window_error(Exception("unexpected"))
@@ -0,0 +1,30 @@
+from etl_project.connectors.json_stream import iter_json_array
+import json
+import pytest
+
+
+def _chunked(payload: bytes, chunk_size: int) -> list[bytes]:
+    return [payload[i : i + chunk_size] for i in range(0, len(payload), chunk_size)]
+
+
+def test_iter_json_array_decodes_any_chunking():
+    records = [
+        {"icao24": f"abc{i}", "callsign": "QFA123  ", "name": "Zürich"}
+        for i in range(50)
+    ]
+    payload = json.dumps(records, ensure_ascii=False, indent=1).encode("utf-8")
+    for chunk_size in [1, 7, 64, len(payload)]:
+        assert list(iter_json_array(_chunked(payload, chunk_size))) == records
+
+
+def test_iter_json_array_projects_fields():
+    payload = b'[{"icao24": "abc123", "callsign": "QFA1", "extra": 1}]'
+    assert list(iter_json_array([payload], fields=["icao24", "lastSeen"])) == [
+        {"icao24": "abc123", "lastSeen": None}
+    ]
+
+
+def test_iter_json_array_empty_and_truncated():
+    assert list(iter_json_array([b" [ ] "])) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[{"icao24": "abc1'], fields=None))
@@ -1,7 +1,9 @@
 from dotenv import load_dotenv
 from etl_project.connectors.opensky_flights import OpenSkyApiClient
+from etl_project.stand_in.opensky_api import OpenSkyStandInServer
 import os
 import pytest
+from unittest.mock import MagicMock
 from datetime import datetime, timezone
 
 
@@ -32,3 +34,78 @@ def test_opensky_client_get_flights(setup):
 
     assert type(data) == list
     assert len(data) > 0
+
+
+def test_opensky_client_session_is_pooled_and_compressed():
+    opensky_client = OpenSkyApiClient(pool_maxsize=4, read_timeout=30)
+    adapter = opensky_client.session.get_adapter(opensky_client.base_url)
+
+    assert adapter._pool_maxsize == 4
+    assert opensky_client.timeout == (10.0, 30)
+    assert "gzip" in opensky_client.session.headers["Accept-Encoding"]
+    opensky_client.close()
+
+
+def test_opensky_client_retries_retryable_status_codes():
+    opensky_client = OpenSkyApiClient(max_attempts=3, backoff_base_seconds=0)
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+    ok = MagicMock(status_code=200, headers={})
+    opensky_client.session.get = MagicMock(side_effect=[throttled, ok])
+
+    assert opensky_client._send(endpoint="/flights/all", params={}) is ok
+    assert opensky_client.session.get.call_count == 2
+
+
+def test_opensky_client_gives_up_after_max_attempts():
+    opensky_client = OpenSkyApiClient(max_attempts=2, backoff_base_seconds=0)
+    unavailable = MagicMock(status_code=503, headers={}, text="unavailable")
+    opensky_client.session.get = MagicMock(return_value=unavailable)
+
+    with pytest.raises(Exception):
+        opensky_client._send(endpoint="/flights/all", params={})
+    assert opensky_client.session.get.call_count == 2
+
+
+def test_opensky_client_airport_flights_not_found_is_empty():
+    opensky_client = OpenSkyApiClient(max_attempts=1)
+    not_found = MagicMock(status_code=404, headers={}, text="Not found")
+    opensky_client.session.get = MagicMock(return_value=not_found)
+
+    assert (
+        opensky_client.get_arrivals_by_airport(
+            airport="YPPH", start_time=1735689600, end_time=1735776000
+        )
+        == []
+    )
+    assert opensky_client.session.get.call_args.kwargs["params"]["airport"] == "YPPH"
+
+
+def test_opensky_client_track_not_found_is_none():
+    opensky_client = OpenSkyApiClient(max_attempts=1)
+    not_found = MagicMock(status_code=404, headers={}, text="Not found")
+    opensky_client.session.get = MagicMock(return_value=not_found)
+
+    assert opensky_client.get_track(icao24="7c6b2d", snapshot_time=1735691400) is None
+    assert opensky_client.session.get.call_args.kwargs["params"] == {
+        "icao24": "7c6b2d",
+        "time": 1735691400,
+    }
+
+
+def test_opensky_client_against_stand_in_server():
+    with OpenSkyStandInServer(
+        flights_per_hour=500, throttle_every=2, retry_after_seconds=0
+    ) as server:
+        opensky_client = OpenSkyApiClient(
+            base_url=server.base_url, backoff_base_seconds=0
+        )
+        flights = opensky_client.get_flights(start_time=1735689600, end_time=1735693200)
+        streamed = list(
+            opensky_client.iter_flights(start_time=1735689600, end_time=1735693200)
+        )
+        opensky_client.close()
+
+    assert len(flights) == 500
+    assert streamed == flights
+    assert opensky_client.last_request_stats["content_encoding"] == "gzip"
+    assert server.status_counts == {200: 2, 429: 1}
@@ -0,0 +1,62 @@
+from etl_project.connectors.opensky_rate_limiter import (
+    OpenSkyRateLimiter,
+    CreditBudgetExhausted,
+)
+import pytest
+
+
+def test_request_cost():
+    assert (
+        OpenSkyRateLimiter.request_cost("/flights/all", {"begin": 0, "end": 3600}) == 1
+    )
+    assert (
+        OpenSkyRateLimiter.request_cost("/flights/all", {"begin": 0, "end": 7200}) == 2
+    )
+    assert OpenSkyRateLimiter.request_cost("/states/all", {}) == 4
+    perth_bbox = {"lamin": -32.6, "lomin": 115.6, "lamax": -31.4, "lomax": 116.3}
+    assert OpenSkyRateLimiter.request_cost("/states/all", perth_bbox) == 1
+
+
+def test_credit_usage_is_persisted(tmp_path):
+    usage_path = str(tmp_path / "usage.json")
+    rate_limiter = OpenSkyRateLimiter(daily_credits=100, usage_path=usage_path)
+    rate_limiter.acquire("/flights/all", {"begin": 0, "end": 7200})
+    assert rate_limiter.credits_used_today() == 2
+
+    restarted_rate_limiter = OpenSkyRateLimiter(
+        daily_credits=100, usage_path=usage_path
+    )
+    assert restarted_rate_limiter.credits_used_today() == 2
+
+
+def test_daily_budget_is_not_exceeded():
+    rate_limiter = OpenSkyRateLimiter(daily_credits=3, burst_credits=3)
+    rate_limiter.acquire("/flights/all", {"begin": 0, "end": 7200})
+    with pytest.raises(CreditBudgetExhausted):
+        rate_limiter.acquire("/flights/all", {"begin": 0, "end": 7200})
+
+
+def test_remaining_credits_header_overrides_local_usage():
+    rate_limiter = OpenSkyRateLimiter(daily_credits=4000)
+    rate_limiter.update_from_response({"X-Rate-Limit-Remaining": "3990"})
+    assert rate_limiter.credits_used_today() == 10
+    assert rate_limiter.tokens <= 3990
+
+
+def test_credit_usage_is_shared_between_limiters(tmp_path):
+    usage_path = str(tmp_path / "usage.json")
+    flights_limiter = OpenSkyRateLimiter(
+        daily_credits=6, burst_credits=10, usage_path=usage_path
+    )
+    states_limiter = OpenSkyRateLimiter(
+        daily_credits=6, burst_credits=10, usage_path=usage_path
+    )
+    flights_limiter.acquire("/flights/all", {"begin": 0, "end": 5 * 3600})
+    states_limiter.acquire("/tracks/all", {})
+
+    restarted_limiter = OpenSkyRateLimiter(
+        daily_credits=6, burst_credits=10, usage_path=usage_path
+    )
+    assert restarted_limiter.credits_used_today() == 6
+    with pytest.raises(CreditBudgetExhausted):
+        flights_limiter.acquire("/tracks/all", {})
@@ -0,0 +1,54 @@
+from etl_project.connectors.opensky_response_cache import OpenSkyResponseCache
+import time
+
+
+def test_cache_round_trip(tmp_path):
+    cache = OpenSkyResponseCache(cache_dir=str(tmp_path))
+    params = {"begin": 1735689601, "end": 1735693200}
+    assert cache.get("/flights/all", params) is None
+
+    cache.put("/flights/all", params, b'[{"icao24": "abc123"}]')
+    assert cache.get("/flights/all", params) == b'[{"icao24": "abc123"}]'
+    assert cache.get("/flights/all", {"begin": 1735689601, "end": 1735696800}) is None
+
+
+def test_recent_windows_are_not_cacheable(tmp_path):
+    cache = OpenSkyResponseCache(cache_dir=str(tmp_path), finality_seconds=3600)
+    now = int(time.time())
+    assert not cache.is_cacheable("/flights/all", {"begin": now - 600, "end": now})
+    assert cache.is_cacheable("/flights/all", {"begin": 0, "end": now - 7200})
+    assert not cache.is_cacheable("/states/all", {})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = OpenSkyResponseCache(cache_dir=str(tmp_path), max_bytes=10**9)
+    payload = bytes(range(256)) * 64
+    for end in [3600, 7200, 10800]:
+        cache.put("/flights/all", {"begin": end - 3600, "end": end}, payload)
+        time.sleep(0.01)
+    cache.get("/flights/all", {"begin": 0, "end": 3600})
+    entry_size = next(tmp_path.glob("*/*.json.gz")).stat().st_size
+
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    assert cache.get("/flights/all", {"begin": 0, "end": 3600}) is not None
+    assert cache.get("/flights/all", {"begin": 3600, "end": 7200}) is None
+    assert cache.get("/flights/all", {"begin": 7200, "end": 10800}) is not None
+
+
+def test_writes_only_scan_the_cache_when_over_the_limit(tmp_path, monkeypatch):
+    cache = OpenSkyResponseCache(cache_dir=str(tmp_path), max_bytes=10**9)
+    payload = bytes(range(256)) * 64
+    cache.put("/flights/all", {"begin": 0, "end": 3600}, payload)
+    entry_size = next(tmp_path.glob("*/*.json.gz")).stat().st_size
+
+    sweeps = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: sweeps.append(1) or evict())
+    cache.put("/flights/all", {"begin": 3600, "end": 7200}, payload)
+    assert sweeps == []
+
+    cache.max_bytes = 2 * entry_size
+    cache.put("/flights/all", {"begin": 7200, "end": 10800}, payload)
+    assert sweeps == [1]
+    assert len(list(tmp_path.glob("*/*.json.gz"))) == 2
@@ -1,3 +1,4 @@
+import io
 from etl_project.connectors.postgresql import PostgreSqlClient
 import pytest
 from dotenv import load_dotenv
@@ -127,3 +128,93 @@ def test_overwrite_data_in_postgresql_table(setup_postgresql_client, setup_table
     assert len(result) == 2
 
     postgresql_client.drop_table(table_name)
+
+
+def test_upsert_csv_into_postgresql_table(setup_postgresql_client, setup_table):
+    """
+    Test bulk upserting a csv file into a PostgreSQL table.
+    """
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(
+        table_name
+    )  # Ensure the table is dropped before the test
+
+    postgresql_client.insert_csv(
+        csv_file=io.BytesIO(b'"id","value"\n1,"value_1"\n2,\n'),
+        columns=["id", "value"],
+        table=table,
+        metadata=metadata,
+    )
+    postgresql_client.upsert_csv(
+        csv_file=io.BytesIO(b'"id","value"\n2,"value_2"\n3,"value_3"\n'),
+        columns=["id", "value"],
+        table=table,
+        metadata=metadata,
+    )
+
+    result = postgresql_client.select_all(table=table)
+    assert sorted((row["id"], row["value"]) for row in result) == [
+        (1, "value_1"),
+        (2, "value_2"),
+        (3, "value_3"),
+    ]
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_migrate_table_adds_and_drops_columns(setup_postgresql_client):
+    """
+    Test bringing a table created by an earlier schema up to date.
+    """
+    postgresql_client = setup_postgresql_client
+    postgresql_client.drop_table("test_migrate_table")
+    old_metadata = MetaData()
+    old_table = Table(
+        "test_migrate_table",
+        old_metadata,
+        Column("id", Integer, primary_key=True),
+        Column("retired", String),
+    )
+    postgresql_client.insert(
+        data=[{"id": 1, "retired": "a"}], table=old_table, metadata=old_metadata
+    )
+
+    metadata = MetaData()
+    table = Table(
+        "test_migrate_table",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("value", String),
+    )
+    for _ in range(2):
+        postgresql_client.migrate_table(
+            table=table, metadata=metadata, drop_columns=["retired"]
+        )
+    postgresql_client.upsert(
+        data=[{"id": 1, "value": "b"}], table=table, metadata=metadata
+    )
+    assert postgresql_client.select_all(table) == [{"id": 1, "value": "b"}]
+    postgresql_client.drop_table("test_migrate_table")
+
+
+def test_select_between_filters_rows_and_columns(setup_postgresql_client, setup_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+    postgresql_client.insert(
+        data=[
+            {"id": 1, "value": "a"},
+            {"id": 2, "value": "b"},
+            {"id": 3, "value": "c"},
+        ],
+        table=table,
+        metadata=metadata,
+    )
+
+    result = postgresql_client.select_between(
+        table=table, column="id", start=2, end=3, columns=["id"]
+    )
+
+    assert sorted(result, key=lambda row: row["id"]) == [{"id": 2}, {"id": 3}]
+    postgresql_client.drop_table(table_name)
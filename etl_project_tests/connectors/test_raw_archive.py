@@ -0,0 +1,40 @@
+from etl_project.connectors.raw_archive import RawArchiveClient
+import pytest
+
+
+def test_raw_archive_round_trip(tmp_path):
+    raw_archive = RawArchiveClient(archive_path=str(tmp_path))
+    records = [
+        {"icao24": "abc123", "firstSeen": 1735689700, "lastSeen": 1735690000},
+        {"icao24": "def456", "firstSeen": 1735689800, "lastSeen": 1735692000},
+    ]
+    raw_archive.put_flights(start_time=1735689600, end_time=1735693200, records=records)
+
+    assert (tmp_path / "flights_all" / "date=2025-01-01").is_dir()
+    assert (
+        raw_archive.get_flights(start_time=1735689600, end_time=1735693200) == records
+    )
+    assert list(
+        raw_archive.iter_flights(
+            start_time=1735689600, end_time=1735693200, fields=["icao24"]
+        )
+    ) == [{"icao24": "abc123"}, {"icao24": "def456"}]
+
+
+def test_raw_archive_ignores_adjacent_windows(tmp_path):
+    raw_archive = RawArchiveClient(archive_path=str(tmp_path))
+    raw_archive.put_flights(start_time=1735689600, end_time=1735693200, records=[])
+    with pytest.raises(Exception):
+        raw_archive.get_flights(start_time=1735693200, end_time=1735696800)
+
+
+def test_interrupted_archive_is_not_visible(tmp_path):
+    raw_archive = RawArchiveClient(archive_path=str(tmp_path))
+    records = raw_archive.archive_flights(
+        start_time=1735689600,
+        end_time=1735693200,
+        records=iter([{"icao24": "abc123"}, {"icao24": "def456"}]),
+    )
+    next(records)
+    records.close()
+    assert raw_archive.list_windows(start_time=1735689600, end_time=1735693200) == []
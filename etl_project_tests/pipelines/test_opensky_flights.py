@@ -1,10 +1,15 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from etl_project.pipelines.opensky_flights import pipeline, run_pipeline
+from etl_project.pipelines.opensky_flights import (
+    pipeline,
+    run_pipeline,
+    transform_and_load_window,
+)
 from etl_project.connectors.postgresql import PostgreSqlClient
 from etl_project.assets.pipeline_logging import PipelineLogging
 from etl_project.assets.metadata_logging import MetaDataLogging, MetaDataLoggingStatus
 import os
+import pandas as pd
 
 
 class TestOpenSkyFlightsPipeline(unittest.TestCase):
@@ -88,6 +93,83 @@ class TestOpenSkyFlightsPipeline(unittest.TestCase):
             logs=mock_pipeline_logging.get_logs(),
         )
 
+    @patch.dict(
+        os.environ,
+        {
+            "SERVER_NAME": "localhost",
+            "DATABASE_NAME": "opensky",
+            "DB_USERNAME": "user",
+            "DB_PASSWORD": "password",
+            "PORT": "5432",
+        },
+    )
+    @patch("etl_project.pipelines.opensky_flights.RawArchiveClient")
+    def test_pipeline_rejects_replay_of_airport_flights(self, MockRawArchiveClient):
+        config = {
+            "source": "replay",
+            "airports": ["YPPH"],
+            "log_folder_path": "./etl_project_tests/logs",
+        }
+        with self.assertRaises(Exception):
+            pipeline(config=config, pipeline_logging=MagicMock())
+        MockRawArchiveClient.assert_not_called()
+
+    @patch("etl_project.pipelines.opensky_flights.load")
+    @patch("etl_project.pipelines.opensky_flights.validate_data_types")
+    @patch("etl_project.pipelines.opensky_flights.enrich_aircraft_data")
+    @patch("etl_project.pipelines.opensky_flights.enrich_airline_data")
+    @patch("etl_project.pipelines.opensky_flights.enrich_airport_data")
+    @patch("etl_project.pipelines.opensky_flights.get_airport_reference")
+    @patch("etl_project.pipelines.opensky_flights.extract_opensky_tracks")
+    @patch("etl_project.pipelines.opensky_flights.transform_flight_data")
+    def test_stored_tracks_are_skipped_and_failed_tracks_fail_the_window(
+        self,
+        mock_transform_flight_data,
+        mock_extract_opensky_tracks,
+        mock_get_airport_reference,
+        mock_enrich_airport_data,
+        mock_enrich_airline_data,
+        mock_enrich_aircraft_data,
+        mock_validate_data_types,
+        mock_load,
+    ):
+        first_seen = pd.to_datetime([1735689600, 1735689700], unit="s", utc=True)
+        df_flights = pd.DataFrame(
+            {
+                "icao24": ["7c6b2d", "7c4ee8"],
+                "firstSeen": first_seen,
+                "lastSeen": first_seen + pd.Timedelta(hours=1),
+            }
+        )
+        mock_transform_flight_data.return_value = df_flights
+        mock_enrich_aircraft_data.return_value = df_flights
+        mock_extract_opensky_tracks.return_value = (
+            pd.DataFrame(columns=["icao24", "firstSeen"]),
+            df_flights.iloc[1:],
+        )
+        postgresql_client = MagicMock()
+        postgresql_client.select_between.return_value = [
+            {"icao24": "7c6b2d", "firstSeen": first_seen[0].to_pydatetime()}
+        ]
+
+        with self.assertRaisesRegex(Exception, "Failed to extract tracks"):
+            transform_and_load_window(
+                df_opensky_flights=df_flights,
+                date_range={},
+                config={},
+                postgresql_client=postgresql_client,
+                table=MagicMock(),
+                metadata=MagicMock(),
+                pipeline_logging=MagicMock(),
+                opensky_client=MagicMock(),
+                tracks_table=MagicMock(),
+            )
+
+        df_requested = mock_extract_opensky_tracks.call_args.kwargs["df_flights"]
+        self.assertEqual(list(df_requested["icao24"]), ["7c4ee8"])
+        # the flights and the extracted tracks are loaded before failing
+        self.assertEqual(mock_load.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
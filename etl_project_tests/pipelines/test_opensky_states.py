@@ -0,0 +1,41 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import pandas as pd
+from etl_project.pipelines.opensky_states import flush_state_vectors
+from etl_project.assets.opensky_states import StateVectorBuffer
+
+
+class TestFlushStateVectors(unittest.TestCase):
+
+    @patch("etl_project.pipelines.opensky_states.load")
+    def test_failed_load_keeps_state_vectors_for_next_flush(self, mock_load):
+        mock_load.side_effect = [Exception("connection lost"), None]
+        state_vector_buffer = StateVectorBuffer(flush_interval_seconds=3600)
+        snapshot_time = pd.Timestamp("2025-01-01", tz="UTC")
+        state_vector_buffer.add(
+            pd.DataFrame(
+                {"icao24": ["7c6b2d", "7c4ee8"], "snapshot_time": snapshot_time}
+            )
+        )
+        flush = dict(
+            state_vector_buffer=state_vector_buffer,
+            postgresql_client=MagicMock(),
+            table=MagicMock(),
+            metadata=MagicMock(),
+            pipeline_logging=MagicMock(),
+        )
+
+        self.assertFalse(flush_state_vectors(**flush))
+        self.assertEqual(state_vector_buffer.rows, 2)
+
+        state_vector_buffer.add(
+            pd.DataFrame({"icao24": ["7c0001"], "snapshot_time": [snapshot_time]})
+        )
+        self.assertTrue(flush_state_vectors(**flush))
+        self.assertEqual(state_vector_buffer.rows, 0)
+        loaded = mock_load.call_args.kwargs["df"]
+        self.assertEqual(list(loaded["icao24"]), ["7c6b2d", "7c4ee8", "7c0001"])
+
+
+if __name__ == "__main__":
+    unittest.main()
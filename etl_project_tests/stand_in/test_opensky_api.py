@@ -0,0 +1,42 @@
+from etl_project.stand_in.opensky_api import OpenSkyStandInServer
+import pytest
+import requests
+
+
+@pytest.fixture
+def stand_in_server():
+    with OpenSkyStandInServer(flights_per_hour=100) as server:
+        yield server
+
+
+def test_stand_in_flights_are_deterministic_and_do_not_overlap(stand_in_server):
+    url = f"{stand_in_server.base_url}/flights/all"
+    full = requests.get(url, params={"begin": 1735689600, "end": 1735693200}).json()
+    first_half = requests.get(
+        url, params={"begin": 1735689600, "end": 1735691400}
+    ).json()
+    second_half = requests.get(
+        url, params={"begin": 1735691400, "end": 1735693200}
+    ).json()
+
+    assert len(full) == 100
+    assert first_half == [f for f in full if f["lastSeen"] < 1735691400]
+    assert second_half == [f for f in full if f["lastSeen"] >= 1735691400]
+
+
+def test_stand_in_rejects_windows_longer_than_two_hours(stand_in_server):
+    response = requests.get(
+        f"{stand_in_server.base_url}/flights/all",
+        params={"begin": 1735689600, "end": 1735689600 + 3 * 3600},
+    )
+    assert response.status_code == 400
+
+
+def test_stand_in_throttles_every_nth_request():
+    with OpenSkyStandInServer(throttle_every=2, retry_after_seconds=3) as server:
+        url = f"{server.base_url}/states/all"
+        responses = [requests.get(url) for _ in range(4)]
+
+    assert [response.status_code for response in responses] == [200, 429, 200, 429]
+    assert responses[1].headers["X-Rate-Limit-Retry-After-Seconds"] == "3"
+    assert server.status_counts == {200: 2, 429: 2}